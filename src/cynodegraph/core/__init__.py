@@ -1,31 +1,90 @@
 __all__ = [
+    'checkpoint',
+    'clipboard',
+    'critical_path',
+    'distributed',
+    'edge_index',
+    'graph_exchange',
     'graphics_cutline',
     'graphics_edge',
+    'graphics_edge_layer',
     'graphics_guifeedback',
     'graphics_node',
     'graphics_scene',
     'graphics_socket',
+    'graphics_theme',
     'graphics_view',
     'guifeedback',
     'logparams',
     'node_content_widget',
+    'node_dag',
     'node_edge',
     'node_scene',
     'node_socket',
     'node',
+    'partition',
+    'project_file',
+    'result_cache',
+    'scene_binary',
+    'scene_changes',
+    'scene_diff',
+    'scene_journal',
+    'scene_json',
+    'scene_saver',
+    'scene_tiles',
+    'scheduler',
 ]
 
-import cynodegraph.core.graphics_cutline
-import cynodegraph.core.graphics_edge
-import cynodegraph.core.graphics_guifeedback
-import cynodegraph.core.graphics_node
-import cynodegraph.core.graphics_scene
-import cynodegraph.core.graphics_socket
-import cynodegraph.core.graphics_view
-import cynodegraph.core.guifeedback
+import importlib
+import importlib.util
+
+# the modules that do not need PyQt5, e.g. in distributed workers
+import cynodegraph.core.checkpoint
+import cynodegraph.core.critical_path
 import cynodegraph.core.logparams
-import cynodegraph.core.node_content_widget
-import cynodegraph.core.node_edge
-import cynodegraph.core.node_scene
-import cynodegraph.core.node_socket
-import cynodegraph.core.node
+import cynodegraph.core.node_dag
+import cynodegraph.core.partition
+import cynodegraph.core.result_cache
+import cynodegraph.core.scheduler
+
+# the others import each other in cycles that resolve in this order
+if importlib.util.find_spec('PyQt5') is not None:
+    import cynodegraph.core.clipboard
+    import cynodegraph.core.edge_index
+    import cynodegraph.core.graph_exchange
+    import cynodegraph.core.graphics_cutline
+    import cynodegraph.core.graphics_edge
+    import cynodegraph.core.graphics_edge_layer
+    import cynodegraph.core.graphics_guifeedback
+    import cynodegraph.core.graphics_node
+    import cynodegraph.core.graphics_scene
+    import cynodegraph.core.graphics_socket
+    import cynodegraph.core.graphics_theme
+    import cynodegraph.core.graphics_view
+    import cynodegraph.core.guifeedback
+    import cynodegraph.core.node_content_widget
+    import cynodegraph.core.node_edge
+    import cynodegraph.core.node_scene
+    import cynodegraph.core.node_socket
+    import cynodegraph.core.node
+    import cynodegraph.core.project_file
+    import cynodegraph.core.scene_binary
+    import cynodegraph.core.scene_changes
+    import cynodegraph.core.scene_diff
+    import cynodegraph.core.scene_journal
+    import cynodegraph.core.scene_json
+    import cynodegraph.core.scene_saver
+    import cynodegraph.core.scene_tiles
+
+
+
+def __getattr__(name: str):
+    """Imports distributed, left out so running it with -m does not warn,
+    and raises the ImportError of the modules needing PyQt5 without it.
+    """
+    if name in __all__:
+        return importlib.import_module(f'{__name__}.{name}')
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,180 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=no-name-in-module
+from __future__ import generator_stop
+from __future__ import annotations
+
+import os
+import pickle
+import struct
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+from cynodegraph.core import logparams
+from cynodegraph.core import node_dag
+
+
+
+#: Record header, the payload length and its crc32
+_HEADER = struct.Struct('!II')
+
+
+
+@dataclass
+class CheckpointRecord:
+    """The state of one Node at the time it was checkpointed.
+
+    Attributes:
+        node_id (str): The id of the Node.
+        content_hash (str): The Node's content hash when it was evaluated.
+        is_dirty (bool): The Node's dirty flag.
+        is_invalid (bool): The Node's invalid flag.
+        outputs (List[Any]): The values of the Node's output Sockets.
+    """
+    node_id: str
+    content_hash: str
+    is_dirty: bool
+    is_invalid: bool
+    outputs: List[Any]
+
+
+
+class CheckpointStore:
+    """An append-only file of Node evaluation results.
+
+    Every finished Node is appended as one record, so a run that dies loses
+    at most the Node it was evaluating. The last record for a Node wins. A
+    torn record at the end of the file, from a crash while writing, is cut
+    off when the file is opened again.
+
+    Records are pickled, only open checkpoint files you trust.
+
+    Args:
+        path (str): The checkpoint file, created if missing.
+        sync_interval (float): The most seconds between two fsync calls.
+
+    Attributes:
+        records (Dict[str, CheckpointRecord]): The latest record of each
+            node id.
+    """
+
+    def __init__(self, path: str, sync_interval: float=1.0):
+        self.path: str = path
+        self.sync_interval: float = sync_interval
+        self.records: Dict[str, CheckpointRecord] = {}
+        self.__lock: threading.Lock = threading.Lock()
+        self.__last_sync: float = time.monotonic()
+
+        valid_length = self.__load()
+        self.__file = open(self.path, 'ab')
+        if self.__file.tell() != valid_length:
+            logparams.logging.warning(f"Cutting off a torn record at the end of {self.path}")
+            self.__file.truncate(valid_length)
+
+    def __load(self) -> int:
+        """Reads the records from the file and returns the length of the valid part."""
+        if not os.path.exists(self.path):
+            return 0
+
+        valid_length = 0
+        with open(self.path, 'rb') as file:
+            while True:
+                header = file.read(_HEADER.size)
+                if len(header) < _HEADER.size:
+                    break
+                length, checksum = _HEADER.unpack(header)
+                payload = file.read(length)
+                if len(payload) < length or zlib.crc32(payload) != checksum:
+                    break
+                record = CheckpointRecord(*pickle.loads(payload))
+                self.records[record.node_id] = record
+                valid_length = file.tell()
+        return valid_length
+
+    def close(self):
+        """Syncs and closes the file."""
+        with self.__lock:
+            if not self.__file.closed:
+                self.__file.flush()
+                os.fsync(self.__file.fileno())
+                self.__file.close()
+
+    def append(self, record: CheckpointRecord):
+        """Appends a record to the file.
+
+        Args:
+            record (CheckpointRecord): The record to append.
+        """
+        payload = pickle.dumps(
+            (record.node_id, record.content_hash, record.is_dirty, record.is_invalid, record.outputs),
+            protocol=pickle.HIGHEST_PROTOCOL
+        )
+        with self.__lock:
+            self.__file.write(_HEADER.pack(len(payload), zlib.crc32(payload)) + payload)
+            self.__file.flush()
+            now = time.monotonic()
+            if now - self.__last_sync >= self.sync_interval:
+                os.fsync(self.__file.fileno())
+                self.__last_sync = now
+            self.records[record.node_id] = record
+
+    def compact(self):
+        """Rewrites the file keeping only the latest record of each node."""
+        with self.__lock:
+            temp_path = self.path + '.compact'
+            with open(temp_path, 'wb') as file:
+                for record in self.records.values():
+                    payload = pickle.dumps(
+                        (record.node_id, record.content_hash, record.is_dirty,
+                            record.is_invalid, record.outputs),
+                        protocol=pickle.HIGHEST_PROTOCOL
+                    )
+                    file.write(_HEADER.pack(len(payload), zlib.crc32(payload)) + payload)
+                file.flush()
+                os.fsync(file.fileno())
+            self.__file.close()
+            os.replace(temp_path, self.path)
+            self.__file = open(self.path, 'ab')
+
+    def restore(self, scene: 'Scene', graph: node_dag.CompiledGraph) -> Dict[str, List]:
+        """Restores the Nodes whose content hash matches their checkpoint.
+
+        The restored Nodes get their Socket values and their dirty and
+        invalid flags back, so they are skipped by the evaluation.
+
+        Args:
+            scene (Scene): The Scene being evaluated.
+            graph (CompiledGraph): The graph compiled from the Scene.
+
+        Returns:
+            Dict[str, List]: The outputs of the restored Nodes by id.
+        """
+        restored = {}
+        for node_obj in scene.nodes:
+            record = self.records.get(node_obj.id)
+            if (record is None or record.is_dirty or record.is_invalid or
+                record.content_hash != graph.nodes[node_obj.id].content_hash
+            ):
+                continue
+            for socket, value in zip(node_obj.outputs, record.outputs):
+                socket.value = value
+            node_obj.mark_dirty(record.is_dirty)
+            node_obj.mark_invalid(record.is_invalid)
+            restored[node_obj.id] = record.outputs
+
+        logparams.logging.info(f"Restored {len(restored)} nodes from {self.path}")
+        return restored
+
+    def record_node(self, node_obj: 'Node', content_hash: str):
+        """Appends the current state of a Node.
+
+        Args:
+            node_obj (Node): The Node to checkpoint.
+            content_hash (str): The Node's content hash.
+        """
+        self.append(CheckpointRecord(
+            node_obj.id, content_hash, node_obj.is_dirty(), node_obj.is_invalid(),
+            [socket.value for socket in node_obj.outputs]
+        ))
@@ -0,0 +1,195 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=no-name-in-module
+from __future__ import generator_stop
+from __future__ import annotations
+
+import json
+import uuid
+import zlib
+from typing import Dict, List, Tuple
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QByteArray, QMimeData
+
+from cynodegraph.core import graphics_node
+from cynodegraph.core import logparams
+from cynodegraph.core import scene_json
+
+
+
+#: The clipboard format of copied subgraphs, zlib compressed JSON
+MIME_TYPE = 'application/x-cynodegraph-subgraph'
+
+#: How far a duplicate is placed from the original
+DUPLICATE_OFFSET = (40.0, 40.0)
+
+
+
+def selected_nodes(scene: 'Scene') -> List['Node']:
+    """Returns the Nodes of the Scene's selected items."""
+    return [
+        item.node for item in scene.get_selected_items()
+        if isinstance(item, graphics_node.GraphicsNode)
+    ]
+
+def serialize_subgraph(nodes: List['Node']) -> Dict:
+    """Returns the plain data of some Nodes and the Edges between them.
+
+    Args:
+        nodes (List[Node]): The Nodes to serialize.
+
+    Returns:
+        Dict: The 'nodes' and the internal 'edges', see Node.serialize()
+            and Edge.serialize().
+    """
+    node_ids = {node_obj.id for node_obj in nodes}
+    edges = {}
+    for node_obj in nodes:
+        for socket in node_obj.outputs + node_obj.inputs:
+            for edge in socket.edges:
+                if (edge.id not in edges and edge.start_socket is not None and
+                    edge.end_socket is not None and edge.start_socket.node.id in node_ids and
+                    edge.end_socket.node.id in node_ids
+                ):
+                    edges[edge.id] = edge.serialize()
+    return {
+        'nodes': [node_obj.serialize() for node_obj in nodes],
+        'edges': list(edges.values()),
+    }
+
+def encode_subgraph(data: Dict) -> bytes:
+    """Encodes the data of serialize_subgraph() in the clipboard format."""
+    return zlib.compress(json.dumps(data, separators=(',', ':')).encode('utf-8'))
+
+def decode_subgraph(payload: bytes) -> Dict:
+    """Decodes the clipboard format, see encode_subgraph()."""
+    return json.loads(zlib.decompress(payload))
+
+def remap_subgraph(data: Dict, offset: Tuple[float, float]) -> Dict:
+    """Gives the Nodes and Edges of a subgraph new ids and moves it.
+
+    Args:
+        data (Dict): The data of serialize_subgraph(), left unchanged.
+        offset (Tuple[float, float]): The distance to move the Nodes by.
+
+    Returns:
+        Dict: The remapped copy of the data.
+    """
+    node_ids = {node_data['id']: uuid.uuid4().hex for node_data in data['nodes']}
+    nodes = [
+        dict(
+            node_data, id=node_ids[node_data['id']],
+            pos=[node_data['pos'][0] + offset[0], node_data['pos'][1] + offset[1]]
+        )
+        for node_data in data['nodes']
+    ]
+    edges = [
+        dict(
+            edge_data, id=uuid.uuid4().hex,
+            start=[node_ids[edge_data['start'][0]], *edge_data['start'][1:]],
+            end=[node_ids[edge_data['end'][0]], *edge_data['end'][1:]]
+        )
+        for edge_data in data['edges']
+        if edge_data['start'][0] in node_ids and edge_data['end'][0] in node_ids
+    ]
+    return {'nodes': nodes, 'edges': edges}
+
+def insert_subgraph(scene: 'Scene', data: Dict) -> Tuple[List['Node'], List['Edge']]:
+    """Adds a subgraph to a Scene in one bulk construction and selects it.
+
+    Args:
+        scene (Scene): The Scene to add to.
+        data (Dict): The data of serialize_subgraph(), with ids that are
+            not in the Scene yet, see remap_subgraph().
+
+    Returns:
+        Tuple[List[Node], List[Edge]]: The new Nodes and Edges.
+    """
+    nodes = {}
+    edges = []
+    with scene.bulk_construction():
+        for node_data in data['nodes']:
+            nodes[node_data['id']] = scene_json.create_node(scene, node_data)
+        for edge_data in data['edges']:
+            edge = scene_json.create_edge(scene, edge_data, nodes)
+            if edge is not None:
+                edges.append(edge)
+
+    scene.graphics_scene.clearSelection()
+    for node_obj in nodes.values():
+        node_obj.graphics_node.setSelected(True)
+    return list(nodes.values()), edges
+
+
+
+def copy_selection(scene: 'Scene') -> int:
+    """Puts the selected Nodes, and the Edges between them, on the clipboard.
+
+    Returns:
+        int: The number of Nodes copied.
+    """
+    nodes = selected_nodes(scene)
+    if not nodes:
+        return 0
+    mime_data = QMimeData()
+    mime_data.setData(MIME_TYPE, QByteArray(encode_subgraph(serialize_subgraph(nodes))))
+    QApplication.clipboard().setMimeData(mime_data)
+    return len(nodes)
+
+def cut_selection(scene: 'Scene') -> int:
+    """Copies the selected Nodes to the clipboard and removes them.
+
+    Returns:
+        int: The number of Nodes cut.
+    """
+    nodes = selected_nodes(scene)
+    count = copy_selection(scene)
+    for node_obj in nodes:
+        node_obj.remove()
+    return count
+
+def paste(scene: 'Scene', pos: Tuple[float, float]=None) -> List['Node']:
+    """Adds the subgraph on the clipboard to the Scene.
+
+    Args:
+        scene (Scene): The Scene to paste into.
+        pos (Tuple[float, float]): Where the top left of the subgraph
+            goes, by default where it was copied from.
+
+    Returns:
+        List[Node]: The pasted Nodes.
+    """
+    mime_data = QApplication.clipboard().mimeData()
+    if mime_data is None or not mime_data.hasFormat(MIME_TYPE):
+        return []
+    try:
+        data = decode_subgraph(bytes(mime_data.data(MIME_TYPE)))
+    except (zlib.error, ValueError):
+        logparams.logging.exception("Exception occurred")
+        return []
+    if not data['nodes']:
+        return []
+
+    offset = (0.0, 0.0)
+    if pos is not None:
+        offset = (
+            pos[0] - min(node_data['pos'][0] for node_data in data['nodes']),
+            pos[1] - min(node_data['pos'][1] for node_data in data['nodes'])
+        )
+    nodes, _ = insert_subgraph(scene, remap_subgraph(data, offset))
+    return nodes
+
+def duplicate_selection(scene: 'Scene') -> List['Node']:
+    """Duplicates the selected Nodes, and the Edges between them, in place.
+
+    The clipboard is left untouched.
+
+    Returns:
+        List[Node]: The new Nodes.
+    """
+    nodes = selected_nodes(scene)
+    if not nodes:
+        return []
+    data = remap_subgraph(serialize_subgraph(nodes), DUPLICATE_OFFSET)
+    new_nodes, _ = insert_subgraph(scene, data)
+    return new_nodes
@@ -0,0 +1,140 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=no-name-in-module
+from __future__ import generator_stop
+from __future__ import annotations
+
+import heapq
+from dataclasses import dataclass
+from typing import Dict, Iterable, List
+
+from cynodegraph.core import node_dag
+
+
+
+@dataclass
+class CriticalPath:
+    """The result of analyze().
+
+    Attributes:
+        bottom_levels (Dict[str, float]): For each node id the cost of the
+            longest path from the node to a sink, the node included.
+        top_levels (Dict[str, float]): For each node id the cost of the
+            longest path from a source to the node, the node excluded.
+        path (List[str]): The node ids of the critical path, source first.
+        length (float): The cost of the critical path, the lower bound of
+            the makespan with unlimited workers.
+    """
+    bottom_levels: Dict[str, float]
+    top_levels: Dict[str, float]
+    path: List[str]
+    length: float
+
+
+    def slack(self, node_id: str) -> float:
+        """Returns how much a node can be delayed without delaying the run.
+
+        Args:
+            node_id (str): The node id.
+
+        Returns:
+            float: The slack, 0 for nodes on the critical path.
+        """
+        return self.length - self.top_levels[node_id] - self.bottom_levels[node_id]
+
+
+
+def bottom_levels(graph: node_dag.CompiledGraph) -> Dict[str, float]:
+    """Computes the bottom level of every node from DagNode.cost.
+
+    Args:
+        graph (CompiledGraph): The graph to analyze.
+
+    Returns:
+        Dict[str, float]: The bottom level of each node id.
+    """
+    levels = {}
+    for node_id in reversed(graph.order):
+        levels[node_id] = graph.nodes[node_id].cost + max(
+            (levels[child_id] for child_id in graph.children[node_id]), default=0.0
+        )
+    return levels
+
+def top_levels(graph: node_dag.CompiledGraph) -> Dict[str, float]:
+    """Computes the top level of every node from DagNode.cost.
+
+    Args:
+        graph (CompiledGraph): The graph to analyze.
+
+    Returns:
+        Dict[str, float]: The top level of each node id.
+    """
+    levels = {}
+    for node_id in graph.order:
+        levels[node_id] = max(
+            (
+                levels[parent_id] + graph.nodes[parent_id].cost
+                for parent_id in graph.nodes[node_id].upstream if parent_id in graph.nodes
+            ),
+            default=0.0
+        )
+    return levels
+
+def analyze(graph: node_dag.CompiledGraph) -> CriticalPath:
+    """Finds the critical path of a graph.
+
+    The costs are the historical run times measured by the profiler, see
+    node_dag.compile_scene().
+
+    Args:
+        graph (CompiledGraph): The graph to analyze.
+
+    Returns:
+        CriticalPath: The levels of every node and the critical path.
+    """
+    bottom = bottom_levels(graph)
+    top = top_levels(graph)
+    if not bottom:
+        return CriticalPath(bottom, top, [], 0.0)
+
+    node_id = max(graph.order, key=lambda other_id: (bottom[other_id], -top[other_id]))
+    length = bottom[node_id]
+    path = [node_id]
+    while graph.children[node_id]:
+        node_id = max(graph.children[node_id], key=bottom.get)
+        path.append(node_id)
+    return CriticalPath(bottom, top, path, length)
+
+def priority_order(graph: node_dag.CompiledGraph, node_ids: Iterable[str],
+    levels: Dict[str, float]
+) -> List[str]:
+    """Orders nodes for a single worker, highest bottom level first.
+
+    Nodes are only placed after their parents in the same set, so the
+    result can be evaluated front to back.
+
+    Args:
+        graph (CompiledGraph): The graph the nodes belong to.
+        node_ids (Iterable[str]): The nodes to order.
+        levels (Dict[str, float]): The bottom level of each node id.
+
+    Returns:
+        List[str]: The ordered node ids.
+    """
+    members = set(node_ids)
+    waiting = {
+        node_id: sum(1 for parent_id in graph.nodes[node_id].upstream if parent_id in members)
+        for node_id in members
+    }
+    ready = [(-levels[node_id], node_id) for node_id, count in waiting.items() if count == 0]
+    heapq.heapify(ready)
+
+    order = []
+    while ready:
+        _, node_id = heapq.heappop(ready)
+        order.append(node_id)
+        for child_id in graph.children[node_id]:
+            if child_id in waiting:
+                waiting[child_id] -= 1
+                if waiting[child_id] == 0:
+                    heapq.heappush(ready, (-levels[child_id], child_id))
+    return order
@@ -0,0 +1,447 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=no-name-in-module
+"""Distributed graph evaluation over TCP.
+
+A Coordinator splits a CompiledGraph into one partition per worker and
+ships batches of ready nodes, plus the input values they need, to worker
+processes. Workers run the kernels and stream every result back as soon as
+it is computed. Workers only use node_dag, never the Qt graphics layer.
+
+Messages are pickled, so only connect to workers on hosts you trust. For
+testing everything can run on localhost with local_cluster().
+
+Run a worker with:
+    python -m cynodegraph.core.distributed --host 127.0.0.1 --port 7300
+"""
+from __future__ import generator_stop
+from __future__ import annotations
+
+import argparse
+import contextlib
+import os
+import pickle
+import socket
+import struct
+import subprocess
+import sys
+import threading
+import time
+import traceback
+from typing import Callable, Dict, Iterator, List, Set, Tuple
+
+from cynodegraph.core import critical_path
+from cynodegraph.core import logparams
+from cynodegraph.core import node_dag
+from cynodegraph.core import partition
+
+
+
+#: Header holding the byte length of a message
+_HEADER = struct.Struct('!Q')
+
+# message types
+MSG_RUN = 'run'             #: coordinator -> worker, evaluate a batch
+MSG_RESET = 'reset'         #: coordinator -> worker, drop resident values
+MSG_SHUTDOWN = 'shutdown'   #: coordinator -> worker, stop serving
+MSG_RESULT = 'result'       #: worker -> coordinator, outputs of one node
+MSG_DONE = 'done'           #: worker -> coordinator, batch finished
+MSG_ERROR = 'error'         #: worker -> coordinator, a kernel failed
+
+
+
+def send_message(sock: socket.socket, message: Tuple):
+    """Sends one length prefixed, pickled message.
+
+    Args:
+        sock (socket.socket): The connected socket.
+        message (Tuple): The message, the first item is the message type.
+    """
+    payload = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    sock.sendall(_HEADER.pack(len(payload)) + payload)
+
+def recv_message(sock: socket.socket) -> Tuple:
+    """Receives one message sent with send_message().
+
+    Args:
+        sock (socket.socket): The connected socket.
+
+    Returns:
+        Tuple: The message.
+
+    Raises:
+        ConnectionError: If the peer closed the connection.
+    """
+    (length,) = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    return pickle.loads(_recv_exact(sock, length))
+
+def _recv_exact(sock: socket.socket, length: int) -> bytes:
+    buffer = bytearray(length)
+    view = memoryview(buffer)
+    received = 0
+    while received < length:
+        count = sock.recv_into(view[received:], length - received)
+        if count == 0:
+            raise ConnectionError("Connection closed by peer")
+        received += count
+    return bytes(buffer)
+
+
+
+class Worker:
+    """A worker process that evaluates batches of nodes for a Coordinator.
+
+    The outputs computed by a worker stay resident between batches so the
+    Coordinator only has to ship the values produced elsewhere.
+
+    Args:
+        host (str): The interface to listen on.
+        port (int): The port to listen on, 0 picks a free one.
+
+    Attributes:
+        address (Tuple[str, int]): The address the worker listens on.
+    """
+
+    def __init__(self, host: str='127.0.0.1', port: int=0):
+        self.__server: socket.socket = socket.create_server((host, port))
+        self.address: Tuple[str, int] = self.__server.getsockname()[:2]
+        self.__values: Dict[str, List] = {}
+        self.__running: bool = True
+
+    def serve_forever(self):
+        """Serves one Coordinator connection at a time until shut down."""
+        with self.__server:
+            while self.__running:
+                connection, _ = self.__server.accept()
+                with connection:
+                    connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                    try:
+                        self.__serve_connection(connection)
+                    except ConnectionError:
+                        logparams.logging.info("Coordinator disconnected")
+                self.__values = {}
+
+    def __serve_connection(self, connection: socket.socket):
+        while self.__running:
+            message = recv_message(connection)
+            if message[0] == MSG_RUN:
+                self.__run_batch(connection, *message[1:])
+            elif message[0] == MSG_RESET:
+                self.__values = {}
+            elif message[0] == MSG_SHUTDOWN:
+                self.__running = False
+            else:
+                logparams.logging.warning(f"Unknown message type: {message[0]}")
+
+    def __run_batch(self, connection: socket.socket, batch_id: int,
+        dag_nodes: List[node_dag.DagNode], inputs: Dict[str, List]
+    ):
+        self.__values.update(inputs)
+        for dag_node in dag_nodes:
+            start = time.perf_counter()
+            try:
+                outputs = node_dag.run_node(
+                    dag_node, node_dag.gather_inputs(dag_node, self.__values)
+                )
+            # pylint: disable=broad-except
+            # Reasoning: any failure has to be reported to the coordinator
+            except Exception:
+                send_message(connection, (MSG_ERROR, batch_id, dag_node.node_id, traceback.format_exc()))
+                return
+            elapsed = time.perf_counter() - start
+            self.__values[dag_node.node_id] = outputs
+            # pickled on its own so the coordinator learns the size for free
+            send_message(connection, (
+                MSG_RESULT, batch_id, dag_node.node_id,
+                pickle.dumps(outputs, protocol=pickle.HIGHEST_PROTOCOL), elapsed
+            ))
+        send_message(connection, (MSG_DONE, batch_id))
+
+
+
+class Coordinator:
+    """Execution backend that evaluates a graph on remote Workers.
+
+    Each worker is given one partition. Whenever nodes of a partition have
+    all their inputs available they are sent to its worker as one batch,
+    along with the input values the worker does not hold yet. Batches are
+    ordered by bottom level so the critical path is run first.
+
+    Args:
+        addresses (List[Tuple[str, int]]): The addresses of the Workers.
+        timeout (float): Seconds to wait on a worker before giving up.
+
+    Attributes:
+        timings (Dict[str, float]): The seconds each node took to run on
+            its worker during the last evaluate().
+        sizes (Dict[str, float]): The output bytes of each node during the
+            last evaluate().
+    """
+
+    def __init__(self, addresses: List[Tuple[str, int]], timeout: float=None):
+        self.__connections: List[socket.socket] = []
+        for address in addresses:
+            connection = socket.create_connection(address, timeout=timeout)
+            connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.__connections.append(connection)
+        self.timings: Dict[str, float] = {}
+        self.sizes: Dict[str, float] = {}
+
+        # evaluation state shared by the worker threads
+        self.__condition: threading.Condition = threading.Condition()
+        self.__known: Dict[str, List] = {}
+        self.__results: Dict[str, List] = {}
+        self.__error: node_dag.EvaluationError = None
+        self.__on_result: Callable[[str, List], None] = None
+        self.__batch_counter: int = 0
+
+    def close(self, shutdown_workers: bool=False):
+        """Closes the connections to the workers.
+
+        Args:
+            shutdown_workers (bool): Flag for if the workers should exit.
+        """
+        for connection in self.__connections:
+            try:
+                if shutdown_workers:
+                    send_message(connection, (MSG_SHUTDOWN,))
+                connection.close()
+            except OSError:
+                logparams.logging.exception("Exception occurred")
+        self.__connections = []
+
+    def evaluate(self, graph: node_dag.CompiledGraph, values: Dict[str, List]=None,
+        on_result: Callable[[str, List], None]=None, partitions: List[List[str]]=None
+    ) -> Dict[str, List]:
+        """Evaluates the graph on the workers.
+
+        Args:
+            graph (CompiledGraph): The graph to evaluate.
+            values (Dict[str, List]): Outputs that are already known, see
+                node_dag.evaluate().
+            on_result (Callable[[str, List], None]): When given, called
+                with the node id and outputs as each result arrives. It is
+                called from the threads talking to the workers.
+            partitions (List[List[str]]): The node ids for each worker, by
+                default partition.partition_graph() is used.
+
+        Returns:
+            Dict[str, List]: The outputs of each node that was run.
+
+        Raises:
+            EvaluationError: If a kernel fails on a worker.
+            ValueError: If the partitions do not match the graph and workers
+                or an external input has no value.
+        """
+        if partitions is None:
+            partitions = partition.partition_graph(graph, len(self.__connections))
+        if len(partitions) > len(self.__connections):
+            raise ValueError(f"{len(partitions)} partitions for {len(self.__connections)} workers")
+
+        self.__known = dict(values) if values is not None else {}
+        missing = [node_id for node_id in graph.external_inputs() if node_id not in self.__known]
+        missing += [
+            node_id for node_id in set(graph.nodes).difference(*map(set, partitions))
+            if node_id not in self.__known
+        ]
+        if missing:
+            raise ValueError(f"No value or partition for nodes: {missing}")
+        self.__results = {}
+        self.__error = None
+        self.__on_result = on_result
+        self.timings = {}
+        self.sizes = {}
+
+        levels = critical_path.bottom_levels(graph)
+        threads = []
+        for connection, node_ids in zip(self.__connections, partitions):
+            send_message(connection, (MSG_RESET,))
+            pending = critical_path.priority_order(
+                graph, (node_id for node_id in node_ids if node_id not in self.__known), levels
+            )
+            thread = threading.Thread(
+                target=self.__drive_worker, args=(connection, graph, pending), daemon=True
+            )
+            thread.start()
+            threads.append(thread)
+        for thread in threads:
+            thread.join()
+
+        if self.__error is not None:
+            self.__error.results = self.__results
+            raise self.__error
+        return self.__results
+
+    def __drive_worker(self, connection: socket.socket, graph: node_dag.CompiledGraph,
+        pending: List[str]
+    ):
+        """Feeds one worker its partition, batch by batch.
+
+        Whatever ends the thread, the other threads are woken so none of
+        them waits for results that will not arrive.
+        """
+        resident: Set[str] = set()
+        batch: List[str] = []
+        try:
+            while pending:
+                with self.__condition:
+                    batch = self.__next_batch(graph, pending)
+                    while not batch and self.__error is None:
+                        self.__condition.wait()
+                        batch = self.__next_batch(graph, pending)
+                    if self.__error is not None:
+                        return
+                    batch_set = set(batch)
+                    pending[:] = [node_id for node_id in pending if node_id not in batch_set]
+                    inputs = {
+                        parent_id: self.__known[parent_id]
+                        for node_id in batch
+                        for parent_id in graph.nodes[node_id].upstream
+                        if parent_id not in batch_set and parent_id not in resident
+                    }
+                    self.__batch_counter += 1
+                    batch_id = self.__batch_counter
+
+                send_message(connection, (MSG_RUN, batch_id, [graph.nodes[node_id] for node_id in batch], inputs))
+                resident.update(inputs)
+                self.__receive_batch(connection, resident)
+                batch = []
+        except OSError as error:
+            # the connection to the worker failed while the batch was out
+            self.__fail(batch[0] if batch else '', f"Worker connection failed: {error!r}")
+        # pylint: disable=broad-except
+        # Reasoning: the thread's error boundary, any failure ends the evaluation
+        except Exception as error:
+            self.__fail(batch[0] if batch else '', repr(error))
+        finally:
+            with self.__condition:
+                self.__condition.notify_all()
+
+    def __fail(self, node_id: str, message: str):
+        """Records the first failure of the evaluation and wakes the
+        threads waiting for results.
+        """
+        with self.__condition:
+            if self.__error is None:
+                self.__error = node_dag.EvaluationError(node_id, message)
+            self.__condition.notify_all()
+
+    def __next_batch(self, graph: node_dag.CompiledGraph, pending: List[str]) -> List[str]:
+        """Returns the pending nodes whose inputs are known or in the batch.
+
+        The pending nodes are in priority order, which the batch keeps.
+        """
+        batch = []
+        in_batch = set()
+        for node_id in pending:
+            if all(
+                parent_id in self.__known or parent_id in in_batch
+                for parent_id in graph.nodes[node_id].upstream
+            ):
+                batch.append(node_id)
+                in_batch.add(node_id)
+        return batch
+
+    def __receive_batch(self, connection: socket.socket, resident: Set[str]):
+        """Reads the streamed results of a batch until it is done or failed.
+
+        The whole batch is always read, even after another worker failed,
+        so that no stale messages are left on the connection.
+        """
+        while True:
+            message = recv_message(connection)
+            if message[0] == MSG_DONE:
+                return
+            if message[0] == MSG_RESULT:
+                _, _, node_id, payload, elapsed = message
+                outputs = pickle.loads(payload)
+                with self.__condition:
+                    self.__known[node_id] = outputs
+                    self.__results[node_id] = outputs
+                    self.timings[node_id] = elapsed
+                    self.sizes[node_id] = len(payload)
+                    resident.add(node_id)
+                    self.__condition.notify_all()
+                if self.__on_result is not None:
+                    # pylint: disable=broad-except
+                    # Reasoning: a failing callback is not a failing worker,
+                    # the rest of the batch is still read
+                    try:
+                        self.__on_result(node_id, outputs)
+                    except Exception as error:
+                        self.__fail(node_id, f"on_result failed: {error!r}")
+            elif message[0] == MSG_ERROR:
+                _, _, node_id, details = message
+                self.__fail(node_id, details)
+                return
+
+
+
+def spawn_worker(host: str='127.0.0.1', port: int=0) -> Tuple[subprocess.Popen, Tuple[str, int]]:
+    """Starts a Worker in a new Python process.
+
+    Args:
+        host (str): The interface for the worker to listen on.
+        port (int): The port for the worker, 0 picks a free one.
+
+    Returns:
+        Tuple[subprocess.Popen, Tuple[str, int]]: The process and the
+            address the worker listens on.
+    """
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(path for path in sys.path if path)
+    process = subprocess.Popen(
+        [
+            sys.executable, '-c', 'from cynodegraph.core import distributed; distributed.main()',
+            '--host', host, '--port', str(port)
+        ],
+        stdout=subprocess.PIPE, env=env, text=True
+    )
+    worker_host, worker_port = process.stdout.readline().split()
+    return process, (worker_host, int(worker_port))
+
+@contextlib.contextmanager
+def local_cluster(count: int) -> Iterator[Coordinator]:
+    """Runs a Coordinator with worker processes on localhost.
+
+    Args:
+        count (int): The number of worker processes.
+
+    Yields:
+        Coordinator: The Coordinator connected to the workers.
+    """
+    processes = []
+    coordinator = None
+    try:
+        addresses = []
+        for _ in range(count):
+            process, address = spawn_worker()
+            processes.append(process)
+            addresses.append(address)
+        coordinator = Coordinator(addresses)
+        yield coordinator
+    finally:
+        if coordinator is not None:
+            coordinator.close(shutdown_workers=True)
+        for process in processes:
+            try:
+                process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                process.kill()
+            process.stdout.close()
+
+def main(argv: List[str]=None):
+    """Command line entry point that runs a Worker."""
+    parser = argparse.ArgumentParser(description="Cyphix node graph evaluation worker")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    worker = Worker(args.host, args.port)
+    # the spawning process reads the address from the first line
+    print(*worker.address, flush=True)
+    worker.serve_forever()
+
+
+
+if __name__ == '__main__':
+    main()
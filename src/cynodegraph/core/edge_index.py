@@ -0,0 +1,169 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=no-name-in-module
+from __future__ import generator_stop
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, Hashable, Set, Tuple
+
+from PyQt5.QtCore import QPointF, QRectF
+
+
+
+DEFAULT_CELL_SIZE: float = 512.0    #: The default size of the index's square cells
+MAX_ITEM_CELLS: int = 256           #: Items spanning more cells are kept in one list
+
+
+
+class EdgeIndex:
+    """A uniform grid over the cached bounding rects of the edges.
+
+    Qt's scene index has to be told about every geometry change and is
+    tuned for items that rarely move. Edges span arbitrary areas and
+    move with every Node they are connected to, so they are kept here
+    instead. Every item is stored in the cells its rect overlaps, so a
+    query only looks at the items near the queried area and panning costs
+    in proportion to what is on screen, not to the size of the scene.
+
+    The few items that span more than MAX_ITEM_CELLS cells, e.g. edges
+    across the whole scene, are kept apart and checked on every query.
+
+    Args:
+        cell_size (float): The size of the square cells in scene units.
+
+    Attributes:
+        cell_size (float): The size of the square cells in scene units.
+    """
+
+    def __init__(self, cell_size: float=DEFAULT_CELL_SIZE):
+        self.cell_size: float = cell_size
+        self.__cells: Dict[Tuple[int, int], Set[Hashable]] = {}
+        self.__rects: Dict[Hashable, Tuple[float, float, float, float]] = {}
+        self.__large: Set[Hashable] = set()
+
+    def __len__(self) -> int:
+        """Returns the number of items in the index."""
+        return len(self.__rects)
+
+    def __contains__(self, item: Hashable) -> bool:
+        """Returns if an item is in the index."""
+        return item in self.__rects
+
+    def __cell_range(self, left: float, top: float, right: float, bottom: float
+    ) -> Tuple[int, int, int, int]:
+        """Returns the first and last column and row overlapping a rect."""
+        size = self.cell_size
+        return (
+            math.floor(left / size), math.floor(top / size),
+            math.floor(right / size), math.floor(bottom / size),
+        )
+
+    def insert(self, item: Hashable, rect: QRectF):
+        """Adds an item, or moves it if it is already in the index.
+
+        Args:
+            item (Hashable): The item, e.g. a GraphicsEdge.
+            rect (QRectF): The bounding rect of the item in the scene.
+        """
+        bounds = (rect.left(), rect.top(), rect.right(), rect.bottom())
+        if self.__rects.get(item) == bounds:
+            return
+        if item in self.__rects:
+            self.remove(item)
+        self.__rects[item] = bounds
+
+        col0, row0, col1, row1 = self.__cell_range(*bounds)
+        if (col1 - col0 + 1) * (row1 - row0 + 1) > MAX_ITEM_CELLS:
+            self.__large.add(item)
+            return
+        for col in range(col0, col1 + 1):
+            for row in range(row0, row1 + 1):
+                self.__cells.setdefault((col, row), set()).add(item)
+
+    def remove(self, item: Hashable):
+        """Removes an item, if it is in the index.
+
+        Args:
+            item (Hashable): The item to remove.
+        """
+        bounds = self.__rects.pop(item, None)
+        if bounds is None:
+            return
+        if item in self.__large:
+            self.__large.discard(item)
+            return
+
+        col0, row0, col1, row1 = self.__cell_range(*bounds)
+        for col in range(col0, col1 + 1):
+            for row in range(row0, row1 + 1):
+                cell = self.__cells.get((col, row))
+                if cell is not None:
+                    cell.discard(item)
+                    if not cell:
+                        del self.__cells[(col, row)]
+
+    def clear(self):
+        """Removes all of the items."""
+        self.__cells.clear()
+        self.__rects.clear()
+        self.__large.clear()
+
+    def rect(self, item: Hashable) -> QRectF:
+        """Returns the rect an item was indexed with.
+
+        Args:
+            item (Hashable): An item in the index.
+
+        Returns:
+            QRectF: The item's bounding rect.
+        """
+        left, top, right, bottom = self.__rects[item]
+        return QRectF(left, top, right - left, bottom - top)
+
+    def query(self, rect: QRectF) -> Set[Any]:
+        """Returns the items whose rect overlaps an area.
+
+        Args:
+            rect (QRectF): The area of the scene, e.g. the exposed rect.
+
+        Returns:
+            Set[Any]: The overlapping items.
+        """
+        left, top, right, bottom = rect.left(), rect.top(), rect.right(), rect.bottom()
+        col0, row0, col1, row1 = self.__cell_range(left, top, right, bottom)
+
+        candidates = set(self.__large)
+        if (col1 - col0 + 1) * (row1 - row0 + 1) > len(self.__cells):
+            # the area covers more cells than are in use
+            for cell in self.__cells.values():
+                candidates.update(cell)
+        else:
+            for col in range(col0, col1 + 1):
+                for row in range(row0, row1 + 1):
+                    cell = self.__cells.get((col, row))
+                    if cell:
+                        candidates.update(cell)
+
+        rects = self.__rects
+        return {
+            item for item in candidates
+            if rects[item][0] <= right and rects[item][2] >= left
+            and rects[item][1] <= bottom and rects[item][3] >= top
+        }
+
+    def at(self, point: QPointF) -> Set[Any]:
+        """Returns the items whose rect contains a point.
+
+        Args:
+            point (QPointF): The position in the scene.
+
+        Returns:
+            Set[Any]: The items under the point.
+        """
+        x_pos, y_pos = point.x(), point.y()
+        col, row = math.floor(x_pos / self.cell_size), math.floor(y_pos / self.cell_size)
+        rects = self.__rects
+        return {
+            item for item in self.__cells.get((col, row), set()) | self.__large
+            if rects[item][0] <= x_pos <= rects[item][2] and rects[item][1] <= y_pos <= rects[item][3]
+        }
@@ -0,0 +1,594 @@
+# pylint: disable=missing-module-docstring
+from __future__ import generator_stop
+from __future__ import annotations
+
+import json
+import re
+import uuid
+import xml.etree.ElementTree as ElementTree
+from typing import Any, Callable, Dict, IO, Iterable, Iterator, List, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+from cynodegraph.core import logparams
+from cynodegraph.core import node_scene
+from cynodegraph.core import node_socket
+from cynodegraph.core import scene_json
+
+
+
+DOT_EXTENSIONS = ('.dot', '.gv')        #: The extensions of Graphviz files
+GRAPHML_EXTENSIONS = ('.graphml',)      #: The extensions of GraphML files
+
+#: The file dialog filter for the exchange formats
+FILE_FILTER = "Graphviz DOT (*.dot *.gv);;GraphML (*.graphml)"
+
+DEFAULT_NODE_CLASS = 'cynodegraph.core.node:Node'   #: The class of imported Nodes
+DEFAULT_SOCKET_TYPE = 1                             #: The type of imported Sockets
+DEFAULT_EDGE_TYPE = 2                               #: The line type of imported Edges, bezier
+DEFAULT_HEADER = {'scene_width': 64000, 'scene_height': 64000}
+
+#: The spacing of the grid that imported Nodes without a position are put on
+GRID_SPACING = (250.0, 300.0)
+GRID_COLUMNS = 64
+
+#: The attributes that are mapped to the Node instead of its params
+NODE_ATTRIBUTES = frozenset((
+    'label', 'title', 'x', 'y', 'pos', 'class', 'socket_type', 'inputs', 'outputs', 'params',
+))
+
+_GRAPHML_NS = '{http://graphml.graphdrawing.org/xmlns}'
+_GRAPHML_TYPES: Dict[str, Callable[[str], Any]] = {
+    'int': int, 'long': int, 'float': float, 'double': float,
+    'boolean': lambda text: text.strip().lower() == 'true',
+}
+_GRAPHML_KEYS = (
+    ('label', 'node', 'string'), ('class', 'node', 'string'), ('x', 'node', 'double'),
+    ('y', 'node', 'double'), ('inputs', 'node', 'string'), ('outputs', 'node', 'string'),
+    ('params', 'node', 'string'), ('edge_type', 'edge', 'int'),
+)
+
+_DOT_TOKEN = re.compile(r'''
+    (?:\s+|//[^\n]*\n|\#[^\n]*\n|/\*.*?\*/)*
+    (?:(?P<string>"(?:[^"\\]|\\.)*")
+    |(?P<edgeop>->|--)
+    |(?P<punct>[{}\[\];,=:])
+    |(?P<id>[A-Za-z_\x80-\U0010ffff][\w\x80-\U0010ffff]*|-?(?:\.\d+|\d+(?:\.\d*)?))
+    |(?P<html><))?
+''', re.VERBOSE | re.DOTALL)
+_DOT_UNESCAPE = re.compile(r'\\(["\\])')
+
+
+
+class _GraphBuilder:
+    """Collects what is needed of the Nodes before any Edge is read.
+
+    Only the Nodes and the port numbers in use are kept, the Edges are
+    streamed, so the memory needed does not grow with the Edge count.
+    """
+
+    def __init__(self, scale: float):
+        self.scale: float = scale
+        self.nodes: Dict[str, Dict[str, Any]] = {}
+        self.inputs: Dict[str, Dict[int, int]] = {}
+        self.outputs: Dict[str, Dict[int, int]] = {}
+
+    def add_node(self, node_id: str, attributes: Dict[str, Any]):
+        """Adds a Node, or more attributes of one."""
+        self.nodes.setdefault(node_id, {}).update(attributes)
+
+    def add_edge(self, source: str, source_port: int, target: str, target_port: int,
+        attributes: Dict[str, Any]
+    ):
+        """Adds the Sockets an Edge connects, creating missing Nodes."""
+        socket_type = attributes.get('socket_type')
+        for node_id, port, ports in (
+            (source, source_port, self.outputs), (target, target_port, self.inputs)
+        ):
+            self.nodes.setdefault(node_id, {})
+            node_ports = ports.setdefault(node_id, {})
+            if socket_type is not None or port not in node_ports:
+                node_ports[port] = socket_type
+
+    def __sockets(self, node_id: str, attributes: Dict[str, Any], is_input: bool) -> List[Dict]:
+        key = 'inputs' if is_input else 'outputs'
+        if key in attributes:
+            types = attributes[key]
+            if isinstance(types, str):
+                types = json.loads(types)
+        else:
+            ports = (self.inputs if is_input else self.outputs).get(node_id, {})
+            default = int(attributes.get('socket_type', DEFAULT_SOCKET_TYPE))
+            types = [
+                default if ports.get(index) is None else int(ports[index])
+                for index in range(max(ports, default=0) + 1)
+            ]
+        return [
+            {
+                'index': index,
+                'position': node_socket.LEFT_BOTTOM if is_input else node_socket.RIGHT_TOP,
+                'socket_type': int(socket_type), 'multi_edges': True,
+            }
+            for index, socket_type in enumerate(types)
+        ]
+
+    def __pos(self, attributes: Dict[str, Any], index: int) -> List[float]:
+        if 'x' in attributes and 'y' in attributes:
+            return [float(attributes['x']) * self.scale, float(attributes['y']) * self.scale]
+        if 'pos' in attributes:
+            # Graphviz positions are in points with the y axis pointing up
+            x, y = str(attributes['pos']).rstrip('!').split(',')[:2]
+            return [float(x) * self.scale, -float(y) * self.scale]
+        return [
+            index % GRID_COLUMNS * GRID_SPACING[0], index // GRID_COLUMNS * GRID_SPACING[1]
+        ]
+
+    def node_records(self) -> Iterator[Dict]:
+        """Yields the data of every Node, see Node.serialize()."""
+        for index, (node_id, attributes) in enumerate(self.nodes.items()):
+            if 'params' in attributes:
+                params = attributes['params']
+                if isinstance(params, str):
+                    params = json.loads(params)
+            else:
+                params = {
+                    name: value for name, value in attributes.items()
+                    if name not in NODE_ATTRIBUTES
+                }
+            yield {
+                'id': node_id,
+                'class': attributes.get('class', DEFAULT_NODE_CLASS),
+                'title': str(attributes.get('label', attributes.get('title', node_id))),
+                'pos': self.__pos(attributes, index),
+                'params': params,
+                'inputs': self.__sockets(node_id, attributes, True),
+                'outputs': self.__sockets(node_id, attributes, False),
+            }
+
+
+
+def _port(port: Any) -> int:
+    """Returns the Socket index of a DOT or GraphML port, 0 if it is not a number."""
+    if isinstance(port, int):
+        return max(port, 0)
+    return int(port) if isinstance(port, str) and port.isdigit() else 0
+
+def _edge_record(source: str, source_port: int, target: str, target_port: int,
+    attributes: Dict[str, Any]
+) -> Dict:
+    return {
+        'id': str(attributes.get('id') or uuid.uuid4().hex),
+        'edge_type': int(attributes.get('edge_type', DEFAULT_EDGE_TYPE)),
+        'start': [source, False, source_port],
+        'end': [target, True, target_port],
+    }
+
+def _oriented(edge_data: Dict) -> Tuple[List, List]:
+    """Returns the output and the input Socket reference of an Edge."""
+    if edge_data['start'][1]:
+        return edge_data['end'], edge_data['start']
+    return edge_data['start'], edge_data['end']
+
+
+
+def _dot_tokens(file: IO[str], chunk_size: int=1 << 16) -> Iterator[Tuple[str, str]]:
+    """Yields the kind and text of the DOT tokens of a file, one chunk in memory."""
+    buffer = ''
+    pos = 0
+    at_end = False
+    need_more = True
+    while True:
+        if need_more and not at_end:
+            chunk = file.read(chunk_size)
+            at_end = not chunk
+            buffer = buffer[pos:] + chunk + ('\n' if at_end else '')
+            pos = 0
+        need_more = True
+
+        # whitespace and comments are skipped along with the token
+        match = _DOT_TOKEN.match(buffer, pos)
+        kind = match.lastgroup
+        if kind is None or (match.end() == len(buffer) and not at_end):
+            # the token may be cut off by the end of the buffer
+            if not at_end:
+                continue
+            if match.end() < len(buffer):
+                raise ValueError(f"Unexpected {buffer[match.end():match.end() + 20]!r} in the DOT file")
+            return
+
+        if kind == 'html':
+            # HTML strings nest their angle brackets
+            start = match.start(kind)
+            depth = 0
+            for end in range(start, len(buffer)):
+                depth += {'<': 1, '>': -1}.get(buffer[end], 0)
+                if depth == 0:
+                    yield 'string', buffer[start + 1:end]
+                    pos = end + 1
+                    need_more = False
+                    break
+            else:
+                if at_end:
+                    raise ValueError("Unterminated HTML string in the DOT file")
+            continue
+
+        need_more = False
+        pos = match.end()
+        text = match.group(kind)
+        if kind == 'string':
+            text = text[1:-1]
+            yield kind, _DOT_UNESCAPE.sub(r'\1', text) if '\\' in text else text
+        else:
+            yield kind, text
+
+class _DotParser:
+    """Reads the node and edge statements of a DOT file.
+
+    Subgraphs are flattened and the attribute defaults of 'node' and
+    'edge' statements are applied within their scope. Subgraphs as the
+    operands of edge statements are not supported.
+    """
+
+    def __init__(self, file: IO[str]):
+        self.tokens: Iterator[Tuple[str, str]] = _dot_tokens(file)
+        self.token: Tuple[str, str] = next(self.tokens, ('', ''))
+
+    def peek(self) -> Tuple[str, str]:
+        """Returns the next token without consuming it, ('', '') at the end."""
+        return self.token
+
+    def next(self) -> Tuple[str, str]:
+        """Consumes the next token."""
+        token = self.token
+        self.token = next(self.tokens, ('', ''))
+        return token
+
+    def expect(self, text: str):
+        """Consumes the next token, which has to be text."""
+        _, found = self.next()
+        if found != text:
+            raise ValueError(f"Expected {text!r} at {found!r} in the DOT file")
+
+    def attributes(self) -> Dict[str, str]:
+        """Consumes the attribute lists following a statement."""
+        attributes = {}
+        while self.peek()[1] == '[':
+            self.next()
+            while self.peek()[1] != ']':
+                _, name = self.next()
+                value = 'true'
+                if self.peek()[1] == '=':
+                    self.next()
+                    _, value = self.next()
+                attributes[name] = value
+                if self.peek()[1] in (',', ';'):
+                    self.next()
+            self.next()
+        return attributes
+
+    def node_id(self) -> Tuple[str, int]:
+        """Consumes a node id and its optional port."""
+        kind, node_id = self.next()
+        if kind not in ('id', 'string'):
+            raise ValueError(f"Expected a node id at {node_id!r} in the DOT file")
+        port = 0
+        if self.peek()[1] == ':':
+            self.next()
+            port = _port(self.next()[1])
+            if self.peek()[1] == ':':
+                # the compass point
+                self.next()
+                self.next()
+        return node_id, port
+
+    def statements(self) -> Iterator[Tuple[str, Any, Dict[str, str]]]:
+        """Yields ('node', (id, port), attributes) and ('edge', [(id, port), ...], attributes)."""
+        if self.peek()[1].lower() == 'strict':
+            self.next()
+        self.next()
+        if self.peek()[1] != '{':
+            self.next()
+        self.expect('{')
+
+        scopes = [({}, {})]
+        while scopes:
+            kind, text = self.peek()
+            keyword = text.lower() if kind == 'id' else ''
+            if not kind:
+                raise ValueError("Unexpected end of the DOT file")
+            if text in (';', ','):
+                self.next()
+            elif text == '}':
+                self.next()
+                scopes.pop()
+            elif text == '{' or keyword == 'subgraph':
+                self.next()
+                if keyword == 'subgraph':
+                    if self.peek()[1] != '{':
+                        self.next()
+                    self.expect('{')
+                scopes.append((dict(scopes[-1][0]), dict(scopes[-1][1])))
+            elif keyword in ('graph', 'node', 'edge'):
+                self.next()
+                attributes = self.attributes()
+                if keyword != 'graph':
+                    scopes[-1][0 if keyword == 'node' else 1].update(attributes)
+            else:
+                endpoints = [self.node_id()]
+                if self.peek()[1] == '=':
+                    # a graph attribute
+                    self.next()
+                    self.next()
+                    continue
+                while self.peek()[0] == 'edgeop':
+                    self.next()
+                    endpoints.append(self.node_id())
+                attributes = self.attributes()
+                if len(endpoints) == 1:
+                    yield 'node', endpoints[0], {**scopes[-1][0], **attributes}
+                else:
+                    yield 'edge', endpoints, {**scopes[-1][1], **attributes}
+
+def _read_dot(filename: str, scale: float) -> Tuple[List[Dict], Iterator[Dict]]:
+    builder = _GraphBuilder(scale)
+    with open(filename, 'r', encoding='utf-8') as file:
+        for kind, value, attributes in _DotParser(file).statements():
+            if kind == 'node':
+                builder.add_node(value[0], attributes)
+            else:
+                for (source, source_port), (target, target_port) in zip(value, value[1:]):
+                    builder.add_edge(source, source_port, target, target_port, attributes)
+
+    def edges() -> Iterator[Dict]:
+        with open(filename, 'r', encoding='utf-8') as file:
+            for kind, value, attributes in _DotParser(file).statements():
+                if kind == 'edge':
+                    for (source, source_port), (target, target_port) in zip(value, value[1:]):
+                        yield _edge_record(source, source_port, target, target_port, attributes)
+
+    return list(builder.node_records()), edges()
+
+
+
+def _graphml_elements(filename: str) -> Iterator[Tuple[str, Dict[str, str], Dict[str, Any]]]:
+    """Yields the tag, XML attributes and data of every node and edge element.
+
+    The elements are dropped from the tree once read, so only the current
+    one is in memory.
+    """
+    keys: Dict[str, Tuple[str, Callable[[str], Any]]] = {}
+    parents = []
+    for event, element in ElementTree.iterparse(filename, events=('start', 'end')):
+        tag = element.tag.replace(_GRAPHML_NS, '')
+        if event == 'start':
+            if tag in ('graphml', 'graph'):
+                parents.append(element)
+            continue
+
+        if tag == 'key':
+            keys[element.get('id')] = (
+                element.get('attr.name', element.get('id')),
+                _GRAPHML_TYPES.get(element.get('attr.type'), str)
+            )
+        elif tag in ('node', 'edge'):
+            data = {}
+            for child in element.iter(_GRAPHML_NS + 'data'):
+                name, parse = keys.get(child.get('key'), (child.get('key'), str))
+                data[name] = parse(child.text or '')
+            yield tag, dict(element.attrib), data
+            for parent in parents:
+                parent.clear()
+        elif tag in ('graphml', 'graph'):
+            parents.remove(element)
+
+def _read_graphml(filename: str, scale: float) -> Tuple[List[Dict], Iterator[Dict]]:
+    builder = _GraphBuilder(scale)
+    for tag, attributes, data in _graphml_elements(filename):
+        if tag == 'node':
+            builder.add_node(attributes['id'], data)
+        else:
+            builder.add_edge(
+                attributes['source'], _port(attributes.get('sourceport')),
+                attributes['target'], _port(attributes.get('targetport')), data
+            )
+
+    def edges() -> Iterator[Dict]:
+        for tag, attributes, data in _graphml_elements(filename):
+            if tag == 'edge':
+                yield _edge_record(
+                    attributes['source'], _port(attributes.get('sourceport')),
+                    attributes['target'], _port(attributes.get('targetport')),
+                    {'id': attributes.get('id'), **data}
+                )
+
+    return list(builder.node_records()), edges()
+
+
+
+def read_records(filename: str, scale: float=1.0) -> Tuple[List[Dict], Iterator[Dict]]:
+    """Reads a DOT or GraphML file into the plain data of a Scene.
+
+    The file is parsed incrementally, twice: once for the Nodes and the
+    Sockets the Edges use, once more for the Edges, which are yielded one
+    at a time. So memory grows with the Node count only.
+
+    Node attributes map to the Node: 'label' or 'title' to the title, 'x'
+    and 'y' or a Graphviz 'pos' to the position, 'socket_type' to the type
+    of its Sockets and 'class' to its class. Other attributes become its
+    params. Each Node gets as many input and output Sockets as the ports
+    its Edges use, at least one of each, unless 'inputs' or 'outputs' list
+    the Socket types. An Edge's 'socket_type' sets the type of the Sockets
+    it connects and its 'edge_type' the line type. Ports that are numbers
+    are Socket indices, other ports are Socket 0.
+
+    Args:
+        filename (str): The file, the format is chosen by extension.
+        scale (float): The factor the positions in the file are scaled by.
+
+    Returns:
+        Tuple[List[Dict], Iterator[Dict]]: The data of every Node, see
+            Node.serialize(), and an iterator over the data of every Edge,
+            see Edge.serialize().
+    """
+    if filename.lower().endswith(GRAPHML_EXTENSIONS):
+        return _read_graphml(filename, scale)
+    if filename.lower().endswith(DOT_EXTENSIONS):
+        return _read_dot(filename, scale)
+    raise ValueError(f"Not a DOT or GraphML file: {filename}")
+
+def import_graph(scene: 'Scene', filename: str, scale: float=1.0) -> Tuple[List['Node'], int]:
+    """Adds the graph of a DOT or GraphML file to a Scene in one bulk construction.
+
+    The Nodes and Edges get new ids, like a paste, so the same file can be
+    imported more than once.
+
+    Args:
+        scene (Scene): The Scene to add to.
+        filename (str): The file, see read_records().
+        scale (float): The factor the positions in the file are scaled by.
+
+    Returns:
+        Tuple[List[Node], int]: The new Nodes and the number of new Edges.
+    """
+    node_records, edge_records = read_records(filename, scale)
+    # the Nodes by their id in the file
+    nodes: Dict[str, 'Node'] = {}
+    edge_count = 0
+    with scene.bulk_construction():
+        for data in node_records:
+            nodes[data['id']] = scene_json.create_node(scene, dict(data, id=uuid.uuid4().hex))
+        for data in edge_records:
+            if scene_json.create_edge(scene, dict(data, id=uuid.uuid4().hex), nodes) is None:
+                logparams.logging.warning(f"Skipping Edge {data['id']}, a Socket is missing")
+            else:
+                edge_count += 1
+    logparams.logging.info(f"Imported {len(nodes)} nodes and {edge_count} edges from {filename}")
+    return list(nodes.values()), edge_count
+
+def convert(source: str, destination: str, scale: float=1.0):
+    """Converts a DOT or GraphML file to a scene file, without a Scene.
+
+    The Edges are streamed from one file to the other, see read_records().
+
+    Args:
+        source (str): The DOT or GraphML file.
+        destination (str): The scene file, the format is chosen by
+            extension, see node_scene.scene_file_format().
+        scale (float): The factor the positions in the file are scaled by.
+    """
+    nodes, edges = read_records(source, scale)
+    node_scene.scene_file_format(destination).save_records(destination, DEFAULT_HEADER, nodes, edges)
+
+
+
+def _dot_string(value: Any) -> str:
+    if not isinstance(value, str):
+        value = json.dumps(value)
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+def _socket_types(sockets: List[Dict]) -> str:
+    return json.dumps([socket['socket_type'] for socket in sockets])
+
+def write_dot(file: IO[str], nodes: Iterable[Dict], edges: Iterable[Dict], scale: float=1.0):
+    """Writes the plain data of a Scene as a Graphviz digraph, one statement per line.
+
+    Edges run from their output to their input Socket, with the Socket
+    indices as ports. Everything needed to import the file again is kept
+    in attributes, see read_records().
+
+    Args:
+        file (IO[str]): The file to write to, opened as text.
+        nodes (Iterable[Dict]): The data of every Node, see Node.serialize().
+        edges (Iterable[Dict]): The data of every Edge, see Edge.serialize().
+        scale (float): The factor the positions are divided by.
+    """
+    file.write('digraph scene {\n')
+    for data in nodes:
+        x, y = data['pos']
+        file.write(
+            f"  {_dot_string(data['id'])} [label={_dot_string(data['title'])}, "
+            f"pos=\"{x / scale:g},{-y / scale:g}\", class={_dot_string(data['class'])}, "
+            f"inputs={_dot_string(_socket_types(data['inputs']))}, "
+            f"outputs={_dot_string(_socket_types(data['outputs']))}, "
+            f"params={_dot_string(data['params'])}];\n"
+        )
+    for data in edges:
+        (source, _, source_index), (target, _, target_index) = _oriented(data)
+        file.write(
+            f"  {_dot_string(source)}:{source_index} -> {_dot_string(target)}:{target_index} "
+            f"[id={_dot_string(data['id'])}, edge_type={data['edge_type']}];\n"
+        )
+    file.write('}\n')
+
+def write_graphml(file: IO[str], nodes: Iterable[Dict], edges: Iterable[Dict], scale: float=1.0):
+    """Writes the plain data of a Scene as GraphML, one element per line.
+
+    Args:
+        file (IO[str]): The file to write to, opened as text.
+        nodes (Iterable[Dict]): The data of every Node, see Node.serialize().
+        edges (Iterable[Dict]): The data of every Edge, see Edge.serialize().
+        scale (float): The factor the positions are divided by.
+    """
+    file.write(
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n'
+    )
+    for name, domain, value_type in _GRAPHML_KEYS:
+        file.write(
+            f'  <key id="{name}" for="{domain}" attr.name="{name}" attr.type="{value_type}"/>\n'
+        )
+    file.write('  <graph edgedefault="directed">\n')
+    for data in nodes:
+        values = (
+            ('label', data['title']), ('class', data['class']), ('x', data['pos'][0] / scale),
+            ('y', data['pos'][1] / scale), ('inputs', _socket_types(data['inputs'])),
+            ('outputs', _socket_types(data['outputs'])), ('params', json.dumps(data['params'])),
+        )
+        file.write(
+            f"    <node id={quoteattr(data['id'])}>"
+            + ''.join(f'<data key="{key}">{escape(str(value))}</data>' for key, value in values)
+            + '</node>\n'
+        )
+    for data in edges:
+        (source, _, source_index), (target, _, target_index) = _oriented(data)
+        file.write(
+            f"    <edge id={quoteattr(data['id'])} source={quoteattr(source)} "
+            f"target={quoteattr(target)} sourceport=\"{source_index}\" "
+            f"targetport=\"{target_index}\"><data key=\"edge_type\">{data['edge_type']}</data>"
+            "</edge>\n"
+        )
+    file.write('  </graph>\n</graphml>\n')
+
+def export_records(filename: str, nodes: Iterable[Dict], edges: Iterable[Dict], scale: float=1.0):
+    """Saves the plain data of a Scene as DOT or GraphML, by extension.
+
+    Args:
+        filename (str): The path to save to.
+        nodes (Iterable[Dict]): The data of every Node, see Node.serialize().
+        edges (Iterable[Dict]): The data of every Edge, see Edge.serialize().
+        scale (float): The factor the positions are divided by.
+    """
+    if filename.lower().endswith(GRAPHML_EXTENSIONS):
+        writer = write_graphml
+    elif filename.lower().endswith(DOT_EXTENSIONS):
+        writer = write_dot
+    else:
+        raise ValueError(f"Not a DOT or GraphML file: {filename}")
+    with open(filename, 'w', encoding='utf-8') as file:
+        writer(file, nodes, edges, scale)
+
+def export_graph(scene: 'Scene', filename: str, scale: float=1.0):
+    """Saves a Scene as DOT or GraphML, see export_records().
+
+    Args:
+        scene (Scene): The Scene to save.
+        filename (str): The path to save to.
+        scale (float): The factor the positions are divided by.
+    """
+    export_records(
+        filename, (node_obj.serialize() for node_obj in scene.nodes),
+        (
+            edge.serialize() for edge in scene.edges
+            if edge.start_socket is not None and edge.end_socket is not None
+        ),
+        scale
+    )
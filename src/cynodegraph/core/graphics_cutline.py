@@ -37,6 +37,20 @@ class CutLine(QGraphicsItem):
 
         self.setZValue(2)
 
+    def add_point(self, point: QPointF):
+        """Appends a point to the end of the cut-line.
+
+        Args:
+            point (QPointF): The new scene position of the cut-line's end.
+        """
+        self.prepareGeometryChange()
+        self.line_points.append(point)
+
+    def clear_points(self):
+        """Removes all the points of the cut-line."""
+        self.prepareGeometryChange()
+        self.line_points = []
+
     def shape(self) -> QPainterPath:
         """Returns the cut-line's QPainterPath.
 
@@ -66,7 +80,8 @@ class CutLine(QGraphicsItem):
         Returns:
             QRect: The QGraphicsItem's bounding rectangle.
         """
-        return self.shape().boundingRect()
+        margin = self.__pen.widthF() / 2.0 + 1.0
+        return self.shape().boundingRect().adjusted(-margin, -margin, margin, margin)
 
     # pylint: disable=unused-argument
     # Reasoning: PyQt painter overloaded method requires it.
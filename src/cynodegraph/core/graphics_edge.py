@@ -6,10 +6,11 @@ from __future__ import annotations
 import math
 
 from PyQt5.QtWidgets import QGraphicsItem, QGraphicsPathItem, QWidget
-from PyQt5.QtCore import QPointF, QRect, Qt
-from PyQt5.QtGui import QColor, QPainterPath, QPen
+from PyQt5.QtCore import QPointF, QRect, QRectF, Qt
+from PyQt5.QtGui import QPainterPath, QPainterPathStroker, QPen
 
 from cynodegraph.core import datastructures as ds
+from cynodegraph.core import graphics_theme
 from cynodegraph.core import logparams
 from cynodegraph.core import node_edge
 from cynodegraph.core import node_socket
@@ -39,6 +40,11 @@ class GraphicsEdge(QGraphicsPathItem):
         pos_destination (datastructures.Point): Holds the ending point of
             the edge.
         line_width (float): The default thickness of the drawn line.
+        hit_width (float): The thickness of the area around the line that
+            counts as the edge for hovering and selecting.
+        layer (EdgeLayer): The graphics_edge_layer that draws the edge
+            while it is neither hovered nor selected, None if the edge
+            draws itself.
 
     Todo:
         * Re-write of calc_path() severely needed.
@@ -64,8 +70,17 @@ class GraphicsEdge(QGraphicsPathItem):
         self.pos_destination: ds.Point = ds.Point(200, 100)
 
         self.line_width: float = 2.0
+        self.hit_width: float = 10.0
+        self.layer: 'EdgeLayer' = None
         self.__set_colors()
 
+        # the path and everything derived from it only change with the
+        # endpoints, so they are kept until one of those moves
+        self.__path_key: tuple = None
+        self.__bounding_rect: QRectF = None
+        self.__hit_shape: QPainterPath = None
+        self.__update_path()
+
         # set flags and z-value
         self.setFlag(QGraphicsItem.ItemIsSelectable)
         self.setAcceptHoverEvents(True)
@@ -76,18 +91,11 @@ class GraphicsEdge(QGraphicsPathItem):
         """Rather than convolute the __init__, do the brush, pen and
         colors here.
         """
-        self._color = QColor("#adadad")
-        self._color_selected = QColor("#00ff00")
-        self._color_hovered = QColor("#adadad")
-        self._pen = QPen(self._color)
-        self._pen_selected = QPen(self._color_selected)
-        self._pen_dragging = QPen(self._color)
-        self._pen_hovered = QPen(self._color_hovered)
-        self._pen_dragging.setStyle(Qt.DashLine)
-        self._pen.setWidthF(self.line_width)
-        self._pen_selected.setWidthF(self.line_width + 2.0)
-        self._pen_dragging.setWidthF(self.line_width + 2.0)
-        self._pen_hovered.setWidthF(self.line_width + 4.0)
+        pens = graphics_theme.current_theme().edge_pens(self.line_width)
+        self._pen: QPen = pens.default
+        self._pen_selected: QPen = pens.selected
+        self._pen_dragging: QPen = pens.dragging
+        self._pen_hovered: QPen = pens.hovered
 
 
     def on_selected(self):
@@ -113,6 +121,7 @@ class GraphicsEdge(QGraphicsPathItem):
             y_pos (int): The y coordinate position.
         """
         self.pos_source.point = (x_pos, y_pos)
+        self.__update_path()
 
     def set_destination(self, x_pos: int, y_pos: int):
         """Set the destination Socket position.
@@ -122,14 +131,65 @@ class GraphicsEdge(QGraphicsPathItem):
             y_pos (int): The y coordinate position.
         """
         self.pos_destination.point = (x_pos, y_pos)
+        self.__update_path()
+
+    def set_positions(self, source: tuple, destination: tuple):
+        """Set both Socket positions, rebuilding the path only once.
+
+        Args:
+            source (tuple): The (x, y) coordinates of the source Socket.
+            destination (tuple): The (x, y) coordinates of the destination
+                Socket.
+        """
+        self.pos_source.point = source
+        self.pos_destination.point = destination
+        self.__update_path()
+
+    def __update_path(self):
+        """Rebuilds the cached path if an endpoint or the side of the
+        starting Socket changed since it was last built.
+        """
+        start_socket = self.edge.start_socket
+        key = (
+            self.pos_source.point,
+            self.pos_destination.point,
+            start_socket.position if start_socket is not None else None,
+        )
+        if key == self.__path_key:
+            return
+
+        self.prepareGeometryChange()
+        self.__path_key = key
+        self.setPath(self.calc_path())
+        self.__bounding_rect = None
+        self.__hit_shape = None
+        self.edge.scene.graphics_scene.edge_index.insert(self, self.boundingRect())
+        if self.layer is not None:
+            self.layer.edge_changed(self)
+
+    def current_pen(self) -> QPen:
+        """Returns the pen the line is drawn with in its current state.
+
+        Returns:
+            QPen: The dragging, selected or default pen.
+        """
+        if self.edge.end_socket is None:
+            return self._pen_dragging
+        return self._pen if not self.isSelected() else self._pen_selected
 
     def shape(self) -> QPainterPath:
-        """Returns the GraphicsEdge's QPainterPath.
+        """Returns the area around the GraphicsEdge's line used for
+        hovering and selecting.
 
         Returns:
-            QPainterPath: The edge's line path object.
+            QPainterPath: The stroked outline of the edge's line path.
         """
-        return self.calc_path()
+        if self.__hit_shape is None:
+            stroker = QPainterPathStroker()
+            stroker.setWidth(self.hit_width)
+            stroker.setCapStyle(Qt.RoundCap)
+            self.__hit_shape = stroker.createStroke(self.path())
+        return self.__hit_shape
 
     # pylint: disable=no-else-return
     # Reasoning: If the method hits the else case its raises an Exception.
@@ -206,8 +266,7 @@ class GraphicsEdge(QGraphicsPathItem):
         """
         cutpath = QPainterPath(point1)
         cutpath.lineTo(point2)
-        path = self.calc_path()
-        return cutpath.intersects(path)
+        return cutpath.intersects(self.path())
 
 
     # Overloaded Methods
@@ -219,10 +278,18 @@ class GraphicsEdge(QGraphicsPathItem):
     def boundingRect(self) -> QRect:
         """Returns the bounding rectangle of the GraphicsEdge.
 
+        The path's rectangle is grown by half the widest pen, the hover
+        outline, so nothing drawn is left outside of the repainted region.
+
         Returns:
             QRect: The QGraphicsPathItem's bounding rectangle.
         """
-        return self.shape().boundingRect()
+        if self.__bounding_rect is None:
+            margin = max(self._pen_hovered.widthF(), self.hit_width) / 2.0 + 1.0
+            self.__bounding_rect = self.path().boundingRect().adjusted(
+                -margin, -margin, margin, margin
+            )
+        return self.__bounding_rect
 
     # pylint: disable=unused-argument
     # Reasoning: PyQt painter overloaded method requires it.
@@ -232,7 +299,8 @@ class GraphicsEdge(QGraphicsPathItem):
         """Overloaded QWidget paint method.
 
         Draws the line on the GraphicsScene. It also draws the hovered and
-        selected indicators.
+        selected indicators. When zoomed out past the Theme's overview
+        threshold a straight line is drawn instead of the path.
 
         Args:
             painter: QWidget painter class.
@@ -242,19 +310,22 @@ class GraphicsEdge(QGraphicsPathItem):
         Todo:
             * Find out what QStyleOptionGraphicsItem is for.
         """
-        self.setPath(self.calc_path())
-
         painter.setBrush(Qt.NoBrush)
 
+        zoom = QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform())
+        if graphics_theme.current_theme().detail_level(zoom) == graphics_theme.DETAIL_OVERVIEW:
+            painter.setPen(self.current_pen())
+            painter.drawLine(
+                QPointF(self.pos_source.x, self.pos_source.y),
+                QPointF(self.pos_destination.x, self.pos_destination.y)
+            )
+            return
+
         if self.hovered and self.edge.end_socket is not None:
             painter.setPen(self._pen_hovered)
             painter.drawPath(self.path())
 
-        if self.edge.end_socket is None:
-            painter.setPen(self._pen_dragging)
-        else:
-            painter.setPen(self._pen if not self.isSelected() else self._pen_selected)
-
+        painter.setPen(self.current_pen())
         painter.drawPath(self.path())
 
     # pylint: disable=invalid-name
@@ -296,10 +367,13 @@ class GraphicsEdge(QGraphicsPathItem):
     def hoverLeaveEvent(self, event):
         """Overloaded method for the hover leave event.
 
-        Sets the GraphicsEdge to not hovered and updates.
+        Sets the GraphicsEdge to not hovered and updates. An unselected
+        edge goes back to being drawn by its layer.
 
         Args:
             event: Contains the event data.
         """
         self.hovered = False
         self.update()
+        if self.layer is not None:
+            self.layer.demote(self)
@@ -0,0 +1,360 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=no-name-in-module
+from __future__ import generator_stop
+from __future__ import annotations
+
+import math
+from typing import Dict, List, Set, Tuple
+
+from PyQt5.QtWidgets import QGraphicsItem
+from PyQt5.QtCore import QLineF, QPointF, QRectF, Qt
+from PyQt5.QtGui import QPainterPath, QPen
+
+from cynodegraph.core import edge_index
+from cynodegraph.core import graphics_edge
+from cynodegraph.core import graphics_theme
+
+
+
+DEFAULT_CHUNK_SIZE: int = 256       # edges merged into one path
+DEFAULT_CELL_SIZE: float = 1024.0   # scene units of the cells grouping nearby edges
+
+
+
+class _EdgeChunk:
+    """Nearby edges drawn with the same pen, merged into one path.
+
+    Attributes:
+        key (tuple): The id of the pen and the cell of the chunk.
+        pen (QPen): The pen the edges are drawn with.
+        edges (List[GraphicsEdge]): The edges of the chunk.
+        path (QPainterPath): All of the edges' paths, None until built.
+        lines (List[QLineF]): The edges as straight lines, None until built.
+        rect (QRectF): The area the chunk is drawn in, None until built.
+        drawn_rect (QRectF): The area the chunk was last painted in, which
+            has to be repainted when an edge of the chunk moves.
+    """
+
+    def __init__(self, key: tuple, pen: QPen):
+        self.key: tuple = key
+        self.pen: QPen = pen
+        self.edges: List[graphics_edge.GraphicsEdge] = []
+        self.path: QPainterPath = None
+        self.lines: List[QLineF] = None
+        self.rect: QRectF = None
+        self.drawn_rect: QRectF = None
+
+    def invalidate(self):
+        """Drops the merged geometry so it is built again when painted."""
+        self.path = None
+        self.lines = None
+        self.rect = None
+
+    def build(self):
+        """Merges the edges' paths and bounding rects."""
+        self.path = QPainterPath()
+        self.lines = []
+        self.rect = QRectF()
+        for edge in self.edges:
+            self.path.addPath(edge.path())
+            self.lines.append(QLineF(
+                edge.pos_source.x, edge.pos_source.y,
+                edge.pos_destination.x, edge.pos_destination.y
+            ))
+            self.rect = self.rect.united(edge.boundingRect())
+
+
+
+class EdgeLayer(QGraphicsItem):
+    """A single scene item drawing the edges that are neither hovered nor
+    selected.
+
+    Every GraphicsEdge is an item of its own, with its own hover events,
+    paint call and entry in the scene's index. With a hundred thousand
+    edges that overhead dominates. The layer hides the GraphicsEdges it
+    takes over and draws them itself, merged into one path per chunk of
+    nearby edges sharing a pen. Only the chunks in the exposed area are
+    drawn, found through an edge_index.EdgeIndex of the chunks, and
+    hit-testing goes through the GraphicsScene's index of the edges.
+
+    An edge under the mouse or inside the rubber band is promoted: its
+    GraphicsEdge is shown again so it gets hovered and selected as usual.
+    It goes back into the layer once it is neither hovered nor selected.
+
+    Args:
+        chunk_size (int): The most edges merged into one path.
+        cell_size (float): The size of the square cells of the scene that
+            nearby edges are grouped by.
+        parent (QGraphicsItem): The parent item of the layer.
+
+    Attributes:
+        chunk_size (int): The most edges merged into one path.
+        cell_size (float): The size of the square cells of the scene that
+            nearby edges are grouped by.
+    """
+
+    def __init__(self, chunk_size: int=DEFAULT_CHUNK_SIZE,
+        cell_size: float=DEFAULT_CELL_SIZE, parent: QGraphicsItem=None
+    ):
+        """Inits the empty layer."""
+        super().__init__(parent)
+
+        self.chunk_size: int = chunk_size
+        self.cell_size: float = cell_size
+
+        self.__cells: Dict[tuple, List[_EdgeChunk]] = {}
+        self.__chunk_of: Dict[graphics_edge.GraphicsEdge, _EdgeChunk] = {}
+        self.__promoted: Set[graphics_edge.GraphicsEdge] = set()
+        # the chunks by the area they are drawn in, and the chunks whose
+        # edges changed since they were last indexed
+        self.__chunk_index: edge_index.EdgeIndex = edge_index.EdgeIndex(cell_size)
+        self.__dirty: Set[_EdgeChunk] = set()
+
+        # below the GraphicsEdges, and never the item under the mouse
+        self.setZValue(-2)
+        self.setAcceptedMouseButtons(Qt.NoButton)
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption)
+
+
+    def __len__(self) -> int:
+        """Returns the number of edges drawn by the layer."""
+        return len(self.__chunk_of)
+
+    def __contains__(self, edge: graphics_edge.GraphicsEdge) -> bool:
+        """Returns if an edge is drawn by the layer."""
+        return edge in self.__chunk_of
+
+    def __chunk_key(self, edge: graphics_edge.GraphicsEdge) -> Tuple[int, int, int]:
+        """Returns the pen and cell an edge is grouped by."""
+        center = edge.boundingRect().center()
+        return (
+            id(edge.current_pen()),
+            math.floor(center.x() / self.cell_size),
+            math.floor(center.y() / self.cell_size),
+        )
+
+    def __take(self, edge: graphics_edge.GraphicsEdge):
+        """Puts a hidden edge into a chunk with room to spare."""
+        key = self.__chunk_key(edge)
+        chunks = self.__cells.setdefault(key, [])
+        if not chunks or len(chunks[-1].edges) >= self.chunk_size:
+            chunks.append(_EdgeChunk(key, edge.current_pen()))
+        chunk = chunks[-1]
+        chunk.edges.append(edge)
+        chunk.invalidate()
+        self.__dirty.add(chunk)
+        self.__chunk_of[edge] = chunk
+        edge.setVisible(False)
+        self.update(edge.boundingRect())
+
+    def __drop(self, edge: graphics_edge.GraphicsEdge):
+        """Takes an edge out of its chunk."""
+        chunk = self.__chunk_of.pop(edge)
+        if chunk.drawn_rect is not None:
+            self.update(chunk.drawn_rect)
+        chunk.edges.remove(edge)
+        chunk.invalidate()
+        self.__dirty.add(chunk)
+        if not chunk.edges:
+            self.__dirty.discard(chunk)
+            self.__chunk_index.remove(chunk)
+            chunks = self.__cells[chunk.key]
+            chunks.remove(chunk)
+            if not chunks:
+                del self.__cells[chunk.key]
+
+    def add_edge(self, edge: graphics_edge.GraphicsEdge):
+        """Lets the layer draw a connected edge.
+
+        Args:
+            edge (GraphicsEdge): The edge to take over.
+        """
+        edge.layer = self
+        if not edge.isSelected() and not edge.hovered:
+            self.__take(edge)
+        else:
+            self.__promoted.add(edge)
+
+    def remove_edge(self, edge: graphics_edge.GraphicsEdge):
+        """Hands an edge back, e.g. before it is removed from the scene.
+
+        Args:
+            edge (GraphicsEdge): The edge to give back.
+        """
+        if edge in self.__chunk_of:
+            self.__drop(edge)
+        self.__promoted.discard(edge)
+        edge.layer = None
+        edge.setVisible(True)
+
+    def clear(self):
+        """Hands all of the edges back to be drawn by themselves."""
+        for edge in list(self.__chunk_of) + list(self.__promoted):
+            self.remove_edge(edge)
+
+    def edge_changed(self, edge: graphics_edge.GraphicsEdge):
+        """Updates the chunk of an edge whose path has changed.
+
+        Args:
+            edge (GraphicsEdge): The edge that moved.
+        """
+        chunk = self.__chunk_of.get(edge)
+        if chunk is None:
+            return
+        if self.__chunk_key(edge) != chunk.key:
+            self.__drop(edge)
+            self.__take(edge)
+            return
+        if chunk.drawn_rect is not None:
+            self.update(chunk.drawn_rect)
+        chunk.invalidate()
+        self.__dirty.add(chunk)
+        self.update(edge.boundingRect())
+
+    def promote(self, edge: graphics_edge.GraphicsEdge):
+        """Shows the GraphicsEdge of an edge so it can be hovered and
+        selected by itself.
+
+        Args:
+            edge (GraphicsEdge): The edge to promote.
+        """
+        if edge in self.__chunk_of:
+            self.__drop(edge)
+            self.__promoted.add(edge)
+            edge.setVisible(True)
+
+    def demote(self, edge: graphics_edge.GraphicsEdge):
+        """Takes a promoted edge back into the layer, if it is neither
+        hovered nor selected anymore.
+
+        Args:
+            edge (GraphicsEdge): The edge to demote.
+        """
+        if edge in self.__promoted and not edge.isSelected() and not edge.hovered:
+            self.__promoted.discard(edge)
+            self.__take(edge)
+
+    def demote_all(self):
+        """Takes every promoted edge that is neither hovered nor selected
+        back into the layer, e.g. when the selection changed.
+        """
+        for edge in list(self.__promoted):
+            self.demote(edge)
+
+    def edges_at(self, pos: QPointF) -> List[graphics_edge.GraphicsEdge]:
+        """Returns the edges of the layer whose hover area contains a point.
+
+        Args:
+            pos (QPointF): The position in the scene.
+
+        Returns:
+            List[GraphicsEdge]: The edges under the point.
+        """
+        return [
+            edge for edge in self.scene().edge_index.at(pos)
+            if edge in self.__chunk_of and edge.shape().contains(pos)
+        ]
+
+    def edges_in(self, rect: QRectF) -> List[graphics_edge.GraphicsEdge]:
+        """Returns the edges of the layer whose line crosses a rectangle.
+
+        Args:
+            rect (QRectF): The area of the scene.
+
+        Returns:
+            List[GraphicsEdge]: The edges inside the rectangle.
+        """
+        area = QPainterPath()
+        area.addRect(rect)
+        return [
+            edge for edge in self.scene().edge_index.query(rect)
+            if edge in self.__chunk_of and edge.path().intersects(area)
+        ]
+
+    def hover_at(self, pos: QPointF):
+        """Promotes the edges under the mouse, so the next mouse move
+        hovers them.
+
+        Args:
+            pos (QPointF): The mouse position in the scene.
+        """
+        for edge in self.edges_at(pos):
+            self.promote(edge)
+
+    def promote_in(self, rect: QRectF):
+        """Promotes the edges inside the rubber band, so it can select
+        them.
+
+        Args:
+            rect (QRectF): The rubber band's area in the scene.
+        """
+        for edge in self.edges_in(rect):
+            self.promote(edge)
+
+
+    # Overloaded Methods
+    # ------------------
+
+    # pylint: disable=invalid-name
+    # Reasoning: PyQt boundingRect overloaded method requires the
+    # camel case.
+    def boundingRect(self) -> QRectF:
+        """Returns the bounding rectangle of the layer, the whole scene.
+
+        Returns:
+            QRectF: The Qt bounding rectangle.
+        """
+        if self.scene() is None:
+            return QRectF()
+        return self.scene().sceneRect()
+
+    def shape(self) -> QPainterPath:
+        """Returns an empty shape, so the layer is never the item found at
+        a position and never takes mouse or hover events from other items.
+
+        Returns:
+            QPainterPath: The empty path.
+        """
+        return QPainterPath()
+
+    # pylint: disable=unused-argument
+    # Reasoning: PyQt painter overloaded method requires it.
+    # pylint: disable=invalid-name
+    # Reasoning: PyQt painter overloaded method requires the camel case.
+    def paint(self, painter, QStyleOptionGraphicsItem, widget=None):
+        """Overloaded QWidget paint method.
+
+        Draws the chunks crossing the exposed area, one drawPath call
+        each, switching pens as few times as possible. When zoomed out
+        past the Theme's overview threshold straight lines are drawn
+        instead of the paths.
+
+        Args:
+            painter: QWidget painter class.
+            QStyleOptionGraphicsItem: The style options, holding the exposed
+                area of the layer.
+            widget: The parent widget if there is one(not used).
+        """
+        exposed = QStyleOptionGraphicsItem.exposedRect
+        zoom = QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform())
+        overview = graphics_theme.current_theme().detail_level(zoom) == graphics_theme.DETAIL_OVERVIEW
+
+        # only the chunks that changed are rebuilt and moved in the index
+        for chunk in self.__dirty:
+            chunk.build()
+            self.__chunk_index.insert(chunk, chunk.rect)
+        self.__dirty.clear()
+
+        visible = sorted(self.__chunk_index.query(exposed), key=lambda chunk: chunk.key[0])
+
+        painter.setBrush(Qt.NoBrush)
+        pen = None
+        for chunk in visible:
+            if chunk.pen is not pen:
+                pen = chunk.pen
+                painter.setPen(pen)
+            if overview:
+                painter.drawLines(chunk.lines)
+            else:
+                painter.drawPath(chunk.path)
+            chunk.drawn_rect = chunk.rect
@@ -5,9 +5,10 @@ from __future__ import annotations
 
 from PyQt5.QtWidgets import QGraphicsItem, QGraphicsTextItem, QWidget
 from PyQt5.QtCore import QRectF, Qt
-from PyQt5.QtGui import QBrush, QColor, QFont, QPainterPath, QPen, QPixmap
+from PyQt5.QtGui import QBrush, QColor, QFont, QPen, QPixmap
 
 from cynodegraph.core import datastructures as ds
+from cynodegraph.core import graphics_theme
 from cynodegraph.core import logparams
 
 
@@ -42,7 +43,7 @@ class GraphicsGUIFeedbackPopup(QGraphicsItem):
         self.__text_item: QGraphicsTextItem = QGraphicsTextItem(self)
 
         # icons
-        self.__icons: QPixmap = QPixmap("icons/status_icons.png")
+        self.__icons: QPixmap = graphics_theme.current_theme().feedback_icons
         self.__icon_offset: float = 0.0
 
         # TODO: temp solution to guifeedback autosizing
@@ -67,21 +68,20 @@ class GraphicsGUIFeedbackPopup(QGraphicsItem):
     def __set_colors(self):
         """Rather than convolute the __init__, do the brush, pen and
         colors here.
+
+        They are shared by every popup through the current Theme.
         """
-        # text font and color
-        self.__text_color = Qt.white
-        self.__text_font = QFont("Monospace", 9)
-        self.__text_font.setBold(False)
+        self.__theme: graphics_theme.Theme = graphics_theme.current_theme()
 
-        # color to use for the outline
-        self.__color = QColor("#7F000000")
+        # text font and color
+        self.__text_color: QColor = self.__theme.feedback_text_color
+        self.__text_font: QFont = self.__theme.feedback_text_font
 
         # outline pens
-        self.__pen_default = QPen(self.__color)
-        self.__pen_default.setWidthF(1.0)
+        self.__pen_default: QPen = self.__theme.feedback_pen_default
 
         # background brushes
-        self.__brush_background = QBrush(QColor("#D3212121"))
+        self.__brush_background: QBrush = self.__theme.feedback_brush_background
 
     def __set_guifeedback_text_item(self):
         """Rather than convolute the __init__, set the popup text here.
@@ -162,23 +162,21 @@ class GraphicsGUIFeedbackPopup(QGraphicsItem):
         Todo:
             * Find out what QStyleOptionGraphicsItem is for.
         """
+        # the content and the outline share one prebuilt path
+        path = self.__theme.rounded_rect_path(0, 0, self.__width, self.__height, self.__edge_roundness)
+
         # content
-        path_content = QPainterPath()
-        path_content.setFillRule(Qt.WindingFill)
-        path_content.addRoundedRect(0, 0, self.__width, self.__height, self.__edge_roundness, self.__edge_roundness)
         painter.setPen(Qt.NoPen)
         painter.setBrush(self.__brush_background)
-        painter.drawPath(path_content.simplified())
+        painter.drawPath(path)
 
         # outline
-        path_outline = QPainterPath()
-        path_outline.addRoundedRect(0, 0, self.__width, self.__height, self.__edge_roundness, self.__edge_roundness)
         # 9pt = 9px
         # px max of 188 (188 - padding[8] = 180)
         painter.setBrush(Qt.NoBrush)
 
         painter.setPen(self.__pen_default)
-        painter.drawPath(path_outline.simplified())
+        painter.drawPath(path)
 
         # paint icon
         painter.drawPixmap(
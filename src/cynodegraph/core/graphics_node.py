@@ -4,14 +4,55 @@ from __future__ import generator_stop
 from __future__ import annotations
 
 from PyQt5.QtWidgets import QGraphicsItem, QGraphicsProxyWidget, QGraphicsTextItem, QWidget
-from PyQt5.QtCore import QRectF, Qt
-from PyQt5.QtGui import QBrush, QColor, QFont, QLinearGradient, QPainterPath, QPen
+from PyQt5.QtCore import QPointF, QRectF, Qt
+from PyQt5.QtGui import QBrush, QColor, QFont, QPen, QStaticText, QTextCursor, QTransform
 
+from cynodegraph.core import graphics_theme
 from cynodegraph.core import node
 from cynodegraph.core import node_content_widget
 
 
 
+class _TitleEditor(QGraphicsTextItem):
+    """The editable title text, only alive while a title is edited.
+
+    Return commits the new title, as does losing focus, and Escape
+    discards it.
+
+    Args:
+        graphics_node (GraphicsNode): The Node whose title is edited.
+    """
+
+    def __init__(self, graphics_node: GraphicsNode):
+        """Inits the editor over the Node's title."""
+        super().__init__(graphics_node)
+        self.graphics_node: GraphicsNode = graphics_node
+        self.setTextInteractionFlags(Qt.TextEditorInteraction)
+
+    # pylint: disable=invalid-name
+    # Reasoning: PyQt keyPressEvent overloaded method requires the
+    # camel case.
+    def keyPressEvent(self, event):
+        """Ends the editing on Return or Escape, otherwise edits the
+        text.
+        """
+        if event.key() in (Qt.Key_Return, Qt.Key_Enter):
+            self.graphics_node.finish_title_edit()
+        elif event.key() == Qt.Key_Escape:
+            self.graphics_node.finish_title_edit(commit=False)
+        else:
+            super().keyPressEvent(event)
+
+    # pylint: disable=invalid-name
+    # Reasoning: PyQt focusOutEvent overloaded method requires the
+    # camel case.
+    def focusOutEvent(self, event):
+        """Commits the title when the editor loses focus."""
+        super().focusOutEvent(event)
+        self.graphics_node.finish_title_edit()
+
+
+
 class GraphicsNode(QGraphicsItem):
     """The graphical representation of the Node.
 
@@ -34,8 +75,11 @@ class GraphicsNode(QGraphicsItem):
             between the Node's edge and title .
         title_vertical_padding (float): Value for the vertical padding
             between the Node's edge and title .
+        title_item (QGraphicsTextItem): The editable title, None unless
+            the title is being edited.
         graphics_content (QGraphicsProxyWidget): Reference to the content's
-            QGraphicsProxyWidget.
+            QGraphicsProxyWidget, None while the Node is off-screen or
+            zoomed out.
 
     Todo:
         * Find out what QStyleOptionGraphicsItem is for.
@@ -48,7 +92,6 @@ class GraphicsNode(QGraphicsItem):
         super().__init__(parent)
 
         self.node: node.Node = node_ref
-        self.content: node_content_widget.NodeContentWidget = self.node.content
 
         self._title: str = self.node.title
 
@@ -68,16 +111,10 @@ class GraphicsNode(QGraphicsItem):
 
         # create components
         self.__set_colors()
-        self.__set_title_item()
+        self.__set_title_text()
 
-        # content
-        self.graphics_content: QGraphicsProxyWidget = QGraphicsProxyWidget(self)
-        self.content.setGeometry(
-            self.edge_padding, self.title_height + self.edge_padding,
-            self.width - 2 * self.edge_padding,
-            self.height - 2 * self.edge_padding - self.title_height
-        )
-        self.graphics_content.setWidget(self.content)
+        # content, attached by the GraphicsScene once the Node is on screen
+        self.graphics_content: QGraphicsProxyWidget = None
 
         # set object flags
         self.setFlag(QGraphicsItem.ItemIsSelectable)
@@ -89,53 +126,56 @@ class GraphicsNode(QGraphicsItem):
     def __set_colors(self):
         """Rather than convolute the __init__, do the brush, pen and
         colors here.
+
+        They are shared by every GraphicsNode through the current Theme.
         """
-        # title text font and color
-        self._title_color: QColor = Qt.white
-        self._title_font: QFont = QFont("Helvetica", 9)
-        self._title_font.setBold(True)
+        self._theme: graphics_theme.Theme = graphics_theme.current_theme()
 
-        # colors to use for the outlines
-        self._color: QColor = QColor("#7F000000")
-        self._color_selected: QColor = QColor("#FFFFA637")
-        self._color_hovered: QColor = QColor("#FF37A6FF")
+        # title text font and color
+        self._title_color: QColor = self._theme.title_color
+        self._title_font: QFont = self._theme.title_font
 
         # outline pens
-        self._pen_default: QPen = QPen(self._color)
-        self._pen_default.setWidthF(1.0)
-        self._pen_selected: QPen = QPen(self._color_selected)
-        self._pen_selected.setWidthF(3.0)
-        self._pen_hovered: QPen = QPen(self._color_hovered)
-        self._pen_hovered.setWidthF(3.0)
+        self._pen_default: QPen = self._theme.node_pen_default
+        self._pen_selected: QPen = self._theme.node_pen_selected
+        self._pen_hovered: QPen = self._theme.node_pen_hovered
 
         # background brushes
-        self._brush_title: QBrush = QBrush(QColor("#FF313131"))
-        self._brush_background: QBrush = QBrush(QColor("#D3212121"))
-
-        # create gradient brush for title
-        hor_gradient: QLinearGradient = QLinearGradient(
-            0, 0, (self.width*0.8), self.title_height
-        )
-        ver_gradient: QLinearGradient = QLinearGradient(0, 0, 0, 20)
-        gradient = hor_gradient
-        gradient.setColorAt(0.0, QColor("#e0098be0"))
-        gradient.setColorAt(1.0, QColor("#FF313131"))
-        self._brush_title_grad: QBrush = QBrush(gradient)
+        self._brush_title: QBrush = self._theme.node_brush_title
+        self._brush_background: QBrush = self._theme.node_brush_background
+        self._brush_title_grad: QBrush = self._theme.title_brush(self.width, self.title_height)
 
-    def __set_title_item(self):
+    def __set_title_text(self):
         """Rather than convolute the __init__, set the Node title here.
+
+        The title is laid out once into a QStaticText and drawn by paint,
+        rather than every Node owning a QGraphicsTextItem and its
+        QTextDocument. The editable item is only made by edit_title.
         """
-        self.title_item: QGraphicsTextItem = QGraphicsTextItem(self)
-        self.title_item.node = self.node
-        self.title_item.setDefaultTextColor(self._title_color)
-        self.title_item.setFont(self._title_font)
-        self.title_item.setPos(self.title_horizontal_padding, 0)
-        self.title_item.setTextWidth(
+        self.title_item: QGraphicsTextItem = None
+        self.__title_text: QStaticText = QStaticText()
+        self.__title_text.setTextFormat(Qt.PlainText)
+        self.__title_text.setPerformanceHint(QStaticText.AggressiveCaching)
+        self.__title_text.setTextWidth(
             self.width - (2 * self.title_horizontal_padding)
         )
-        self.title_item.setPlainText(self._title)
+        self.__layout_title()
+
+    def __layout_title(self):
+        """Lays the title text out again after it changed."""
+        self.__title_text.setText(self._title)
+        self.__title_text.prepare(QTransform(), self._title_font)
+
 
 
+    @property
+    def content(self) -> node_content_widget.NodeContentWidget:
+        """NodeContentWidget: The content widget currently shown on the
+        Node, None while the Node is off-screen or zoomed out.
+        """
+        if self.graphics_content is None:
+            return None
+        return self.graphics_content.widget()
 
     @property
     def title(self) -> str:
@@ -149,7 +189,54 @@ class GraphicsNode(QGraphicsItem):
     @title.setter
     def title(self, value: str):
         self._title = value
+        self.__layout_title()
+        if self.title_item is not None:
+            self.title_item.setPlainText(self._title)
+        self.update()
+
+    def edit_title(self):
+        """Shows an editable text item over the title and focuses it."""
+        if self.title_item is not None:
+            return
+        self.title_item = _TitleEditor(self)
+        self.title_item.setDefaultTextColor(self._title_color)
+        self.title_item.setFont(self._title_font)
+        self.title_item.document().setDocumentMargin(0)
+        self.title_item.setPos(self.title_horizontal_padding, self.title_vertical_padding)
+        self.title_item.setTextWidth(
+            self.width - (2 * self.title_horizontal_padding)
+        )
         self.title_item.setPlainText(self._title)
+        self.title_item.setFocus()
+        cursor = self.title_item.textCursor()
+        cursor.select(QTextCursor.Document)
+        self.title_item.setTextCursor(cursor)
+
+        # keep the view's shortcuts, e.g. delete, away from the text
+        self.node.scene.get_view().editing_flag = True
+        self.update()
+
+    def finish_title_edit(self, commit: bool=True):
+        """Removes the editable text item, keeping its text as the new
+        title unless told otherwise.
+
+        Args:
+            commit (bool): If the edited text becomes the Node's title.
+        """
+        editor = self.title_item
+        if editor is None:
+            return
+        # cleared first as removing the focused editor loses it focus again
+        self.title_item = None
+        text = editor.toPlainText().strip()
+        editor.setParentItem(None)
+        if editor.scene() is not None:
+            editor.scene().removeItem(editor)
+        self.node.scene.get_view().editing_flag = False
+
+        if commit and text and text != self._title:
+            self.node.set_title(text)
+        self.update()
 
 
 
@@ -168,6 +255,20 @@ class GraphicsNode(QGraphicsItem):
         if new_state:
             self.on_selected()
 
+    def apply_detail_level(self, level: int):
+        """Shows or hides the child items not drawn at a level of detail.
+
+        The Sockets are Qt items of their own, so they are hidden rather
+        than skipped while painting. The title is drawn by paint itself
+        and the content widget is handed back to the pool by the
+        GraphicsScene instead.
+
+        Args:
+            level (int): One of the graphics_theme DETAIL_ values.
+        """
+        for socket in self.node.inputs + self.node.outputs:
+            socket.graphics_socket.setVisible(level > graphics_theme.DETAIL_OVERVIEW)
+
 
     # Overloaded Methods
     # ------------------
@@ -178,15 +279,19 @@ class GraphicsNode(QGraphicsItem):
     def boundingRect(self):
         """Returns the bounding rectangle of the GraphicsNode.
 
+        The rectangle includes the selected outline, which is drawn
+        outside of the Node's body.
+
         Returns:
             QRect: The Qt bounding rectangle.
         """
+        margin = 2.0 + self._pen_selected.widthF() / 2.0
         return QRectF(
             0,
             0,
             self.width,
             self.height
-        ).normalized()
+        ).normalized().adjusted(-margin, -margin, margin, margin)
 
     # pylint: disable=unused-argument
     # Reasoning: PyQt hoverEnterEvent overloaded method requires it.
@@ -212,6 +317,16 @@ class GraphicsNode(QGraphicsItem):
         self.hovered = False
         self.update()
 
+    # pylint: disable=invalid-name
+    # Reasoning: PyQt mouseDoubleClickEvent overloaded method requires the
+    # camel case.
+    def mouseDoubleClickEvent(self, event):
+        """When the title is double clicked, start editing it."""
+        if event.pos().y() < self.title_height:
+            self.edit_title()
+            return
+        super().mouseDoubleClickEvent(event)
+
     # pylint: disable=invalid-name
     # Reasoning: PyQt mouseMoveEvent overloaded method requires the
     # camel case.
@@ -240,6 +355,10 @@ class GraphicsNode(QGraphicsItem):
         if self._was_moved:
             self._was_moved = False
 
+            for node_instance in self.node.scene.nodes:
+                if node_instance.graphics_node.isSelected():
+                    node_instance.on_moved()
+
             self.node.scene.reset_last_selected_states()
             self._last_selected_state = True
 
@@ -257,6 +376,61 @@ class GraphicsNode(QGraphicsItem):
             self._last_selected_state = self.isSelected()
             self.on_selected()
 
+    def content_rect(self) -> QRectF:
+        """Returns the area of the Node the content widget is shown in.
+
+        Returns:
+            QRectF: The content area in the Node's coordinates.
+        """
+        return QRectF(
+            self.edge_padding, self.title_height + self.edge_padding,
+            self.width - 2 * self.edge_padding,
+            self.height - 2 * self.edge_padding - self.title_height
+        )
+
+    def attach_content(self, proxy: QGraphicsProxyWidget):
+        """Shows a pooled content widget on the Node.
+
+        Args:
+            proxy (QGraphicsProxyWidget): The proxy wrapping a content
+                widget already bound to the Node.
+        """
+        proxy.setParentItem(self)
+        proxy.widget().setGeometry(self.content_rect().toRect())
+        self.graphics_content = proxy
+
+    def detach_content(self) -> QGraphicsProxyWidget:
+        """Takes the content widget off the Node so it can go back to the
+        pool, which keeps a snapshot of it to draw in its place.
+
+        Returns:
+            QGraphicsProxyWidget: The detached proxy, None if the Node had
+                no content widget.
+        """
+        proxy = self.graphics_content
+        if proxy is not None:
+            self.graphics_content = None
+            self.update()
+        return proxy
+
+    def __paint_overview(self, painter):
+        """Draws the Node as flat rectangles, for when it is too small
+        on screen for the chrome to be seen.
+
+        Args:
+            painter: QWidget painter class.
+        """
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(self._brush_title)
+        painter.drawRect(QRectF(0, 0, self.width, self.title_height))
+        painter.setBrush(self._brush_background)
+        painter.drawRect(QRectF(0, self.title_height, self.width, self.height - self.title_height))
+
+        if self.isSelected():
+            painter.setBrush(Qt.NoBrush)
+            painter.setPen(self._pen_selected)
+            painter.drawRect(QRectF(-2, -2, self.width + 4, self.height + 4))
+
     # pylint: disable=unused-argument
     # Reasoning: PyQt painter overloaded method requires it.
     # pylint: disable=invalid-name
@@ -265,7 +439,8 @@ class GraphicsNode(QGraphicsItem):
         """Overloaded QWidget paint method.
 
         Draws the Node starting with the title, then content, background,
-        corner fixes, and outline.
+        corner fixes, and outline. When zoomed out past the Theme's
+        overview threshold only flat rectangles are drawn.
 
         Args:
             painter: QWidget painter class.
@@ -275,64 +450,52 @@ class GraphicsNode(QGraphicsItem):
         Todo:
             * Find out what QStyleOptionGraphicsItem is for.
         """
-        # title
-        path_title = QPainterPath()
-        path_title.setFillRule(Qt.WindingFill)
-        path_title.addRoundedRect(0, 0, self.width, self.title_height,
-            self.edge_roundness, self.edge_roundness
-        )
-        path_title.addRect(0, self.title_height - self.edge_roundness,
-            self.edge_roundness, self.edge_roundness
-        )
-        path_title.addRect(
-            self.width - self.edge_roundness,
-            self.title_height - self.edge_roundness, self.edge_roundness,
-            self.edge_roundness
+        zoom = QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform())
+        if self._theme.detail_level(zoom) == graphics_theme.DETAIL_OVERVIEW:
+            self.__paint_overview(painter)
+            return
+
+        # the paths are prebuilt and shared by every Node of this size
+        chrome = self._theme.node_chrome(self.width, self.height,
+            self.title_height, self.edge_roundness, self.isSelected()
         )
+
+        # title
         painter.setPen(Qt.NoPen)
         painter.setBrush(self._brush_title_grad)
-        painter.drawPath(path_title.simplified())
+        painter.drawPath(chrome.title)
+
+        # title text, laid out once and hidden under the editor while edited
+        if self.title_item is None:
+            painter.setFont(self._title_font)
+            painter.setPen(self._title_color)
+            painter.drawStaticText(
+                QPointF(self.title_horizontal_padding, self.title_vertical_padding),
+                self.__title_text
+            )
 
         # content
-        path_content = QPainterPath()
-        path_content.setFillRule(Qt.WindingFill)
-        # add the rectange for the content area background with rounded edges
-        path_content.addRoundedRect(
-            0, self.title_height, self.width,
-            self.height - self.title_height, self.edge_roundness,
-            self.edge_roundness
-        )
-        # next 2 addRects are to create 2 small squares below the title
-        # since the are rounded(which we do not want)
-        path_content.addRect(0, self.title_height, self.edge_roundness,
-            self.edge_roundness
-        )
-        path_content.addRect(self.width - self.edge_roundness,
-            self.title_height, self.edge_roundness, self.edge_roundness
-        )
-        painter.setPen(Qt.NoPen)
         painter.setBrush(self._brush_background)
-        painter.drawPath(path_content.simplified())
+        painter.drawPath(chrome.content)
+
+        # the last look of the content until a widget is attached again
+        if self.graphics_content is None and self._theme.detail_level(zoom) == graphics_theme.DETAIL_FULL:
+            snapshot = node_content_widget.content_pool().snapshot(self.node)
+            if snapshot is not None:
+                painter.drawPixmap(self.content_rect(), snapshot, QRectF(snapshot.rect()))
 
         # selected outline
-        if self.isSelected():
-            path_outline = QPainterPath()
-            path_outline.addRoundedRect(-2, -2, self.width+4,
-                self.height+4, self.edge_roundness, self.edge_roundness)
-            painter.setBrush(Qt.NoBrush)
+        painter.setBrush(Qt.NoBrush)
+        if chrome.selected_outline is not None:
             painter.setPen(self._pen_selected)
-            painter.drawPath(path_outline.simplified())
+            painter.drawPath(chrome.selected_outline)
 
         # outline
-        path_outline = QPainterPath()
-        path_outline.addRoundedRect(0, 0, self.width, self.height,
-            self.edge_roundness, self.edge_roundness)
-        painter.setBrush(Qt.NoBrush)
         if self.hovered:
             #painter.setPen(self._pen_hovered)
-            #painter.drawPath(path_outline.simplified())
+            #painter.drawPath(chrome.outline)
             painter.setPen(self._pen_default)
-            painter.drawPath(path_outline.simplified())
+            painter.drawPath(chrome.outline)
         else:
             painter.setPen(self._pen_default)
-            painter.drawPath(path_outline.simplified())
+            painter.drawPath(chrome.outline)
@@ -3,12 +3,18 @@
 from __future__ import generator_stop
 from __future__ import annotations
 
-import math
-
-from PyQt5.QtWidgets import QGraphicsScene, QWidget
-from PyQt5.QtCore import pyqtSignal, QLine
-from PyQt5.QtGui import QColor, QPen
-
+from typing import Dict, List, Set, Tuple
+
+from PyQt5.QtWidgets import QGraphicsScene, QStyleOptionGraphicsItem, QWidget
+from PyQt5.QtCore import pyqtSignal, QPointF, QRectF, Qt, QTimer
+from PyQt5.QtGui import QColor, QPainter, QPen, QPixmap
+
+from cynodegraph.core import edge_index
+from cynodegraph.core import graphics_edge
+from cynodegraph.core import graphics_edge_layer
+from cynodegraph.core import graphics_node
+from cynodegraph.core import graphics_theme
+from cynodegraph.core import node_content_widget
 from cynodegraph.core import node_scene
 from cynodegraph.core import guifeedback
 
@@ -27,6 +33,10 @@ class NodeEditorGraphicsScene(QGraphicsScene):
         grid_size (int): The graphical size of a grid square in pixels.
         grid_squares (int): The width/height of grid squares that make up
             a bigger grid square.
+        grid_min_spacing (int): The on screen pixels between grid lines
+            below which a finer grid is hidden and a coarser one is used.
+        grid_fade_spacing (int): The on screen pixels between the finer
+            grid lines below which they start to fade out.
         guifeedback (GUIFeedbackPopup): The persistant GUIFeedbackPopup
             object for the scene.
     """
@@ -47,6 +57,21 @@ class NodeEditorGraphicsScene(QGraphicsScene):
         # settings
         self.grid_size: int = 20
         self.grid_squares: int = 5
+        self.grid_min_spacing: int = 6
+        self.grid_fade_spacing: int = 16
+        # pre-rendered grid tiles by level, size, fade and pixel ratio
+        self.__grid_tiles: Dict[Tuple, QPixmap] = {}
+        # the graphics_theme DETAIL_ level the Nodes' child items are shown for
+        self.detail_level: int = graphics_theme.DETAIL_FULL
+        # the GraphicsNodes holding a pooled content widget, and the rect
+        # of the scene they are shown for
+        self.__content_nodes: Set[graphics_node.GraphicsNode] = set()
+        self.__content_rect: QRectF = None
+        self.__content_update_pending: bool = False
+        # draws the connected edges in a few paint calls, see enable_edge_layer()
+        self.edge_layer: graphics_edge_layer.EdgeLayer = None
+        # the GraphicsEdges by their cached bounding rects, see edges_at()
+        self.edge_index: edge_index.EdgeIndex = edge_index.EdgeIndex()
 
         # create guifeedback item
         self.guifeedback: guifeedback.GUIFeedbackPopup = guifeedback.GUIFeedbackPopup(self)
@@ -68,6 +93,7 @@ class NodeEditorGraphicsScene(QGraphicsScene):
         self._pen_dark: QPen = QPen(self._color_dark)
         self._pen_dark.setWidth(2)
         self.setBackgroundBrush(self._color_background)
+        self.__grid_tiles = {}
 
 
     def set_scene(self, width: int, height: int):
@@ -80,6 +106,189 @@ class NodeEditorGraphicsScene(QGraphicsScene):
         self.setSceneRect(-width//2, -height//2, width, height)
 
 
+    def set_detail_level(self, level: int):
+        """Shows or hides the Nodes' child items for a level of detail.
+
+        Only does work when the level changes, not on every zoom step.
+
+        Args:
+            level (int): One of the graphics_theme DETAIL_ values.
+        """
+        if level == self.detail_level:
+            return
+        self.detail_level = level
+        for node in self.scene.nodes:
+            node.graphics_node.apply_detail_level(level)
+
+    def edges_at(self, pos: QPointF) -> List[graphics_edge.GraphicsEdge]:
+        """Returns the GraphicsEdges whose hover area contains a point,
+        found through the edge index instead of testing every edge.
+
+        Args:
+            pos (QPointF): The position in the scene.
+
+        Returns:
+            List[GraphicsEdge]: The edges under the point.
+        """
+        return [edge for edge in self.edge_index.at(pos) if edge.shape().contains(pos)]
+
+    def edges_near(self, rect: QRectF) -> List[graphics_edge.GraphicsEdge]:
+        """Returns the GraphicsEdges whose bounding rect overlaps an area.
+
+        Args:
+            rect (QRectF): The area of the scene.
+
+        Returns:
+            List[GraphicsEdge]: The edges that may cross the area.
+        """
+        return list(self.edge_index.query(rect))
+
+    def enable_edge_layer(self, enabled: bool=True):
+        """Turns the batched drawing of the connected edges on or off.
+
+        Meant for scenes with so many edges that the overhead of each
+        GraphicsEdge being an item of its own dominates. See
+        graphics_edge_layer.EdgeLayer.
+
+        Args:
+            enabled (bool): If the edges are drawn by an EdgeLayer.
+        """
+        if enabled == (self.edge_layer is not None):
+            return
+
+        if enabled:
+            self.edge_layer = graphics_edge_layer.EdgeLayer()
+            self.addItem(self.edge_layer)
+            self.selectionChanged.connect(self.edge_layer.demote_all)
+            for edge in self.scene.edges:
+                if edge.start_socket is not None and edge.end_socket is not None:
+                    self.edge_layer.add_edge(edge.graphics_edge)
+        else:
+            self.selectionChanged.disconnect(self.edge_layer.demote_all)
+            self.edge_layer.clear()
+            self.removeItem(self.edge_layer)
+            self.edge_layer = None
+
+    def update_content_widgets(self, rect: QRectF=None):
+        """Gives content widgets to the Nodes inside the visible rect and
+        takes them back from the Nodes outside of it.
+
+        Content widgets are only shown at graphics_theme.DETAIL_FULL. Nodes
+        without one draw a snapshot of their last content instead.
+
+        Args:
+            rect (QRectF): The visible area of the scene. When None the last
+                rect is used again.
+        """
+        if rect is not None:
+            self.__content_rect = QRectF(rect)
+        self.__content_update_pending = False
+
+        visible = set()
+        if self.__content_rect is not None and self.detail_level == graphics_theme.DETAIL_FULL:
+            visible = {
+                item for item in self.items(self.__content_rect, Qt.IntersectsItemBoundingRect)
+                if isinstance(item, graphics_node.GraphicsNode)
+            }
+
+        pool = node_content_widget.content_pool()
+        # release first, so the newly visible Nodes can reuse the widgets
+        for item in self.__content_nodes - visible:
+            pool.release(item.detach_content())
+        for item in visible - self.__content_nodes:
+            item.attach_content(pool.acquire(item.node))
+        self.__content_nodes = visible
+
+    def request_content_update(self):
+        """Updates the content widgets once control returns to the event
+        loop, e.g. after Nodes were added inside the visible rect.
+        """
+        if not self.__content_update_pending:
+            self.__content_update_pending = True
+            QTimer.singleShot(0, self.update_content_widgets)
+
+    def release_content(self, item: graphics_node.GraphicsNode):
+        """Gives the content widget of a GraphicsNode back to the pool and
+        drops its snapshot, e.g. before it is removed from the scene.
+
+        Args:
+            item (GraphicsNode): The GraphicsNode to release the content of.
+        """
+        pool = node_content_widget.content_pool()
+        if item in self.__content_nodes:
+            self.__content_nodes.discard(item)
+            pool.release(item.detach_content())
+        pool.forget(item.node)
+
+    def grid_tile(self, zoom: float, pixel_ratio: float=1.0) -> Tuple[QPixmap, float]:
+        """Returns the pre-rendered background grid tile for a zoom level.
+
+        The tile holds one cell of the coarser grid lines with the finer
+        lines inside it, rendered at the size it is shown on screen. As
+        the view zooms out the finer lines fade out, and once they are
+        closer than grid_min_spacing pixels the next coarser level of the
+        grid is used. Tiles are cached per level, size and fade.
+
+        Args:
+            zoom (float): The on screen pixels per scene unit.
+            pixel_ratio (float): The device pixel ratio of the screen.
+
+        Returns:
+            Tuple[QPixmap, float]: The tile and the size of its cell in
+                scene units.
+        """
+        level = 0
+        spacing = float(self.grid_size)
+        while spacing * zoom < self.grid_min_spacing:
+            level += 1
+            spacing *= self.grid_squares
+        cell = spacing * self.grid_squares
+        size = max(1, round(cell * zoom))
+        fade_range = max(1, self.grid_fade_spacing - self.grid_min_spacing)
+        fade = round(min(1.0, (spacing * zoom - self.grid_min_spacing) / fade_range) * 16) / 16
+
+        key = (level, size, fade, pixel_ratio)
+        tile = self.__grid_tiles.get(key)
+        if tile is None:
+            if len(self.__grid_tiles) > 32:
+                self.__grid_tiles.clear()
+            tile = self.__render_grid_tile(size, zoom if level == 0 else 1.0, fade, pixel_ratio)
+            self.__grid_tiles[key] = tile
+        return tile, cell
+
+    def __render_grid_tile(self, size: int, zoom: float, fade: float, pixel_ratio: float) -> QPixmap:
+        tile = QPixmap(round(size * pixel_ratio), round(size * pixel_ratio))
+        tile.setDevicePixelRatio(pixel_ratio)
+        tile.fill(self._color_background)
+
+        painter = QPainter(tile)
+        if fade > 0:
+            light = QColor(self._color_light)
+            background = self._color_background
+            light.setRgbF(
+                background.redF() + (light.redF() - background.redF()) * fade,
+                background.greenF() + (light.greenF() - background.greenF()) * fade,
+                background.blueF() + (light.blueF() - background.blueF()) * fade
+            )
+            pen = QPen(light)
+            pen.setWidthF(max(1.0, self._pen_light.widthF() * zoom))
+            painter.setPen(pen)
+            for index in range(1, self.grid_squares):
+                offset = size * index / self.grid_squares
+                painter.drawLine(QPointF(offset, 0), QPointF(offset, size))
+                painter.drawLine(QPointF(0, offset), QPointF(size, offset))
+
+        pen = QPen(self._pen_dark)
+        pen.setWidthF(max(1.0, self._pen_dark.widthF() * zoom))
+        painter.setPen(pen)
+        # the line on the cell border is split between neighbouring tiles
+        for offset in (0, size):
+            painter.drawLine(QPointF(offset, 0), QPointF(offset, size))
+            painter.drawLine(QPointF(0, offset), QPointF(size, offset))
+        painter.end()
+        return tile
+
+
     # Overloaded Methods
     # ------------------
 
@@ -101,7 +310,8 @@ class NodeEditorGraphicsScene(QGraphicsScene):
     def drawBackground(self, painter, rect):
         """Overloaded QGraphicsScene draw method.
 
-        Draws the grid lines and background color of the scene.
+        Draws the grid lines and background color of the scene, by
+        tiling the exposed rect with the pixmap of grid_tile().
 
         Args:
             painter: QWidget painter class.
@@ -109,33 +319,18 @@ class NodeEditorGraphicsScene(QGraphicsScene):
         """
         super().drawBackground(painter, rect)
 
-        # create grid
-        left = int(math.floor(rect.left()))
-        right = int(math.ceil(rect.right()))
-        top = int(math.floor(rect.top()))
-        bottom = int(math.ceil(rect.bottom()))
-
-        first_left = left - (left % self.grid_size)
-        first_top = top - (top % self.grid_size)
-
-        # compute the lines to be drawn
-        lines_light, lines_dark = [], []
-        for x in range(first_left, right, self.grid_size):
-            if x % (self.grid_size*self.grid_squares) != 0:
-                lines_light.append(QLine(x, top, x, bottom))
-            else:
-                lines_dark.append(QLine(x, top, x, bottom))
-
-        for y in range(first_top, bottom, self.grid_size):
-            if y % (self.grid_size*self.grid_squares) != 0:
-                lines_light.append(QLine(left, y, right, y))
-            else:
-                lines_dark.append(QLine(left, y, right, y))
-
-
-        # draw the lines
-        painter.setPen(self._pen_light)
-        painter.drawLines(*lines_light)
-
-        painter.setPen(self._pen_dark)
-        painter.drawLines(*lines_dark)
+        zoom = QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform())
+        if zoom <= 0:
+            return
+        tile, cell = self.grid_tile(zoom, painter.device().devicePixelRatioF())
+
+        # draw in units of tile pixels, so the tile is shown unscaled and
+        # its corner lands on multiples of the cell in the scene
+        size = tile.width() / tile.devicePixelRatio()
+        scale = cell / size
+        target = QRectF(rect.left() / scale, rect.top() / scale, rect.width() / scale, rect.height() / scale)
+        painter.save()
+        painter.setRenderHint(QPainter.SmoothPixmapTransform, False)
+        painter.scale(scale, scale)
+        painter.drawTiledPixmap(target, tile, QPointF(target.left() % size, target.top() % size))
+        painter.restore()
@@ -4,9 +4,9 @@ from __future__ import generator_stop
 from __future__ import annotations
 
 from PyQt5.QtWidgets import QGraphicsItem
-from PyQt5.QtCore import QPointF, QRectF
-from PyQt5.QtGui import QBrush, QColor, QPen, QPolygonF
+from PyQt5.QtCore import QRectF
 
+from cynodegraph.core import graphics_theme
 from cynodegraph.core import node_scene
 from cynodegraph.core import node_socket
 
@@ -50,7 +50,6 @@ class GraphicsSocket(QGraphicsItem):
         """Inits the components needed for the socket graphic."""
         super().__init__(socket.node.graphics_node)
 
-        self.__alpha_color: QColor = QColor("#00000000")
         self.__point_length: float = 4.0
         self.__poly_outline_width: float = 1.0
 
@@ -72,28 +71,18 @@ class GraphicsSocket(QGraphicsItem):
         """Rather than convolute the __init__, do the brush, pen and
         colors here.
 
-        The colors are meant to be dependent on the socket type.
+        The colors are meant to be dependent on the socket type. Every
+        type and state is pre-rendered once by the current Theme and shared
+        by all of the GraphicsSockets with the same shape.
 
         Todo:
             * Potentially add a way to make the socket types/colors dynamic.
         """
-
-        # color scheme from:
-        # https://docs.unrealengine.com/en-US/Engine/Blueprints/UserGuide/Nodes/index.html
-        self.__color_dict = {
-            SOCKET_BOOL : QColor("#FF8f0700"),
-            SOCKET_INTEGER : QColor("#FF21e2ab"),
-            SOCKET_FLOAT : QColor("#FF9dff3f"),
-            SOCKET_STRING : QColor("#FFf604cc"),
-        }
-        self.__color_background: QColor = self.__color_dict[self.socket_type]
-        self.__color_outline: QColor = self.__color_dict[self.socket_type]
-
-        self.__brush: QBrush = QBrush(self.__color_background)
-        self.__pen: QPen = QPen(self.__color_outline)
-        self.__pen.setWidthF(self.outline_width)
-        self.__poly_pen: QPen = QPen(self.__color_outline)
-        self.__poly_pen.setWidthF(self.__poly_outline_width)
+        self.__theme: graphics_theme.Theme = graphics_theme.current_theme()
+        self.__shape: graphics_theme.SocketShape = graphics_theme.SocketShape(
+            self.radius, self.outline_width, self.__poly_outline_width,
+            self.__point_length
+        )
 
 
     # Overloaded Methods
@@ -105,15 +94,13 @@ class GraphicsSocket(QGraphicsItem):
     def boundingRect(self) -> QRectF:
         """Returns the bounding rectangle of the GraphicsSocket.
 
+        The rectangle reaches far enough right to cover the direction
+        arrow drawn next to the circle.
+
         Returns:
             QRect: The Qt bounding rectangle.
         """
-        return QRectF(
-            - self.radius - self.outline_width,
-            - self.radius - self.outline_width,
-            2 * (self.radius + self.outline_width),
-            2 * (self.radius + self.outline_width),
-        )
+        return self.__shape.rect()
 
     # pylint: disable=unused-argument
     # Reasoning: PyQt painter overloaded method requires it.
@@ -124,33 +111,16 @@ class GraphicsSocket(QGraphicsItem):
 
         Draws the Socket with it's directional indicator. The Socket changes
         from a hollow circle when the Socket has no connection to a filled
-        circle when the Socket is connected.
+        circle when the Socket is connected. Both are blitted from the
+        Theme's pre-rendered glyphs at the current zoom.
 
         Args:
             painter: QWidget painter class.
-            QStyleOptionGraphicsItem: ??? (not used).
+            QStyleOptionGraphicsItem: The style options, used for the zoom.
             widget: The parent widget if there is one(not used).
-
-        Todo:
-            * Find out what QStyleOptionGraphicsItem is for.
         """
-        painter.setBrush(self.__brush)
-        painter.setPen(self.__pen)
-
-        # draws the direction arrow
-        polygon = QPolygonF()
-        polygon.append(QPointF(self.radius + (self.radius/4 * 1.5), -(self.radius/4 * 2.5)))
-        polygon.append(QPointF(self.radius + self.__point_length, 0.0))
-        polygon.append(QPointF(self.radius + (self.radius/4 * 1.5), (self.radius/4 * 2.5)))
-
-        # draws either a hollow circle or filled depending on if active
-        if len(self.socket.edges) > 0:
-            painter.drawEllipse(-self.radius, -self.radius, self.radius * 2, self.radius * 2)
-        else:
-            painter.setBrush(self.__alpha_color)
-            painter.drawEllipse(-self.radius, -self.radius, self.radius * 2, self.radius * 2)
-
-        painter.setBrush(self.__brush)
-        painter.setPen(self.__poly_pen)
-
-        painter.drawPolygon(polygon)
+        zoom = QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform())
+        atlas, source = self.__theme.socket_glyph(self.__shape, self.socket_type,
+            len(self.socket.edges) > 0, zoom * painter.device().devicePixelRatioF()
+        )
+        painter.drawPixmap(self.__shape.rect(), atlas, source)
@@ -0,0 +1,529 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=no-name-in-module
+from __future__ import generator_stop
+from __future__ import annotations
+
+import dataclasses
+import math
+from typing import Dict, Tuple
+
+from PyQt5.QtCore import QPointF, QRectF, Qt
+from PyQt5.QtGui import QBrush, QColor, QFont, QLinearGradient, QPainter, QPainterPath, QPen, QPixmap, QPolygonF
+
+
+
+MAX_CACHED_PATHS: int = 256     # prebuilt paths kept before the cache is cleared
+MIN_GLYPH_SCALE: float = 0.5    # smallest scale socket glyphs are rendered at
+MAX_GLYPH_SCALE: float = 16.0   # largest scale socket glyphs are rendered at
+
+DETAIL_OVERVIEW: int = 0        #: Nodes are flat rects, sockets are hidden and edges straight
+DETAIL_NO_CONTENT: int = 1      #: Nodes are drawn without their content widgets
+DETAIL_FULL: int = 2            #: Everything is drawn
+
+
+
+@dataclasses.dataclass
+class NodeChrome:
+    """The simplified paths a GraphicsNode is drawn from.
+
+    Attributes:
+        title (QPainterPath): The title bar, rounded only at the top.
+        content (QPainterPath): The content background, rounded only at
+            the bottom.
+        outline (QPainterPath): The outline around the whole Node.
+        selected_outline (QPainterPath): The outline drawn around the Node
+            while it is selected, None if it is not selected.
+    """
+    title: QPainterPath
+    content: QPainterPath
+    outline: QPainterPath
+    selected_outline: QPainterPath
+
+
+@dataclasses.dataclass
+class EdgePens:
+    """The pens a GraphicsEdge draws its line with.
+
+    Attributes:
+        default (QPen): The pen of a connected Edge.
+        selected (QPen): The pen of a selected Edge.
+        dragging (QPen): The dashed pen of an Edge being dragged.
+        hovered (QPen): The wide pen drawn under a hovered Edge.
+    """
+    default: QPen
+    selected: QPen
+    dragging: QPen
+    hovered: QPen
+
+
+@dataclasses.dataclass
+class SocketStyle:
+    """The brush and pens a GraphicsSocket is drawn with.
+
+    Attributes:
+        brush (QBrush): The fill of a connected Socket and of its arrow.
+        pen (QPen): The outline of the Socket's circle.
+        poly_pen (QPen): The outline of the Socket's direction arrow.
+    """
+    brush: QBrush
+    pen: QPen
+    poly_pen: QPen
+
+
+
+@dataclasses.dataclass(frozen=True)
+class SocketShape:
+    """The dimensions a GraphicsSocket is drawn with.
+
+    Attributes:
+        radius (float): The radius of the circle.
+        outline_width (float): The thickness of the circle's outline.
+        poly_outline_width (float): The thickness of the arrow's outline.
+        point_length (float): How far the arrow's tip reaches past the
+            circle.
+    """
+    radius: float
+    outline_width: float
+    poly_outline_width: float
+    point_length: float
+
+    def rect(self) -> QRectF:
+        """Returns the area the Socket is drawn in, around its center.
+
+        Returns:
+            QRectF: The circle and the direction arrow to its right.
+        """
+        extent = self.radius + self.outline_width
+        arrow_extent = self.radius + self.point_length + self.poly_outline_width
+        return QRectF(-extent, -extent, extent + max(extent, arrow_extent), 2 * extent)
+
+
+
+class Theme:
+    """The pens, brushes, fonts and prebuilt paths shared by all of the
+    graphics items.
+
+    Every GraphicsNode, GraphicsSocket, GraphicsEdge and
+    GraphicsGUIFeedbackPopup used to build these for itself. The items now
+    only keep references to the ones held here, and the chrome paths are
+    built and simplified once per size instead of on every paint.
+
+    Attributes:
+        title_color (QColor): The color of the Nodes' title text.
+        title_font (QFont): The font of the Nodes' title text.
+        node_pen_default (QPen): The outline pen of a Node.
+        node_pen_selected (QPen): The outline pen of a selected Node.
+        node_pen_hovered (QPen): The outline pen of a hovered Node.
+        node_brush_title (QBrush): The flat fill of a Node's title.
+        node_brush_background (QBrush): The fill of a Node's content.
+        socket_colors (Dict[int, QColor]): The Socket colors keyed by the
+            graphics_socket SOCKET_ type.
+        socket_empty_brush (QBrush): The fill of a Socket with no Edges.
+        feedback_text_color (QColor): The color of the popup text.
+        feedback_text_font (QFont): The font of the popup text.
+        feedback_pen_default (QPen): The outline pen of the popup.
+        feedback_brush_background (QBrush): The fill of the popup.
+        lod_content_zoom (float): The scale below which the Nodes' content
+            widgets are hidden.
+        lod_overview_zoom (float): The scale below which the items are
+            only drawn as an overview.
+
+    Todo:
+        * Load the colors from a file so themes can be switched.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    # Reasoning: All the attributes are needed and used.
+    def __init__(self):
+        """Inits the shared resources and the empty caches."""
+        self.__set_node_colors()
+        self.__set_socket_colors()
+        self.__set_feedback_colors()
+
+        # level of detail thresholds, in view pixels per scene unit
+        self.lod_content_zoom: float = 0.6
+        self.lod_overview_zoom: float = 0.3
+
+        self.__paths: Dict[tuple, QPainterPath] = {}
+        self.__title_brushes: Dict[Tuple[float, float], QBrush] = {}
+        self.__edge_pens: Dict[float, EdgePens] = {}
+        self.__socket_styles: Dict[tuple, SocketStyle] = {}
+        self.__socket_arrows: Dict[Tuple[float, float], QPolygonF] = {}
+        self.__socket_atlases: Dict[Tuple[SocketShape, float], QPixmap] = {}
+        self.__feedback_icons: QPixmap = None
+
+
+    def __set_node_colors(self):
+        """Rather than convolute the __init__, do the Node's brush, pen and
+        colors here.
+        """
+        # title text font and color
+        self.title_color: QColor = Qt.white
+        self.title_font: QFont = QFont("Helvetica", 9)
+        self.title_font.setBold(True)
+
+        # outline pens
+        self.node_pen_default: QPen = QPen(QColor("#7F000000"))
+        self.node_pen_default.setWidthF(1.0)
+        self.node_pen_selected: QPen = QPen(QColor("#FFFFA637"))
+        self.node_pen_selected.setWidthF(3.0)
+        self.node_pen_hovered: QPen = QPen(QColor("#FF37A6FF"))
+        self.node_pen_hovered.setWidthF(3.0)
+
+        # background brushes
+        self.node_brush_title: QBrush = QBrush(QColor("#FF313131"))
+        self.node_brush_background: QBrush = QBrush(QColor("#D3212121"))
+
+    def __set_socket_colors(self):
+        """Rather than convolute the __init__, do the Socket colors here.
+        """
+        # color scheme from:
+        # https://docs.unrealengine.com/en-US/Engine/Blueprints/UserGuide/Nodes/index.html
+        self.socket_colors: Dict[int, QColor] = {
+            0 : QColor("#FF8f0700"),    # SOCKET_BOOL
+            1 : QColor("#FF21e2ab"),    # SOCKET_INTEGER
+            2 : QColor("#FF9dff3f"),    # SOCKET_FLOAT
+            3 : QColor("#FFf604cc"),    # SOCKET_STRING
+        }
+        self.socket_empty_brush: QBrush = QBrush(QColor("#00000000"))
+
+    def __set_feedback_colors(self):
+        """Rather than convolute the __init__, do the popup's brush, pen
+        and colors here.
+        """
+        self.feedback_text_color: QColor = Qt.white
+        self.feedback_text_font: QFont = QFont("Monospace", 9)
+        self.feedback_text_font.setBold(False)
+
+        self.feedback_pen_default: QPen = QPen(QColor("#7F000000"))
+        self.feedback_pen_default.setWidthF(1.0)
+
+        self.feedback_brush_background: QBrush = QBrush(QColor("#D3212121"))
+
+
+    def detail_level(self, zoom: float) -> int:
+        """Returns how much detail the items are drawn with at a scale.
+
+        Args:
+            zoom (float): The view's scale, usually from
+                QStyleOptionGraphicsItem.levelOfDetailFromTransform().
+
+        Returns:
+            int: DETAIL_OVERVIEW, DETAIL_NO_CONTENT or DETAIL_FULL.
+        """
+        if zoom < self.lod_overview_zoom:
+            return DETAIL_OVERVIEW
+        if zoom < self.lod_content_zoom:
+            return DETAIL_NO_CONTENT
+        return DETAIL_FULL
+
+
+    def __cached_path(self, key: tuple, build) -> QPainterPath:
+        """Returns the path stored under key, building and simplifying it
+        first if needed.
+
+        Args:
+            key (tuple): The values the path is built from.
+            build: Callable returning the unsimplified QPainterPath.
+
+        Returns:
+            QPainterPath: The simplified path.
+        """
+        path = self.__paths.get(key)
+        if path is None:
+            if len(self.__paths) >= MAX_CACHED_PATHS:
+                self.__paths.clear()
+            path = build().simplified()
+            self.__paths[key] = path
+        return path
+
+    def rounded_rect_path(self, x_pos: float, y_pos: float, width: float,
+        height: float, roundness: float
+    ) -> QPainterPath:
+        """Returns a simplified rounded rectangle path.
+
+        Args:
+            x_pos (float): The left edge of the rectangle.
+            y_pos (float): The top edge of the rectangle.
+            width (float): The width of the rectangle.
+            height (float): The height of the rectangle.
+            roundness (float): The radius of the rounded corners.
+
+        Returns:
+            QPainterPath: The shared rounded rectangle path.
+        """
+        def build():
+            path = QPainterPath()
+            path.addRoundedRect(x_pos, y_pos, width, height, roundness, roundness)
+            return path
+
+        return self.__cached_path(('rect', x_pos, y_pos, width, height, roundness), build)
+
+    def node_chrome(self, width: float, height: float, title_height: float,
+        roundness: float, selected: bool=False
+    ) -> NodeChrome:
+        """Returns the paths a Node of the given size is drawn from.
+
+        Args:
+            width (float): The width of the Node.
+            height (float): The height of the Node.
+            title_height (float): The height of the Node's title.
+            roundness (float): The radius of the Node's rounded corners.
+            selected (bool): If the selected outline is needed.
+
+        Returns:
+            NodeChrome: The shared title, content and outline paths.
+        """
+        def build_title():
+            path = QPainterPath()
+            path.setFillRule(Qt.WindingFill)
+            path.addRoundedRect(0, 0, width, title_height, roundness, roundness)
+            # square off the bottom corners of the title
+            path.addRect(0, title_height - roundness, roundness, roundness)
+            path.addRect(width - roundness, title_height - roundness, roundness, roundness)
+            return path
+
+        def build_content():
+            path = QPainterPath()
+            path.setFillRule(Qt.WindingFill)
+            path.addRoundedRect(0, title_height, width, height - title_height,
+                roundness, roundness
+            )
+            # square off the top corners of the content below the title
+            path.addRect(0, title_height, roundness, roundness)
+            path.addRect(width - roundness, title_height, roundness, roundness)
+            return path
+
+        return NodeChrome(
+            title=self.__cached_path(
+                ('title', width, title_height, roundness), build_title
+            ),
+            content=self.__cached_path(
+                ('content', width, height, title_height, roundness), build_content
+            ),
+            outline=self.rounded_rect_path(0, 0, width, height, roundness),
+            selected_outline=self.rounded_rect_path(
+                -2, -2, width + 4, height + 4, roundness
+            ) if selected else None,
+        )
+
+    def title_brush(self, width: float, title_height: float) -> QBrush:
+        """Returns the gradient brush of a Node title.
+
+        Args:
+            width (float): The width of the Node.
+            title_height (float): The height of the Node's title.
+
+        Returns:
+            QBrush: The shared gradient brush.
+        """
+        key = (width, title_height)
+        brush = self.__title_brushes.get(key)
+        if brush is None:
+            gradient = QLinearGradient(0, 0, (width*0.8), title_height)
+            gradient.setColorAt(0.0, QColor("#e0098be0"))
+            gradient.setColorAt(1.0, QColor("#FF313131"))
+            brush = QBrush(gradient)
+            self.__title_brushes[key] = brush
+        return brush
+
+    def edge_pens(self, line_width: float) -> EdgePens:
+        """Returns the pens of an Edge with the given line width.
+
+        Args:
+            line_width (float): The default thickness of the Edge's line.
+
+        Returns:
+            EdgePens: The shared Edge pens.
+        """
+        pens = self.__edge_pens.get(line_width)
+        if pens is None:
+            pens = EdgePens(
+                default=QPen(QColor("#adadad")),
+                selected=QPen(QColor("#00ff00")),
+                dragging=QPen(QColor("#adadad")),
+                hovered=QPen(QColor("#adadad")),
+            )
+            pens.dragging.setStyle(Qt.DashLine)
+            pens.default.setWidthF(line_width)
+            pens.selected.setWidthF(line_width + 2.0)
+            pens.dragging.setWidthF(line_width + 2.0)
+            pens.hovered.setWidthF(line_width + 4.0)
+            self.__edge_pens[line_width] = pens
+        return pens
+
+    def socket_style(self, socket_type: int, outline_width: float,
+        poly_outline_width: float
+    ) -> SocketStyle:
+        """Returns the brush and pens of a Socket.
+
+        Args:
+            socket_type (int): The graphics_socket SOCKET_ type.
+            outline_width (float): The thickness of the circle's outline.
+            poly_outline_width (float): The thickness of the arrow's
+                outline.
+
+        Returns:
+            SocketStyle: The shared Socket brush and pens.
+        """
+        key = (socket_type, outline_width, poly_outline_width)
+        style = self.__socket_styles.get(key)
+        if style is None:
+            color = self.socket_colors[socket_type]
+            style = SocketStyle(brush=QBrush(color), pen=QPen(color), poly_pen=QPen(color))
+            style.pen.setWidthF(outline_width)
+            style.poly_pen.setWidthF(poly_outline_width)
+            self.__socket_styles[key] = style
+        return style
+
+    def socket_arrow(self, radius: float, point_length: float) -> QPolygonF:
+        """Returns the direction arrow drawn next to a Socket.
+
+        Args:
+            radius (float): The radius of the Socket's circle.
+            point_length (float): How far the arrow's tip reaches past the
+                circle.
+
+        Returns:
+            QPolygonF: The shared arrow polygon.
+        """
+        key = (radius, point_length)
+        polygon = self.__socket_arrows.get(key)
+        if polygon is None:
+            polygon = QPolygonF()
+            polygon.append(QPointF(radius + (radius/4 * 1.5), -(radius/4 * 2.5)))
+            polygon.append(QPointF(radius + point_length, 0.0))
+            polygon.append(QPointF(radius + (radius/4 * 1.5), (radius/4 * 2.5)))
+            self.__socket_arrows[key] = polygon
+        return polygon
+
+    def socket_glyph(self, shape: SocketShape, socket_type: int, connected: bool,
+        scale: float=1.0
+    ) -> Tuple[QPixmap, QRectF]:
+        """Returns the pre-rendered look of a Socket, to be drawn with one
+        drawPixmap call.
+
+        Every Socket type and state of a shape is rendered into one atlas
+        pixmap per scale, the scale rounded up to a power of two so the
+        glyphs stay sharp without rendering one for every zoom step.
+
+        Args:
+            shape (SocketShape): The dimensions of the Socket.
+            socket_type (int): The graphics_socket SOCKET_ type.
+            connected (bool): If the Socket has Edges, drawn filled.
+            scale (float): The device pixels per scene unit the glyph is
+                drawn at, i.e. the zoom times the device pixel ratio.
+
+        Returns:
+            Tuple[QPixmap, QRectF]: The atlas, and the area of the glyph in
+                it, to be drawn onto shape.rect().
+        """
+        level = 2.0 ** math.ceil(math.log2(max(scale, MIN_GLYPH_SCALE)))
+        level = min(level, MAX_GLYPH_SCALE)
+        atlas = self.__socket_atlases.get((shape, level))
+        if atlas is None:
+            atlas = self.__render_socket_atlas(shape, level)
+            self.__socket_atlases[(shape, level)] = atlas
+
+        rect = shape.rect()
+        cell_width = math.ceil(rect.width() * level)
+        cell_height = math.ceil(rect.height() * level)
+        column = sorted(self.socket_colors).index(socket_type)
+        source = QRectF(column * cell_width, int(connected) * cell_height,
+            rect.width() * level, rect.height() * level
+        )
+        return atlas, source
+
+    def __render_socket_atlas(self, shape: SocketShape, level: float) -> QPixmap:
+        """Renders every Socket type, unconnected and connected, into one
+        pixmap with a column per type and a row per state.
+
+        Args:
+            shape (SocketShape): The dimensions of the Sockets.
+            level (float): The device pixels per scene unit to render at.
+
+        Returns:
+            QPixmap: The transparent atlas.
+        """
+        rect = shape.rect()
+        cell_width = math.ceil(rect.width() * level)
+        cell_height = math.ceil(rect.height() * level)
+        socket_types = sorted(self.socket_colors)
+        arrow = self.socket_arrow(shape.radius, shape.point_length)
+        circle = QRectF(-shape.radius, -shape.radius, shape.radius * 2, shape.radius * 2)
+
+        atlas = QPixmap(cell_width * len(socket_types), cell_height * 2)
+        atlas.fill(Qt.transparent)
+        painter = QPainter(atlas)
+        painter.setRenderHint(QPainter.Antialiasing)
+        for column, socket_type in enumerate(socket_types):
+            style = self.socket_style(socket_type, shape.outline_width, shape.poly_outline_width)
+            for row, connected in enumerate((False, True)):
+                painter.save()
+                painter.translate(column * cell_width, row * cell_height)
+                painter.scale(level, level)
+                painter.translate(-rect.left(), -rect.top())
+
+                # either a hollow circle or filled depending on if connected
+                painter.setPen(style.pen)
+                painter.setBrush(style.brush if connected else self.socket_empty_brush)
+                painter.drawEllipse(circle)
+
+                # the direction arrow
+                painter.setPen(style.poly_pen)
+                painter.setBrush(style.brush)
+                painter.drawPolygon(arrow)
+                painter.restore()
+        painter.end()
+        return atlas
+
+    @property
+    def feedback_icons(self) -> QPixmap:
+        """QPixmap: The status icon sprite sheet of the popups, loaded the
+        first time it is needed.
+        """
+        if self.__feedback_icons is None:
+            self.__feedback_icons = QPixmap("icons/status_icons.png")
+        return self.__feedback_icons
+
+    def clear_cache(self):
+        """Drops all of the prebuilt paths, brushes and pens so they are
+        built again from the current colors.
+        """
+        self.__paths.clear()
+        self.__title_brushes.clear()
+        self.__edge_pens.clear()
+        self.__socket_styles.clear()
+        self.__socket_arrows.clear()
+        self.__socket_atlases.clear()
+
+
+
+_THEME: Theme = None
+
+
+def current_theme() -> Theme:
+    """Returns the Theme shared by all of the graphics items, creating it
+    the first time it is needed.
+
+    Returns:
+        Theme: The shared Theme.
+    """
+    # pylint: disable=global-statement
+    # Reasoning: The Theme is created lazily, after the QApplication.
+    global _THEME
+    if _THEME is None:
+        _THEME = Theme()
+    return _THEME
+
+
+def set_theme(theme: Theme):
+    """Replaces the shared Theme used by graphics items created afterwards.
+
+    Args:
+        theme (Theme): The new shared Theme.
+    """
+    # pylint: disable=global-statement
+    # Reasoning: Replacing the shared Theme is the point of the function.
+    global _THEME
+    _THEME = theme
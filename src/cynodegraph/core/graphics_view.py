@@ -5,16 +5,21 @@ from __future__ import annotations
 
 from typing import List
 
-from PyQt5.QtWidgets import QGraphicsView, QApplication
-from PyQt5.QtCore import pyqtSignal, Qt
-from PyQt5.QtGui import QPainter
+from PyQt5.QtWidgets import QGraphicsView, QApplication, QFileDialog
+from PyQt5.QtCore import pyqtSignal, QRectF, Qt
+from PyQt5.QtGui import QColor, QPainter, QPen
 
+from cynodegraph.core import clipboard
+from cynodegraph.core import critical_path
 from cynodegraph.core import graphics_cutline
 from cynodegraph.core import graphics_edge
 from cynodegraph.core import graphics_socket
+from cynodegraph.core import graphics_theme
 from cynodegraph.core import logparams
+from cynodegraph.core import node_dag
 from cynodegraph.core import node_edge
 from cynodegraph.core import guifeedback
+from cynodegraph.core import node_scene
 
 
 
@@ -30,12 +35,17 @@ EDGE_DRAG_START_THRESHOLD = 10
 # TODO: Clean and document
 class NodeEditorGraphicsView(QGraphicsView):
     scene_pos_changed = pyqtSignal(int, int)
+    # pyqtSignal emitted with the visible scene rect when the view scrolls, zooms or resizes
+    viewport_changed = pyqtSignal(QRectF)
 
     def __init__(self, graphics_scene_ref: graphics_scene.GraphicsScene, parent: QWidget=None):
         super().__init__(parent)
 
         self.graphics_scene = graphics_scene_ref
 
+        # restored after the critical path overlay forced full updates
+        self.viewport_update_mode: QGraphicsView.ViewportUpdateMode = QGraphicsView.SmartViewportUpdate
+
         self.__clean_draw_init()
         self.setScene(self.graphics_scene)
 
@@ -60,11 +70,22 @@ class NodeEditorGraphicsView(QGraphicsView):
         # flags
         self.last_hovered_item: QWidget = None
 
+        # only the Nodes in view hold a content widget
+        self.viewport_changed.connect(self.graphics_scene.update_content_widgets)
+
+        # critical path overlay
+        self.critical_path_nodes: List['Node'] = []
+        self._pen_critical_path: QPen = QPen(QColor("#FFFF4040"))
+        self._pen_critical_path.setWidthF(4.0)
+
 
     def __clean_draw_init(self):
         # clean up drawing ugliness
         self.setRenderHints(QPainter.Antialiasing | QPainter.HighQualityAntialiasing | QPainter.TextAntialiasing | QPainter.SmoothPixmapTransform)
-        self.setViewportUpdateMode(QGraphicsView.FullViewportUpdate)
+        # every item reports its exact bounds, so only what changed is repainted
+        self.setViewportUpdateMode(self.viewport_update_mode)
+        # the grid is redrawn only when zooming, panning reuses it
+        self.setCacheMode(QGraphicsView.CacheBackground)
         self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
         self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
         self.setTransformationAnchor(QGraphicsView.AnchorUnderMouse)
@@ -75,6 +96,14 @@ class NodeEditorGraphicsView(QGraphicsView):
     def __get_item_at_click(self, event) -> QGraphicsItem:
         pos = event.pos()
         obj = self.itemAt(pos)
+        if obj is None:
+            # edges drawn by the edge layer are hidden from itemAt, the
+            # edge index still finds them
+            edges = self.graphics_scene.edges_at(self.mapToScene(pos))
+            if edges:
+                obj = edges[0]
+                if self.graphics_scene.edge_layer is not None:
+                    self.graphics_scene.edge_layer.promote(obj)
         return obj
 
     # guifeedback popups
@@ -113,9 +142,11 @@ class NodeEditorGraphicsView(QGraphicsView):
             p1 = self.cutline.line_points[ix]
             p2 = self.cutline.line_points[ix + 1]
 
-            for edge in self.graphics_scene.scene.edges:
-                if edge.graphics_edge.intersects_with(p1, p2):
-                    edge.remove()
+            # only the edges near the segment are tested
+            nearby = self.graphics_scene.edges_near(QRectF(p1, p2).normalized())
+            for item in nearby:
+                if item.edge.graphics_edge is item and item.intersects_with(p1, p2):
+                    item.edge.remove()
 
     def delete_selected(self):
         for item in self.graphics_scene.selectedItems():
@@ -184,6 +215,89 @@ class NodeEditorGraphicsView(QGraphicsView):
         logparams.logging.debug(" - FAIL: edge not attached. Return False")
         return False
 
+    def clipboard_action(self, key: int):
+        """Copies, cuts, pastes or duplicates for Ctrl+C, X, V or D.
+
+        Pastes go where the mouse last was.
+
+        Args:
+            key (int): The Qt key pressed with Ctrl.
+        """
+        scene = self.graphics_scene.scene
+        if key == Qt.Key_C:
+            clipboard.copy_selection(scene)
+        elif key == Qt.Key_X:
+            clipboard.cut_selection(scene)
+        elif key == Qt.Key_V:
+            pos = getattr(self, 'last_scene_mouse_position', None)
+            clipboard.paste(scene, None if pos is None else (pos.x(), pos.y()))
+        elif key == Qt.Key_D:
+            clipboard.duplicate_selection(scene)
+
+    def visible_scene_rect(self) -> QRectF:
+        """Returns the part of the scene shown in the viewport."""
+        return self.mapToScene(self.viewport().rect()).boundingRect()
+
+    def save_scene(self, save_as: bool=False) -> bool:
+        """Saves the scene to its file, asking for one if it has none.
+
+        The file is written on a worker thread, see Scene.save_in_background().
+
+        Args:
+            save_as (bool): Flag for if a new file should always be asked for.
+
+        Returns:
+            bool: True if the save was started.
+        """
+        scene = self.graphics_scene.scene
+        filename = scene.filename
+        if filename is None or save_as:
+            filename, _ = QFileDialog.getSaveFileName(self, "Save Scene", "", node_scene.FILE_FILTER)
+            if not filename:
+                return False
+        scene.save_in_background(filename)
+        return True
+
+    def load_scene(self) -> bool:
+        """Asks for a scene file and loads it.
+
+        Returns:
+            bool: True if a scene was loaded.
+        """
+        filename, _ = QFileDialog.getOpenFileName(self, "Load Scene", "", node_scene.FILE_FILTER)
+        if not filename:
+            return False
+        try:
+            self.graphics_scene.scene.load_from_file(filename)
+        except (OSError, ValueError, KeyError, TypeError):
+            logparams.logging.exception("Exception occurred")
+            return False
+        return True
+
+    def show_critical_path(self) -> critical_path.CriticalPath:
+        """Highlights the critical path of the scene in an overlay.
+
+        The path is computed from the run times measured by the scene's
+        runtime profile.
+
+        Returns:
+            CriticalPath: The analysis the overlay was drawn from.
+        """
+        scene = self.graphics_scene.scene
+        analysis = critical_path.analyze(node_dag.compile_scene(scene, scene.runtime_profile))
+        nodes_by_id = {node.id: node for node in scene.nodes}
+        self.critical_path_nodes = [nodes_by_id[node_id] for node_id in analysis.path]
+        # the overlay follows moving Nodes, which only full updates repaint
+        self.setViewportUpdateMode(QGraphicsView.FullViewportUpdate)
+        self.viewport().update()
+        return analysis
+
+    def hide_critical_path(self):
+        """Removes the critical path overlay."""
+        self.critical_path_nodes = []
+        self.setViewportUpdateMode(self.viewport_update_mode)
+        self.viewport().update()
+
     def distance_between_click_and_release_is_off(self, event) -> bool:
         new_lmb_release_scene_pos = self.mapToScene(event.pos())
         dist_scene = new_lmb_release_scene_pos - self.last_lmb_click_scene_pos
@@ -199,6 +313,30 @@ class NodeEditorGraphicsView(QGraphicsView):
     # Overloaded Methods
     # ------------------
 
+    def drawForeground(self, painter, rect):
+        super().drawForeground(painter, rect)
+
+        # critical path overlay
+        if not self.critical_path_nodes:
+            return
+        painter.setBrush(Qt.NoBrush)
+        painter.setPen(self._pen_critical_path)
+        for index, node in enumerate(self.critical_path_nodes):
+            if node.graphics_node is None:
+                continue
+            bounds = node.graphics_node.sceneBoundingRect().adjusted(-4, -4, 4, 4)
+            if bounds.intersects(rect):
+                roundness = node.graphics_node.edge_roundness
+                painter.drawRoundedRect(bounds, roundness, roundness)
+
+            if index + 1 < len(self.critical_path_nodes):
+                next_node = self.critical_path_nodes[index + 1]
+                for socket in node.outputs:
+                    for edge in socket.edges:
+                        other_socket = edge.get_other_socket(socket)
+                        if other_socket is not None and other_socket.node is next_node:
+                            painter.drawPath(edge.graphics_edge.path())
+
     def dragEnterEvent(self, event):
         for callback in self._drag_enter_listeners: callback(event)
 
@@ -319,8 +457,7 @@ class NodeEditorGraphicsView(QGraphicsView):
 
         if self.mode == MODE_EDGE_CUT:
             self.cut_intersecting_edges()
-            self.cutline.line_points = []
-            self.cutline.update()
+            self.cutline.clear_points()
             QApplication.setOverrideCursor(Qt.ArrowCursor)
             self.mode = MODE_NOOP
             return
@@ -328,6 +465,8 @@ class NodeEditorGraphicsView(QGraphicsView):
 
         if self.rubber_band_dragging_rectangle:
             self.rubber_band_dragging_rectangle = False
+            if self.graphics_scene.edge_layer is not None:
+                self.graphics_scene.edge_layer.demote_all()
             current_selected_items = self.graphics_scene.selectedItems()
 
             if current_selected_items != self.graphics_scene.scene._last_selected_items:
@@ -357,18 +496,26 @@ class NodeEditorGraphicsView(QGraphicsView):
         if self.mode == MODE_EDGE_DRAG:
             pos = self.mapToScene(event.pos())
             self.drag_edge.graphics_edge.set_destination(pos.x(), pos.y())
-            self.drag_edge.graphics_edge.update()
 
             # socket connection warning popups
             self.__socket_connection_warnings(event)
         elif self.mode == MODE_EDGE_CUT:
             pos = self.mapToScene(event.pos())
-            self.cutline.line_points.append(pos)
-            self.cutline.update()
+            self.cutline.add_point(pos)
         else:
             # reset the guifeedback if no current operations use it
             self.graphics_scene.guifeedback.reset()
 
+            # edges drawn by the edge layer are shown by themselves again
+            # under the mouse or the rubber band, so they can be hovered
+            # and selected
+            edge_layer = self.graphics_scene.edge_layer
+            if edge_layer is not None:
+                if self.rubber_band_dragging_rectangle:
+                    edge_layer.promote_in(self.mapToScene(self.rubberBandRect()).boundingRect())
+                else:
+                    edge_layer.hover_at(self.mapToScene(event.pos()))
+
         self.last_scene_mouse_position = self.mapToScene(event.pos())
 
         self.scene_pos_changed.emit(
@@ -394,9 +541,13 @@ class NodeEditorGraphicsView(QGraphicsView):
             else:
                 super().keyPressEvent(event)
         elif event.key() == Qt.Key_S and event.modifiers() & Qt.ControlModifier:
-            pass
+            self.save_scene(save_as=bool(event.modifiers() & Qt.ShiftModifier))
         elif event.key() == Qt.Key_L and event.modifiers() & Qt.ControlModifier:
-            pass
+            self.load_scene()
+        elif (event.key() in (Qt.Key_C, Qt.Key_X, Qt.Key_V, Qt.Key_D) and
+            event.modifiers() & Qt.ControlModifier and not self.editing_flag
+        ):
+            self.clipboard_action(event.key())
         elif event.key() == Qt.Key_Z and event.modifiers() & Qt.ControlModifier and not event.modifiers() & Qt.ShiftModifier:
             pass
         elif event.key() == Qt.Key_Z and event.modifiers() & Qt.ControlModifier and event.modifiers() & Qt.ShiftModifier:
@@ -427,3 +578,15 @@ class NodeEditorGraphicsView(QGraphicsView):
         # set scene scale
         if not clamped or self.zoom_clamp is False:
             self.scale(zoom_factor, zoom_factor)
+            self.graphics_scene.set_detail_level(
+                graphics_theme.current_theme().detail_level(self.transform().m11())
+            )
+            self.viewport_changed.emit(self.visible_scene_rect())
+
+    def scrollContentsBy(self, dx, dy):
+        super().scrollContentsBy(dx, dy)
+        self.viewport_changed.emit(self.visible_scene_rect())
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.viewport_changed.emit(self.visible_scene_rect())
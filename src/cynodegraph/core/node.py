@@ -3,7 +3,8 @@
 from __future__ import generator_stop
 from __future__ import annotations
 
-from typing import List
+import uuid
+from typing import Any, Dict, List
 
 from PyQt5.QtCore import QPointF
 
@@ -33,7 +34,8 @@ class Node:
         scene (Scene): Reference to Scene object that the Node is drawn
             on(child of).
         title (str): The display title of the Node.
-        content (NodeContentWidget): The content of the Node.
+        content (NodeContentWidget): The content widget currently shown on
+            the Node, None while the Node is off-screen or zoomed out.
         graphics_node (GraphicsNode): The child GraphicsNode used to display
             the Node.
         inputs (List[Socket]): A List of the Node's input Sockets.
@@ -53,8 +55,27 @@ class Node:
             multi-edge.
         output_multi_edged (bool): Flag for if the output Sockets are
             multi-edge.
+        id (str): A unique identifier of the Node that stays the same for
+            the life of the graph.
+        params (Dict): The Node's parameters that are handed to its kernel.
+        kernel (str): Class attribute holding the import path
+            ("package.module:function") of the function that evaluates the
+            Node. The function is called as kernel(inputs, params) and
+            returns a List with a value for each output Socket. When None
+            the inputs are passed through to the outputs.
+        cost_hint (float): Class attribute estimating the seconds the
+            kernel takes, used until the Node has been profiled.
+        output_size_hint (float): Class attribute estimating the bytes of
+            the Node's outputs, used until the Node has been profiled.
+        content_class (type): Class attribute with the NodeContentWidget
+            subclass shown on the Node. Widgets are pooled per class.
     """
 
+    kernel: str = None
+    cost_hint: float = None
+    output_size_hint: float = None
+    content_class: type = node_content_widget.NodeContentWidget
+
     # pylint: disable=too-many-instance-attributes
     # Reasoning: All the attributes are needed and used.
     # pylint: disable=too-many-public-methods
@@ -65,11 +86,11 @@ class Node:
     ):
         self.scene: node_scene.Scene = scene
         self.title: str = title
+        self.id: str = uuid.uuid4().hex
+        self.params: Dict = {}
         # TODO: Check if this can safely be removed
         #self.node_type = None
 
-        self.content: node_content_widget.NodeContentWidget = (
-            node_content_widget.NodeContentWidget(self))
         self.graphics_node: graphics_node.GraphicsNode = graphics_node.GraphicsNode(self)
         self.scene.add_node(self)
         self.scene.graphics_scene.addItem(self.graphics_node)
@@ -90,11 +111,16 @@ class Node:
 
         # create components
         self.__create_sockets(inputs, outputs)
+        self.graphics_node.apply_detail_level(self.scene.graphics_scene.detail_level)
+        self.scene.graphics_scene.request_content_update()
 
-        # dirty and evaluation
-        self._is_dirty: bool = False
+        # dirty and evaluation, a new Node has never been evaluated
+        self._is_dirty: bool = True
         self._is_invalid: bool = False
 
+        if self.scene.is_recording_operations:
+            self.scene.record_operation(node_scene.OP_NODE_ADD, self.serialize())
+
 
 
     def __create_sockets(self, inputs: List[int], outputs: List[int], reset: bool=True):
@@ -149,6 +175,13 @@ class Node:
 
 
 
+    @property
+    def content(self) -> node_content_widget.NodeContentWidget:
+        """NodeContentWidget: The content widget currently shown on the
+        Node, None while the Node is off-screen or zoomed out.
+        """
+        return self.graphics_node.content
+
     @property
     def pos(self) -> QPointF:
         """QPointF: Returns the Node's graphical position.
@@ -163,6 +196,74 @@ class Node:
             y_pos (int): The new y position.
         """
         self.graphics_node.setPos(x_pos, y_pos)
+        self.on_moved()
+
+    def on_moved(self):
+        """Reports the Node's new position to the Scene."""
+        pos = self.pos
+        self.scene.record_operation(node_scene.OP_NODE_MOVE, {'id': self.id, 'pos': [pos.x(), pos.y()]})
+
+    def set_title(self, title: str):
+        """Renames the Node and reports it to the Scene.
+
+        Args:
+            title (str): The new title.
+        """
+        self.title = title
+        self.graphics_node.title = title
+        self.scene.record_operation(node_scene.OP_NODE_TITLE, {'id': self.id, 'title': title})
+
+    def set_param(self, name: str, value: Any):
+        """Sets one of the Node's parameters.
+
+        The Node and its descendants are marked dirty, since their outputs
+        depend on it.
+
+        Args:
+            name (str): The name of the parameter.
+            value (Any): The new value, plain data that can be saved.
+        """
+        self.params[name] = value
+        self.scene.record_operation(node_scene.OP_PARAM, {'id': self.id, 'name': name, 'value': value})
+        self.mark_dirty()
+        self.mark_descendants_dirty()
+
+    def serialize(self) -> Dict:
+        """Returns the Node as plain data, see scene_json.
+
+        Returns:
+            Dict: The Node's id, class, title, position, parameters and
+                Sockets.
+        """
+        pos = self.pos
+        return {
+            'id': self.id,
+            'class': f"{type(self).__module__}:{type(self).__qualname__}",
+            'title': self.title,
+            'pos': [pos.x(), pos.y()],
+            'params': dict(self.params),
+            'inputs': [socket.serialize() for socket in self.inputs],
+            'outputs': [socket.serialize() for socket in self.outputs],
+        }
+
+    def deserialize(self, data: Dict):
+        """Restores the state from the data of serialize().
+
+        The Node has to be created with the same Sockets, see
+        scene_json.create_node().
+
+        Args:
+            data (Dict): The Node's data.
+        """
+        self.id = data['id']
+        self.title = data['title']
+        self.graphics_node.title = self.title
+        self.params = dict(data.get('params', {}))
+        self.set_pos(*data['pos'])
+        for socket, socket_data in zip(self.inputs, data['inputs']):
+            socket.deserialize(socket_data)
+        for socket, socket_data in zip(self.outputs, data['outputs']):
+            socket.deserialize(socket_data)
 
 
     def on_edge_connection_changed(self, new_edge: node_edge.Edge):
@@ -283,11 +384,13 @@ class Node:
         logparams.logging.info(f"> Removing Node: {self}")
         logparams.logging.debug(" - remove all edges from sockets")
         for socket in self.inputs + self.outputs:
-            # if socket.hasEdge():
-            for edge in socket.edges:
+            # edge.remove() takes the edge out of socket.edges
+            for edge in list(socket.edges):
                 logparams.logging.debug(f"    - removing from socket: {socket}\tedge: {edge}")
                 edge.remove()
+        self.scene.record_operation(node_scene.OP_NODE_REMOVE, {'id': self.id})
         logparams.logging.debug(" - remove grNode")
+        self.scene.graphics_scene.release_content(self.graphics_node)
         self.scene.graphics_scene.removeItem(self.graphics_node)
         self.graphics_node = None
         logparams.logging.debug(" - remove node from the scene")
@@ -3,13 +3,32 @@
 from __future__ import generator_stop
 from __future__ import annotations
 
-from PyQt5.QtWidgets import QLabel, QPushButton, QWidget, QVBoxLayout
+import collections
+from typing import Dict, List
+
+from PyQt5.QtWidgets import QGraphicsProxyWidget, QLabel, QPushButton, QWidget, QVBoxLayout
+from PyQt5.QtGui import QPixmap
 
 from cynodegraph.core import node
 
 
 
 class NodeContentWidget(QWidget):
+    """The widget shown in the content area of a Node.
+
+    Widgets are pooled and moved between Nodes of the same class, so a
+    subclass keeps its state in the Node (e.g. Node.params) and loads it
+    in bind().
+
+    Args:
+        node_ref (Node): The Node the widget is first shown on.
+        parent (QWidget): The parent QWidget of the content widget.
+
+    Attributes:
+        node (Node): The Node the widget is currently shown on, None while
+            it waits in the pool.
+    """
+
     def __init__(self, node_ref: node.Node, parent: QWidget=None):
         super().__init__(parent)
 
@@ -29,5 +48,144 @@ class NodeContentWidget(QWidget):
 
 
 
+    def bind(self, node_ref: node.Node):
+        """Shows the widget on a Node.
+
+        Args:
+            node_ref (Node): The Node the widget is shown on.
+        """
+        self.node = node_ref
+
+    def unbind(self):
+        """Takes the widget off its Node before it goes back to the pool.
+        """
+        self.node = None
+
     def button_state(self):
         print("button pressed")
+
+
+
+class ContentWidgetPool:
+    """Reuses the QGraphicsProxyWidgets wrapping the Nodes' content
+    widgets.
+
+    Proxy widgets are some of the most expensive items of a
+    QGraphicsScene, so only the Nodes on screen hold one. A Node scrolled
+    away hands its proxy back here and the next Node of the same
+    content_class to come into view takes it over.
+
+    The last look of a released widget is kept as a snapshot, drawn by
+    the Node until it gets a widget again. Only the most recently
+    released snapshots are kept.
+
+    Args:
+        max_free (int): The most unused proxies kept per content class.
+        max_snapshots (int): The most snapshots kept.
+
+    Attributes:
+        max_free (int): The most unused proxies kept per content class.
+        max_snapshots (int): The most snapshots kept.
+        widgets_created (int): How many content widgets have been made.
+    """
+
+    def __init__(self, max_free: int=64, max_snapshots: int=128):
+        self.max_free: int = max_free
+        self.max_snapshots: int = max_snapshots
+        self.widgets_created: int = 0
+        self.__free: Dict[type, List[QGraphicsProxyWidget]] = {}
+        self.__snapshots: collections.OrderedDict = collections.OrderedDict()
+
+    def acquire(self, node_ref: node.Node) -> QGraphicsProxyWidget:
+        """Returns a proxy with a content widget bound to a Node, reusing
+        a pooled one if there is one.
+
+        Args:
+            node_ref (Node): The Node the content is shown on.
+
+        Returns:
+            QGraphicsProxyWidget: The proxy wrapping the content widget.
+        """
+        # the live widget replaces the snapshot
+        self.__snapshots.pop(node_ref, None)
+        free = self.__free.get(node_ref.content_class)
+        if free:
+            proxy = free.pop()
+            proxy.widget().bind(node_ref)
+        else:
+            proxy = QGraphicsProxyWidget()
+            proxy.setWidget(node_ref.content_class(node_ref))
+            self.widgets_created += 1
+        return proxy
+
+    def release(self, proxy: QGraphicsProxyWidget):
+        """Takes a proxy off its Node and keeps it for reuse.
+
+        Args:
+            proxy (QGraphicsProxyWidget): The proxy to give back.
+        """
+        widget = proxy.widget()
+        if widget.node is not None and self.max_snapshots > 0:
+            self.__snapshots[widget.node] = widget.grab()
+            self.__snapshots.move_to_end(widget.node)
+            if len(self.__snapshots) > self.max_snapshots:
+                self.__snapshots.popitem(last=False)
+        widget.unbind()
+        proxy.setParentItem(None)
+        if proxy.scene() is not None:
+            proxy.scene().removeItem(proxy)
+
+        free = self.__free.setdefault(type(widget), [])
+        if len(free) < self.max_free:
+            free.append(proxy)
+        else:
+            proxy.deleteLater()
+
+    def snapshot(self, node_ref: node.Node) -> QPixmap:
+        """Returns the last look of a Node's released content widget.
+
+        Args:
+            node_ref (Node): The Node the widget was shown on.
+
+        Returns:
+            QPixmap: The snapshot, None if it is not kept.
+        """
+        snapshot = self.__snapshots.get(node_ref)
+        if snapshot is not None:
+            self.__snapshots.move_to_end(node_ref)
+        return snapshot
+
+    def forget(self, node_ref: node.Node):
+        """Drops the snapshot of a Node, e.g. when it is removed.
+
+        Args:
+            node_ref (Node): The Node to forget.
+        """
+        self.__snapshots.pop(node_ref, None)
+
+    def clear(self):
+        """Deletes all of the unused proxies and the snapshots."""
+        for free in self.__free.values():
+            for proxy in free:
+                proxy.deleteLater()
+        self.__free.clear()
+        self.__snapshots.clear()
+
+
+
+_POOL: ContentWidgetPool = None
+
+
+def content_pool() -> ContentWidgetPool:
+    """Returns the ContentWidgetPool shared by all of the Scenes, creating
+    it the first time it is needed.
+
+    Returns:
+        ContentWidgetPool: The shared pool.
+    """
+    # pylint: disable=global-statement
+    # Reasoning: The pool is created lazily, after the QApplication.
+    global _POOL
+    if _POOL is None:
+        _POOL = ContentWidgetPool()
+    return _POOL
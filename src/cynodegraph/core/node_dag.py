@@ -0,0 +1,432 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=no-name-in-module
+from __future__ import generator_stop
+from __future__ import annotations
+
+import hashlib
+import importlib
+import json
+import pickle
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from cynodegraph.core import logparams
+
+
+
+#: Cache of the kernels already imported by resolve_kernel()
+_KERNELS: Dict[str, Callable] = {}
+
+
+
+class EvaluationError(Exception):
+    """Raised when a Node's kernel fails during evaluation.
+
+    Args:
+        node_id (str): The id of the Node that failed.
+        message (str): Description of the failure.
+        results (Dict[str, List]): The outputs of the Nodes that finished
+            before the failure.
+    """
+
+    def __init__(self, node_id: str, message: str, results: Dict[str, List]=None):
+        super().__init__(f"Node {node_id}: {message}")
+        self.node_id: str = node_id
+        self.results: Dict[str, List] = results if results is not None else {}
+
+
+
+@dataclass
+class DagNode:
+    """A plain data copy of a Node which can be evaluated without Qt.
+
+    Attributes:
+        node_id (str): The id of the Node this was compiled from.
+        kernel (str): The import path of the Node's kernel.
+        params (Dict): The parameters handed to the kernel.
+        inputs (List[List[Tuple[str, int]]]): For each input Socket the
+            (node_id, output index) pairs of the upstream outputs connected
+            to it.
+        multi_inputs (List[bool]): For each input Socket if it is multi-edge.
+        num_outputs (int): The number of output Sockets.
+        content_hash (str): Hash of the kernel, the parameters and the
+            content hashes of everything upstream.
+        cost (float): The estimated seconds the kernel takes to run.
+        output_size (float): The estimated bytes of the node's outputs.
+    """
+    node_id: str
+    kernel: str = None
+    params: Dict = field(default_factory=dict)
+    inputs: List[List[Tuple[str, int]]] = field(default_factory=list)
+    multi_inputs: List[bool] = field(default_factory=list)
+    num_outputs: int = 0
+    content_hash: str = ''
+    cost: float = 1.0
+    output_size: float = 1.0
+
+
+    @property
+    def upstream(self) -> List[str]:
+        """List[str]: The ids of the Nodes feeding this one, no repeats."""
+        seen = []
+        for socket_inputs in self.inputs:
+            for node_id, _ in socket_inputs:
+                if node_id not in seen:
+                    seen.append(node_id)
+        return seen
+
+
+
+class CompiledGraph:
+    """The evaluation DAG of a Scene in topological order.
+
+    Nodes may reference upstream ids that are not part of the graph, those
+    are treated as external inputs whose values are supplied to evaluate().
+
+    Args:
+        nodes (Iterable[DagNode]): The nodes of the graph.
+
+    Attributes:
+        nodes (Dict[str, DagNode]): The nodes of the graph by id.
+        children (Dict[str, List[str]]): The downstream ids for each node.
+        order (List[str]): The node ids in topological order.
+
+    Raises:
+        ValueError: If the graph contains a cycle.
+    """
+
+    def __init__(self, nodes: Iterable[DagNode]):
+        self.nodes: Dict[str, DagNode] = {dag_node.node_id: dag_node for dag_node in nodes}
+        self.children: Dict[str, List[str]] = {node_id: [] for node_id in self.nodes}
+        for dag_node in self.nodes.values():
+            for parent_id in dag_node.upstream:
+                if parent_id in self.children:
+                    self.children[parent_id].append(dag_node.node_id)
+
+        self.order: List[str] = self.__topological_order()
+        self.__compute_hashes()
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def __topological_order(self) -> List[str]:
+        """Kahn's algorithm over the internal edges of the graph."""
+        in_degree = {
+            node_id: sum(1 for parent_id in dag_node.upstream if parent_id in self.nodes)
+            for node_id, dag_node in self.nodes.items()
+        }
+        ready = [node_id for node_id, degree in in_degree.items() if degree == 0]
+        order = []
+        while ready:
+            node_id = ready.pop()
+            order.append(node_id)
+            for child_id in self.children[node_id]:
+                in_degree[child_id] -= 1
+                if in_degree[child_id] == 0:
+                    ready.append(child_id)
+
+        if len(order) != len(self.nodes):
+            raise ValueError("The graph contains a cycle and can not be evaluated")
+        return order
+
+    def __compute_hashes(self):
+        """Fills in the content hash of every node that does not have one."""
+        for node_id in self.order:
+            dag_node = self.nodes[node_id]
+            if dag_node.content_hash:
+                continue
+            upstream = [
+                [
+                    (self.nodes[parent_id].content_hash if parent_id in self.nodes else parent_id, index)
+                    for parent_id, index in socket_inputs
+                ]
+                for socket_inputs in dag_node.inputs
+            ]
+            payload = json.dumps(
+                [dag_node.kernel, dag_node.params, upstream, dag_node.num_outputs],
+                sort_keys=True, default=repr
+            )
+            dag_node.content_hash = hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def external_inputs(self) -> List[str]:
+        """Returns the ids of upstream nodes that are not part of the graph.
+
+        Returns:
+            List[str]: The external node ids.
+        """
+        external = []
+        for node_id in self.order:
+            for parent_id in self.nodes[node_id].upstream:
+                if parent_id not in self.nodes and parent_id not in external:
+                    external.append(parent_id)
+        return external
+
+    def subgraph(self, node_ids: Iterable[str]) -> CompiledGraph:
+        """Returns the graph made of only the given nodes.
+
+        Args:
+            node_ids (Iterable[str]): The ids of the nodes to keep.
+
+        Returns:
+            CompiledGraph: The subgraph, with the content hashes kept.
+        """
+        keep = set(node_ids)
+        return CompiledGraph(self.nodes[node_id] for node_id in self.order if node_id in keep)
+
+
+
+class RuntimeProfile:
+    """The measured run time and output size of Nodes, smoothed over runs.
+
+    Args:
+        smoothing (float): The weight given to the newest measurement.
+
+    Attributes:
+        seconds (Dict[str, float]): The smoothed run time of each node id.
+        sizes (Dict[str, float]): The smoothed output bytes of each node id.
+    """
+
+    def __init__(self, smoothing: float=0.5):
+        self.smoothing: float = smoothing
+        self.seconds: Dict[str, float] = {}
+        self.sizes: Dict[str, float] = {}
+
+    def record(self, timings: Dict[str, float], sizes: Dict[str, float]=None):
+        """Folds the measurements of one run into the profile.
+
+        Args:
+            timings (Dict[str, float]): The seconds each node took.
+            sizes (Dict[str, float]): The output bytes of each node.
+        """
+        for measured, store in ((timings, self.seconds), (sizes or {}, self.sizes)):
+            for node_id, value in measured.items():
+                if node_id in store:
+                    store[node_id] += self.smoothing * (value - store[node_id])
+                else:
+                    store[node_id] = value
+
+    def forget(self, node_id: str):
+        """Drops the measurements of a node."""
+        self.seconds.pop(node_id, None)
+        self.sizes.pop(node_id, None)
+
+
+
+def compile_scene(scene: 'Scene', profile: RuntimeProfile=None) -> CompiledGraph:
+    """Builds the evaluation DAG from the model classes of a Scene.
+
+    Only the Node, Socket and Edge objects are read, so the result can be
+    shipped to processes that never load the Qt graphics layer.
+
+    The cost and output size of each node come from the profile when it
+    has measured the node, otherwise from the Node's cost_hint and
+    output_size_hint, otherwise they default to 1.
+
+    Args:
+        scene (Scene): The Scene to compile.
+        profile (RuntimeProfile): Measurements from earlier runs.
+
+    Returns:
+        CompiledGraph: The compiled graph.
+    """
+    seconds = profile.seconds if profile is not None else {}
+    sizes = profile.sizes if profile is not None else {}
+
+    dag_nodes = []
+    for node_obj in scene.nodes:
+        inputs = []
+        for socket in node_obj.inputs:
+            socket_inputs = []
+            for edge in socket.edges:
+                other_socket = edge.get_other_socket(socket)
+                if other_socket is not None:
+                    socket_inputs.append((other_socket.node.id, other_socket.index))
+            inputs.append(socket_inputs)
+
+        dag_nodes.append(DagNode(
+            node_id=node_obj.id,
+            kernel=node_obj.kernel,
+            params=dict(node_obj.params),
+            inputs=inputs,
+            multi_inputs=[socket.is_multi_edges for socket in node_obj.inputs],
+            num_outputs=len(node_obj.outputs),
+            cost=seconds.get(node_obj.id, 1.0 if node_obj.cost_hint is None else node_obj.cost_hint),
+            output_size=sizes.get(node_obj.id, 1.0 if node_obj.output_size_hint is None else node_obj.output_size_hint),
+        ))
+
+    return CompiledGraph(dag_nodes)
+
+def resolve_kernel(path: str) -> Callable:
+    """Imports the kernel function for an import path.
+
+    Args:
+        path (str): Path of the form "package.module:function".
+
+    Returns:
+        Callable: The kernel function.
+    """
+    if path not in _KERNELS:
+        module_name, _, qualname = path.partition(':')
+        target = importlib.import_module(module_name)
+        for attribute in qualname.split('.'):
+            target = getattr(target, attribute)
+        _KERNELS[path] = target
+    return _KERNELS[path]
+
+def gather_inputs(dag_node: DagNode, values: Dict[str, List]) -> List:
+    """Collects the input values of a node from the upstream outputs.
+
+    Multi-edge input Sockets receive a List of every connected value, the
+    others receive the connected value or None.
+
+    Args:
+        dag_node (DagNode): The node to collect the inputs for.
+        values (Dict[str, List]): The outputs of the evaluated nodes.
+
+    Returns:
+        List: A value for each input Socket.
+    """
+    inputs = []
+    for socket_inputs, is_multi in zip(dag_node.inputs, dag_node.multi_inputs):
+        connected = [values[node_id][index] for node_id, index in socket_inputs]
+        if is_multi:
+            inputs.append(connected)
+        else:
+            inputs.append(connected[0] if connected else None)
+    return inputs
+
+def run_node(dag_node: DagNode, inputs: List) -> List:
+    """Runs the kernel of a single node.
+
+    A node without a kernel passes input i through to output i, or None if
+    there is no such input.
+
+    Args:
+        dag_node (DagNode): The node to run.
+        inputs (List): A value for each input Socket.
+
+    Returns:
+        List: A value for each output Socket.
+
+    Raises:
+        EvaluationError: If the kernel raises or returns the wrong number
+            of outputs.
+    """
+    if dag_node.kernel is None:
+        return [
+            inputs[index] if index < len(inputs) else None
+            for index in range(dag_node.num_outputs)
+        ]
+
+    try:
+        outputs = list(resolve_kernel(dag_node.kernel)(inputs, dag_node.params))
+    except Exception as error:
+        raise EvaluationError(dag_node.node_id, repr(error)) from error
+
+    if len(outputs) != dag_node.num_outputs:
+        raise EvaluationError(
+            dag_node.node_id,
+            f"kernel returned {len(outputs)} outputs, expected {dag_node.num_outputs}"
+        )
+    return outputs
+
+def output_size(outputs: List) -> int:
+    """Returns the bytes needed to ship a node's outputs to a worker."""
+    return len(pickle.dumps(outputs, protocol=pickle.HIGHEST_PROTOCOL))
+
+def evaluate(graph: CompiledGraph, values: Dict[str, List]=None,
+    timings: Dict[str, float]=None, sizes: Dict[str, float]=None,
+    on_result: Callable[[str, List], None]=None
+) -> Dict[str, List]:
+    """Evaluates a graph node by node on the calling thread.
+
+    Args:
+        graph (CompiledGraph): The graph to evaluate.
+        values (Dict[str, List]): Outputs that are already known, by node
+            id. Nodes listed here are not run again and external inputs
+            must be listed here.
+        timings (Dict[str, float]): When given, filled with the seconds
+            each node took.
+        sizes (Dict[str, float]): When given, filled with the output bytes
+            of each node.
+        on_result (Callable[[str, List], None]): When given, called with
+            the node id and outputs as soon as each node finishes.
+
+    Returns:
+        Dict[str, List]: The outputs of each node that was run.
+
+    Raises:
+        EvaluationError: If a kernel fails. The outputs computed so far are
+            attached to the error.
+    """
+    known = dict(values) if values is not None else {}
+    results = {}
+    for node_id in graph.order:
+        if node_id in known:
+            continue
+        dag_node = graph.nodes[node_id]
+        start = time.perf_counter()
+        try:
+            outputs = run_node(dag_node, gather_inputs(dag_node, known))
+        except EvaluationError as error:
+            error.results = results
+            raise
+        if timings is not None:
+            timings[node_id] = time.perf_counter() - start
+        if sizes is not None:
+            sizes[node_id] = output_size(outputs)
+        known[node_id] = outputs
+        results[node_id] = outputs
+        if on_result is not None:
+            on_result(node_id, outputs)
+    return results
+
+def apply_results(scene: 'Scene', results: Dict[str, List]):
+    """Stores evaluated outputs on the Sockets of a Scene's Nodes.
+
+    The updated Nodes are marked as neither dirty nor invalid.
+
+    Args:
+        scene (Scene): The Scene the results were compiled from.
+        results (Dict[str, List]): The outputs of each evaluated node.
+    """
+    for node_obj in scene.nodes:
+        if node_obj.id not in results:
+            continue
+        for socket, value in zip(node_obj.outputs, results[node_obj.id]):
+            socket.value = value
+        node_obj.mark_dirty(False)
+        node_obj.mark_invalid(False)
+    logparams.logging.debug(f"Applied the results of {len(results)} nodes")
+
+
+
+class LocalBackend:
+    """Execution backend that evaluates on the calling thread.
+
+    Args:
+        measure_sizes (bool): Flag for if the output sizes should be
+            measured. It costs a pickling of every output.
+
+    Attributes:
+        timings (Dict[str, float]): The seconds each node took to run
+            during the last evaluate().
+        sizes (Dict[str, float]): The output bytes of each node during the
+            last evaluate(), empty unless measure_sizes is set.
+    """
+
+    def __init__(self, measure_sizes: bool=False):
+        self.measure_sizes: bool = measure_sizes
+        self.timings: Dict[str, float] = {}
+        self.sizes: Dict[str, float] = {}
+
+    def evaluate(self, graph: CompiledGraph, values: Dict[str, List]=None,
+        on_result: Callable[[str, List], None]=None
+    ) -> Dict[str, List]:
+        """Evaluates the graph, see the module level evaluate()."""
+        self.timings = {}
+        self.sizes = {}
+        return evaluate(
+            graph, values, self.timings, self.sizes if self.measure_sizes else None, on_result
+        )
@@ -3,6 +3,9 @@
 from __future__ import generator_stop
 from __future__ import annotations
 
+import uuid
+from typing import Dict
+
 from cynodegraph.core import graphics_edge
 from cynodegraph.core import logparams
 from cynodegraph.core import node_scene
@@ -32,6 +35,8 @@ class Edge:
         end_socket (Socket): Reference to the edge's ending Socket.
         edge_type (int): The const deciding the type of line the edge will be.
             Direct or Bezier.
+        id (str): A unique identifier of the Edge that stays the same for
+            the life of the graph.
     """
 
     # pylint: disable=too-many-instance-attributes
@@ -44,6 +49,7 @@ class Edge:
         ):
         """Inits the components needed for the edge to connect to."""
         self.scene: node_scene.Scene = scene
+        self.id: str = uuid.uuid4().hex
 
         # These are the protected Socket class member variables
         self.__start_socket: node_socket.Socket = None
@@ -56,6 +62,11 @@ class Edge:
         self.edge_type: int = edge_type
 
         self.scene.add_edge(self)
+        # Edges still being dragged are not part of the model yet
+        if (self.start_socket is not None and self.end_socket is not None and
+            self.scene.is_recording_operations
+        ):
+            self.scene.record_operation(node_scene.OP_EDGE_ADD, self.serialize())
 
     def __str__(self) -> str:
         """Returns the Edge's python id as hexidecimal."""
@@ -125,6 +136,9 @@ class Edge:
     def edge_type(self, value: int):
         # if the type of edge is being changed remove the old GraphicsEdge
         if hasattr(self, 'graphics_edge') and self.graphics_edge is not None:
+            if self.graphics_edge.layer is not None:
+                self.graphics_edge.layer.remove_edge(self.graphics_edge)
+            self.scene.graphics_scene.edge_index.remove(self.graphics_edge)
             self.scene.graphics_scene.removeItem(self.graphics_edge)
 
         # add the new GraphicsEdge for the edge
@@ -137,9 +151,16 @@ class Edge:
             self.graphics_edge = graphics_edge.GraphicsEdge(self, graphics_edge.EDGE_TYPE_BEZIER)
 
         self.scene.graphics_scene.addItem(self.graphics_edge)
+        # connected edges are drawn by the edge layer, if the scene has one
+        edge_layer = self.scene.graphics_scene.edge_layer
+        if edge_layer is not None and self.start_socket is not None and self.end_socket is not None:
+            edge_layer.add_edge(self.graphics_edge)
 
         if self.start_socket is not None:
-            self.update_positions()
+            if self.scene.is_bulk_constructing:
+                self.scene.defer_edge_update(self)
+            else:
+                self.update_positions()
 
 
     def do_select(self, new_state=True):
@@ -152,6 +173,21 @@ class Edge:
         """
         self.graphics_edge.do_select(new_state)
 
+    def serialize(self) -> Dict:
+        """Returns the Edge as plain data, see scene_json.
+
+        The Sockets are referenced as [node id, is input, index].
+
+        Returns:
+            Dict: The Edge's id, type and Sockets.
+        """
+        return {
+            'id': self.id,
+            'edge_type': self.edge_type,
+            'start': [self.start_socket.node.id, self.start_socket.is_input, self.start_socket.index],
+            'end': [self.end_socket.node.id, self.end_socket.is_input, self.end_socket.index],
+        }
+
     def get_other_socket(self, known_socket) -> node_socket.Socket:
         """Returns the other Socket that is not the parameter.
 
@@ -171,11 +207,16 @@ class Edge:
         sockets that it connected no longer reference it.
         """
         old_sockets = [self.start_socket, self.end_socket]
+        if self.start_socket is not None and self.end_socket is not None:
+            self.scene.record_operation(node_scene.OP_EDGE_REMOVE, {'id': self.id})
 
         logparams.logging.info(f"# Removing Edge {self}")
         logparams.logging.debug(" - remove edge from all sockets")
         self._remove_from_sockets()
         logparams.logging.debug(" - remove graphics_edge")
+        if self.graphics_edge.layer is not None:
+            self.graphics_edge.layer.remove_edge(self.graphics_edge)
+        self.scene.graphics_scene.edge_index.remove(self.graphics_edge)
         self.scene.graphics_scene.removeItem(self.graphics_edge)
         self.graphics_edge = None
         logparams.logging.debug(" - remove edge from scene")
@@ -204,12 +245,11 @@ class Edge:
         source_pos = self.start_socket.get_socket_position()
         source_pos[0] += self.start_socket.node.graphics_node.pos().x()
         source_pos[1] += self.start_socket.node.graphics_node.pos().y()
-        self.graphics_edge.set_source(*source_pos)
         if self.end_socket is not None:
             end_pos = self.end_socket.get_socket_position()
             end_pos[0] += self.end_socket.node.graphics_node.pos().x()
             end_pos[1] += self.end_socket.node.graphics_node.pos().y()
-            self.graphics_edge.set_destination(*end_pos)
         else:
-            self.graphics_edge.set_destination(*source_pos)
-        self.graphics_edge.update()
+            end_pos = source_pos
+        # the GraphicsEdge only rebuilds and repaints if an endpoint moved
+        self.graphics_edge.set_positions(tuple(source_pos), tuple(end_pos))
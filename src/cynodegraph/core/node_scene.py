@@ -3,14 +3,51 @@
 from __future__ import generator_stop
 from __future__ import annotations
 
-from typing import List
+import contextlib
+import functools
+from typing import Dict, Iterator, List
 
-from PyQt5.QtWidgets import QGraphicsView
+from PyQt5.QtWidgets import QGraphicsScene, QGraphicsView
 from PyQt5.QtCore import QPointF
 
+from cynodegraph.core import checkpoint
 from cynodegraph.core import node_edge
 from cynodegraph.core import graphics_scene
+from cynodegraph.core import logparams
 from cynodegraph.core import node
+from cynodegraph.core import node_dag
+from cynodegraph.core import project_file
+from cynodegraph.core import result_cache
+from cynodegraph.core import scene_binary
+from cynodegraph.core import scene_json
+from cynodegraph.core import scene_saver
+
+
+
+# model operations reported to the operation listeners
+OP_NODE_ADD = 'node_add'            #: A Node was added, data is Node.serialize()
+OP_NODE_REMOVE = 'node_remove'      #: A Node was removed, data has its 'id'
+OP_NODE_MOVE = 'node_move'          #: A Node was moved, data has its 'id' and 'pos'
+OP_NODE_TITLE = 'node_title'        #: A Node was renamed, data has its 'id' and 'title'
+OP_EDGE_ADD = 'edge_add'            #: An Edge was connected, data is Edge.serialize()
+OP_EDGE_REMOVE = 'edge_remove'      #: An Edge was disconnected, data has its 'id'
+OP_PARAM = 'param'                  #: A Node parameter changed, data has 'id', 'name' and 'value'
+OP_RESET = 'reset'                  #: The whole Scene was cleared or loaded, data is empty
+
+#: The file dialog filter for every scene file format
+FILE_FILTER = (
+    f"Node Graph (*.json *{scene_binary.FILE_EXTENSION} *{project_file.FILE_EXTENSION});;"
+    f"{scene_json.FILE_FILTER};;{scene_binary.FILE_FILTER};;{project_file.FILE_FILTER};;"
+    "All Files (*)"
+)
+
+def scene_file_format(filename: str) -> 'Module':
+    """Returns the module that saves and loads a scene file, by extension."""
+    if filename.lower().endswith(scene_binary.FILE_EXTENSION):
+        return scene_binary
+    if filename.lower().endswith(project_file.FILE_EXTENSION):
+        return project_file
+    return scene_json
 
 
 
@@ -26,14 +63,39 @@ class Scene:
         self._has_been_modified: bool = False
         self._last_selected_items: List = []
 
+        # the file the scene was last saved to or loaded from
+        self.filename: str = None
+
+        # bulk construction, see bulk_construction()
+        self._bulk_depth: int = 0
+        self._deferred_edges: List[node_edge.Edge] = []
+
+        # operations are not reported while suspended, see operations_suspended()
+        self._operations_suspended: int = 0
+        self._operation_count: int = 0
+
+        # the background save in progress, see save_in_background()
+        self.saver: 'SceneSaver' = None
+
         # initialiaze all listeners
         self._has_been_modified_listeners: List = []
+        self._operation_listeners: List = []
         self._item_selected_listeners: List = []
         self._items_deselected_listeners: List = []
 
         # here we can store callback for retrieving the class for Nodes
         self.node_class_selector: 'Node Class Instance' = None
 
+        # backend used by evaluate(), anything with an evaluate(graph, values)
+        # and the timings and sizes dictionaries of its last run
+        self.execution_backend = node_dag.LocalBackend()
+        self.runtime_profile: node_dag.RuntimeProfile = node_dag.RuntimeProfile()
+
+        # when set, evaluate() resumes from and appends to this checkpoint
+        self.checkpoint: checkpoint.CheckpointStore = None
+        # when set, evaluate() reuses the outputs cached by content hash
+        self.result_cache: result_cache.ResultCache = None
+
         self.graphics_scene: graphics_scene.NodeEditorGraphicsScene = (
             graphics_scene.NodeEditorGraphicsScene(self))
         self.graphics_scene.set_scene(self.scene_width, self.scene_height)
@@ -88,6 +150,50 @@ class Scene:
     def addItemsDeselectedListener(self, callback):
         self._items_deselected_listeners.append(callback)
 
+    def addOperationListener(self, callback):
+        self._operation_listeners.append(callback)
+
+    def removeOperationListener(self, callback):
+        if callback in self._operation_listeners:
+            self._operation_listeners.remove(callback)
+
+    def record_operation(self, operation: str, data: Dict):
+        """Reports a change of the model to the operation listeners.
+
+        Every change marks the Scene as modified.
+
+        Args:
+            operation (str): One of the OP_ constants.
+            data (Dict): The plain data describing the change.
+        """
+        if self._operations_suspended:
+            return
+        self._operation_count += 1
+        self.has_been_modified = True
+        for callback in self._operation_listeners: callback(operation, data)
+
+    @property
+    def operation_count(self) -> int:
+        """int: The number of operations recorded, it only ever grows."""
+        return self._operation_count
+
+    @property
+    def is_recording_operations(self) -> bool:
+        return self._operations_suspended == 0
+
+    @contextlib.contextmanager
+    def operations_suspended(self) -> Iterator[None]:
+        """Context in which changes are not reported as operations.
+
+        Used while the model is built from data that is already saved,
+        like a file being loaded.
+        """
+        self._operations_suspended += 1
+        try:
+            yield
+        finally:
+            self._operations_suspended -= 1
+
     def addDragEnterListener(self, callback):
         self.get_view().addDragEnterListener(callback)
 
@@ -101,6 +207,81 @@ class Scene:
         for edge in self.edges:
             edge.graphics_edge._last_selected_state = False
 
+    @property
+    def is_bulk_constructing(self) -> bool:
+        return self._bulk_depth > 0
+
+    @contextlib.contextmanager
+    def bulk_construction(self) -> Iterator[None]:
+        """Context for adding many Nodes and Edges at once.
+
+        The graphics scene stops indexing its items until the context
+        exits, then builds the index once. Edges only compute their
+        positions on exit too, after their Nodes have been placed.
+        """
+        if self._bulk_depth == 0:
+            index_method = self.graphics_scene.itemIndexMethod()
+            self.graphics_scene.setItemIndexMethod(QGraphicsScene.NoIndex)
+        self._bulk_depth += 1
+        try:
+            yield
+        finally:
+            self._bulk_depth -= 1
+            if self._bulk_depth == 0:
+                deferred_edges, self._deferred_edges = self._deferred_edges, []
+                for edge in deferred_edges:
+                    if edge.graphics_edge is not None and edge.start_socket is not None:
+                        edge.update_positions()
+                self.graphics_scene.setItemIndexMethod(index_method)
+
+    def defer_edge_update(self, edge: node_edge.Edge):
+        self._deferred_edges.append(edge)
+
+    def save_to_file(self, filename: str):
+        scene_file_format(filename).save_scene(self, filename)
+        self.filename = filename
+        self.has_been_modified = False
+        logparams.logging.info(f"Saved scene to {filename}")
+
+    def save_in_background(self, filename: str) -> 'SceneSaver':
+        """Saves the Scene on a worker thread, see scene_saver.
+
+        A save that is still running is waited for first.
+
+        Args:
+            filename (str): The path to save to.
+
+        Returns:
+            SceneSaver: The started worker thread.
+        """
+        if self.saver is not None:
+            self.saver.wait()
+        snapshot = scene_saver.take_snapshot(self)
+        self.saver = scene_saver.SceneSaver(snapshot, filename)
+        # bound now, a later save may replace self.saver before this one reports
+        self.saver.save_finished.connect(
+            functools.partial(self.on_saved_in_background, snapshot.operation_count)
+        )
+        self.saver.start()
+        return self.saver
+
+    def on_saved_in_background(self, operation_count: int, filename: str, succeeded: bool):
+        if not succeeded:
+            return
+        self.filename = filename
+        # edits made while saving are not in the file
+        if operation_count == self.operation_count:
+            self.has_been_modified = False
+        logparams.logging.info(f"Saved scene to {filename}")
+
+    def load_from_file(self, filename: str):
+        with self.operations_suspended():
+            scene_file_format(filename).load_scene(self, filename)
+        self.record_operation(OP_RESET, {})
+        self.filename = filename
+        self.has_been_modified = False
+        logparams.logging.info(f"Loaded scene from {filename}")
+
     def get_view(self) -> QGraphicsView:
         return self.graphics_scene.views()[0]
 
@@ -126,16 +307,75 @@ class Scene:
             print("!W:", "Scene::remove_edge", "want to remove edge", edge, "from self.edges but it's not in the list!")
 
     def clear(self):
-        while len(self.nodes) > 0:
-            self.nodes[0].remove()
+        with self.operations_suspended():
+            while len(self.nodes) > 0:
+                self.nodes[0].remove()
+        self.record_operation(OP_RESET, {})
 
         self.has_been_modified = False
 
+    def evaluate(self) -> bool:
+        """Evaluates the dirty or invalid Nodes with the execution backend.
+
+        Clean Nodes keep their Socket values. When a kernel fails the
+        results computed so far are kept and the failed Node and its
+        descendants are marked invalid.
+
+        With a checkpoint set, Nodes whose content hash is unchanged since
+        they were checkpointed are restored instead of evaluated, and every
+        Node is checkpointed as soon as it finishes. With a result cache
+        set, Nodes whose content hash is cached are not evaluated either.
+
+        Returns:
+            bool: True if every Node evaluated, False otherwise.
+        """
+        graph = node_dag.compile_scene(self, self.runtime_profile)
+        values = {
+            node.id: [socket.value for socket in node.outputs]
+            for node in self.nodes if not node.is_dirty() and not node.is_invalid()
+        }
+
+        if self.checkpoint is not None:
+            values.update(self.checkpoint.restore(self, graph))
+        if self.result_cache is not None:
+            cached = self.result_cache.lookup(graph, values)
+            node_dag.apply_results(self, cached)
+            values.update(cached)
+
+        def on_result(node_id: str, outputs: List):
+            content_hash = graph.nodes[node_id].content_hash
+            if self.checkpoint is not None:
+                self.checkpoint.append(
+                    checkpoint.CheckpointRecord(node_id, content_hash, False, False, outputs)
+                )
+            if self.result_cache is not None:
+                self.result_cache.put(content_hash, outputs)
+
+        try:
+            results = self.execution_backend.evaluate(graph, values, on_result=on_result)
+        except node_dag.EvaluationError as error:
+            logparams.logging.exception("Exception occurred")
+            self.runtime_profile.record(self.execution_backend.timings, self.execution_backend.sizes)
+            node_dag.apply_results(self, error.results)
+            for node in self.nodes:
+                if node.id == error.node_id:
+                    node.mark_invalid()
+                    node.mark_descendants_invalid()
+                    if self.checkpoint is not None:
+                        self.checkpoint.record_node(node, graph.nodes[node.id].content_hash)
+            return False
+        finally:
+            if self.result_cache is not None:
+                self.result_cache.flush()
+
+        self.runtime_profile.record(self.execution_backend.timings, self.execution_backend.sizes)
+        node_dag.apply_results(self, results)
+        return True
+
 
 
-    # TODO: May not need
     def get_node_class_from_data(self, data) -> 'Node Class Instance':
         return (
-            Node if self.node_class_selector is None
+            node.Node if self.node_class_selector is None
             else self.node_class_selector(data)
         )
@@ -3,6 +3,7 @@
 from __future__ import generator_stop
 from __future__ import annotations
 
+from typing import Any
 from typing import Dict
 from typing import List
 
@@ -48,6 +49,8 @@ class Socket:
         is_input (bool): Flag for if the Socket is an input Socket or output.
         is_output (bool): (Remove)Flag for if the Socket is an output Socket.
         edges (List[Edge]): A List of the references for the Socket's connected Edges.
+        value (Any): The last evaluated value of the Socket. Only output
+            Sockets hold a value.
     Todo:
         * FOCUS: Finishing documentation.
         * create property accesses(See note 1).
@@ -76,6 +79,7 @@ class Socket:
         self.is_output: bool = not self.is_input
 
         self.edges: List[node_edge.Edge] = []
+        self.value: Any = None
 
         self.__graphics_socket: graphics_socket.GraphicsSocket = graphics_socket.GraphicsSocket(
             self, self.scene, self.socket_type
@@ -90,6 +94,11 @@ class Socket:
             f"{hex(id(self))[2:5]}..{hex(id(self))[-3:]}>"
         )
 
+    @property
+    def graphics_socket(self) -> graphics_socket.GraphicsSocket:
+        """GraphicsSocket: The graphical component of the Socket."""
+        return self.__graphics_socket
+
 
 
     def set_socket_position(self):
@@ -118,10 +127,19 @@ class Socket:
 
         return position
 
+    def __update_graphics(self):
+        """Repaints the GraphicsSocket, unless the Node was removed and
+        took it out of the scene along with its GraphicsNode.
+        """
+        if self.node.graphics_node is not None:
+            self.__graphics_socket.update()
+
     def add_edge(self, edge):
         """Adds a connected Edge to the Sockets List of connected Edges.
         """
         self.edges.append(edge)
+        # the circle is drawn filled once an Edge is connected
+        self.__update_graphics()
         logparams.logging.debug(f"Add Edge: Socket {id(self)} >> Edges: {len(self.edges)}")
         logparams.logging.debug(f"Socket Type: {self.socket_type}")
         logparams.logging.debug(f"Start Socket: {edge.start_socket}\tEnd Socket: {edge.end_socket}")
@@ -139,6 +157,7 @@ class Socket:
                 f"!W: Socket::removeEdge want to remove edge {edge} from"
                 f"self.edges but it's not in the list"
             )
+        self.__update_graphics()
         logparams.logging.debug(
             f"Remove Edge: Socket {id(self)} >> Edges: {len(self.edges)}"
         )
@@ -153,6 +172,27 @@ class Socket:
             f"Remove All Edge: Socket {id(self)} >> Edges: {len(self.edges)}"
         )
 
+    def serialize(self) -> Dict:
+        """Returns the Socket as plain data, see Node.serialize().
+
+        Returns:
+            Dict: The Socket's index, position, type and multi-edge flag.
+        """
+        return {
+            'index': self.index,
+            'position': self.position,
+            'socket_type': self.socket_type,
+            'multi_edges': self.is_multi_edges,
+        }
+
+    def deserialize(self, data: Dict):
+        """Restores the state from the data of serialize().
+
+        Args:
+            data (Dict): The Socket's data.
+        """
+        self.is_multi_edges = self.determine_multi_edges(data)
+
     def determine_multi_edges(self, data: Dict) -> int:
         """Determines if the Socket is a multiedge or not.
 
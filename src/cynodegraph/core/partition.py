@@ -0,0 +1,157 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=no-name-in-module
+from __future__ import generator_stop
+from __future__ import annotations
+
+from typing import Dict, List
+
+from cynodegraph.core import node_dag
+
+
+
+def locality_order(graph: node_dag.CompiledGraph) -> List[str]:
+    """Returns a topological order that keeps chains of nodes together.
+
+    This is the reverse post-order of a depth first walk over the children,
+    so a node is followed by its descendants before anything unrelated.
+
+    Args:
+        graph (CompiledGraph): The graph to order.
+
+    Returns:
+        List[str]: The node ids.
+    """
+    visited = set()
+    post_order = []
+    for root_id in graph.order:
+        if root_id in visited:
+            continue
+        visited.add(root_id)
+        stack = [(root_id, iter(graph.children[root_id]))]
+        while stack:
+            node_id, children = stack[-1]
+            for child_id in children:
+                if child_id not in visited:
+                    visited.add(child_id)
+                    stack.append((child_id, iter(graph.children[child_id])))
+                    break
+            else:
+                stack.pop()
+                post_order.append(node_id)
+
+    post_order.reverse()
+    return post_order
+
+def transfer_cost(graph: node_dag.CompiledGraph, owner: Dict[str, int], node_id: str) -> float:
+    """Returns the bytes a node's outputs cost to ship to other partitions.
+
+    The outputs are shipped once to every other partition holding one of
+    the node's children, since workers keep received values resident.
+
+    Args:
+        graph (CompiledGraph): The partitioned graph.
+        owner (Dict[str, int]): The partition index of each node id.
+        node_id (str): The node to price.
+
+    Returns:
+        float: The estimated bytes.
+    """
+    targets = {owner[child_id] for child_id in graph.children[node_id]}
+    targets.discard(owner[node_id])
+    return graph.nodes[node_id].output_size * len(targets)
+
+def cut_weight(graph: node_dag.CompiledGraph, partitions: List[List[str]]) -> float:
+    """Returns the estimated bytes shipped between the partitions.
+
+    Args:
+        graph (CompiledGraph): The partitioned graph.
+        partitions (List[List[str]]): The node ids of each partition.
+
+    Returns:
+        float: The estimated bytes.
+    """
+    owner = {node_id: index for index, partition in enumerate(partitions) for node_id in partition}
+    return sum(transfer_cost(graph, owner, node_id) for node_id in graph.order)
+
+def partition_graph(graph: node_dag.CompiledGraph, count: int, imbalance: float=0.1,
+    passes: int=8
+) -> List[List[str]]:
+    """Splits a graph into balanced partitions with a small cut weight.
+
+    The nodes are first cut into runs of equal cost along locality_order().
+    Then nodes are moved to the partition of a neighbour whenever that
+    lowers the bytes shipped between partitions, see transfer_cost(),
+    without any partition going over its share of the cost by more than
+    the imbalance.
+
+    Args:
+        graph (CompiledGraph): The graph to split, the estimates are read
+            from DagNode.cost and DagNode.output_size.
+        count (int): The number of partitions.
+        imbalance (float): The fraction a partition may exceed the average
+            cost by.
+        passes (int): The maximum number of refinement passes.
+
+    Returns:
+        List[List[str]]: The node ids of each partition in topological order.
+    """
+    if count <= 1:
+        return [list(graph.order)] + [[] for _ in range(count - 1)]
+
+    order = locality_order(graph)
+    costs = {node_id: max(graph.nodes[node_id].cost, 0.0) for node_id in order}
+    total = sum(costs.values())
+    share = total / count if total > 0 else 1.0
+    max_load = max(share * (1.0 + imbalance), max(costs.values(), default=0.0))
+
+    # initial runs of equal cost
+    owner: Dict[str, int] = {}
+    loads = [0.0] * count
+    accumulated = 0.0
+    for node_id in order:
+        middle = accumulated + costs[node_id] / 2.0
+        index = min(count - 1, int(middle / share)) if total > 0 else len(owner) * count // len(order)
+        owner[node_id] = index
+        loads[index] += costs[node_id]
+        accumulated += costs[node_id]
+
+    # refine by moving single nodes to neighbouring partitions
+    parents = {
+        node_id: [parent_id for parent_id in graph.nodes[node_id].upstream if parent_id in owner]
+        for node_id in order
+    }
+    for _ in range(passes):
+        moved = False
+        for node_id in order:
+            current = owner[node_id]
+            affected = [node_id] + parents[node_id]
+            candidates = {owner[other_id] for other_id in parents[node_id] + graph.children[node_id]}
+            candidates.discard(current)
+
+            before = sum(transfer_cost(graph, owner, other_id) for other_id in affected)
+            best, best_delta = None, 0.0
+            for candidate in candidates:
+                if loads[candidate] + costs[node_id] > max_load:
+                    continue
+                owner[node_id] = candidate
+                delta = sum(transfer_cost(graph, owner, other_id) for other_id in affected) - before
+                owner[node_id] = current
+                # moves that do not change the cut are taken if they even out the loads
+                if delta < best_delta or (
+                    delta == best_delta and best is None and delta == 0.0 and
+                    loads[candidate] + costs[node_id] < loads[current]
+                ):
+                    best, best_delta = candidate, delta
+
+            if best is not None:
+                owner[node_id] = best
+                loads[current] -= costs[node_id]
+                loads[best] += costs[node_id]
+                moved = True
+        if not moved:
+            break
+
+    partitions = [[] for _ in range(count)]
+    for node_id in graph.order:
+        partitions[owner[node_id]].append(node_id)
+    return partitions
@@ -0,0 +1,419 @@
+# pylint: disable=missing-module-docstring
+from __future__ import generator_stop
+from __future__ import annotations
+
+import collections
+import json
+import lzma
+import mmap
+import os
+import struct
+import zlib
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from cynodegraph.core import node_edge
+from cynodegraph.core import scene_json
+
+
+
+FILE_EXTENSION = '.cynp'    #: The extension of project files
+FORMAT_MAGIC = b'CYNP'      #: The first bytes of a project file
+FORMAT_VERSION = 1          #: The version written to the header
+
+#: The file dialog filter for project files
+FILE_FILTER = f"Compressed Node Graph Project (*{FILE_EXTENSION})"
+
+CODEC_ZLIB = 1              #: Chunks compressed with zlib, fast to decode
+CODEC_LZMA = 2              #: Chunks compressed with lzma, smaller
+
+DEFAULT_CHUNK_SIZE = 1 << 16    #: The uncompressed bytes a chunk is filled to
+
+#: magic, version, codec, the offset and length of the index
+HEADER = struct.Struct('<4sHBxQQ')
+
+_STREAMS = ('nodes', 'params', 'edges')
+
+
+
+def _compress(codec: int, data: bytes) -> bytes:
+    if codec == CODEC_ZLIB:
+        return zlib.compress(data)
+    if codec == CODEC_LZMA:
+        return lzma.compress(data)
+    raise ValueError(f"Unknown project file codec: {codec}")
+
+def _decompress(codec: int, data: bytes) -> bytes:
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(data)
+    if codec == CODEC_LZMA:
+        return lzma.decompress(data)
+    raise ValueError(f"Unknown project file codec: {codec}")
+
+
+
+class _ChunkWriter:
+    """Packs the records of all streams into compressed chunks of a file.
+
+    Every stream fills its own chunk, so the records of a chunk are alike
+    and compress well, and reading one kind of record never decodes
+    another.
+    """
+
+    def __init__(self, file, start: int, codec: int, chunk_size: int):
+        self.file = file
+        self.start: int = start
+        self.codec: int = codec
+        self.chunk_size: int = chunk_size
+        self.chunks: List[List[int]] = []
+        self.buffers: Dict[str, bytearray] = {stream: bytearray() for stream in _STREAMS}
+        self.chunk_ids: Dict[str, int] = {}
+
+    def add(self, stream: str, record: bytes) -> List[int]:
+        """Buffers a record, returns its chunk and its offset and length in it."""
+        buffer = self.buffers[stream]
+        if stream not in self.chunk_ids:
+            self.chunk_ids[stream] = len(self.chunks)
+            self.chunks.append(None)
+        location = [self.chunk_ids[stream], len(buffer), len(record)]
+        buffer += record
+        if len(buffer) >= self.chunk_size:
+            self.flush(stream)
+        return location
+
+    def flush(self, stream: str):
+        """Compresses and writes the open chunk of a stream."""
+        if stream not in self.chunk_ids:
+            return
+        data = _compress(self.codec, bytes(self.buffers[stream]))
+        # relative to the header, like the index offset
+        self.chunks[self.chunk_ids.pop(stream)] = [self.file.tell() - self.start, len(data)]
+        self.file.write(data)
+        self.buffers[stream].clear()
+
+
+
+class ProjectFile:
+    """Random access to a chunked, compressed project file.
+
+    The file is made of the header, independently compressed chunks and a
+    compressed JSON index at the end. The index holds the chunk of every
+    node record, of its parameters and of the edges starting at it, so
+    reading one node or a subgraph only decodes the chunks holding them.
+    Decoded chunks are kept in a small LRU cache. Use it as a context
+    manager, or call close().
+
+    Args:
+        filename (str): The path of the file.
+        cache_size (int): The number of decoded chunks kept.
+        offset (int): Where the project starts in the file, the position
+            the file was at when it was written.
+
+    Attributes:
+        header (Dict): The 'scene_width' and 'scene_height'.
+        node_ids (List[str]): The id of every node, in saved order.
+        edge_count (int): The number of edges.
+        chunks_decoded (int): The number of chunks decompressed so far.
+    """
+
+    def __init__(self, filename: str, cache_size: int=16, offset: int=0):
+        with open(filename, 'rb') as file:
+            if os.fstat(file.fileno()).st_size < offset + HEADER.size:
+                raise ValueError(f"Not a project file: {filename}")
+            self.__map: mmap.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.__offset: int = offset
+
+        magic, version, self.codec, index_offset, index_length = HEADER.unpack_from(self.__map, offset)
+        index_offset += offset
+        if magic != FORMAT_MAGIC:
+            self.close()
+            raise ValueError(f"Not a project file: {filename}")
+        if version > FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"Unsupported project file version: {version}")
+        if index_offset + index_length > len(self.__map):
+            self.close()
+            raise ValueError(f"Truncated project file: {filename}")
+
+        index = json.loads(_decompress(
+            self.codec, self.__map[index_offset:index_offset + index_length]
+        ))
+        self.header: Dict = index['header']
+        self.node_ids: List[str] = index['ids']
+        self.edge_count: int = index['edge_count']
+        self.__chunks: List[List[int]] = index['chunks']
+        self.__nodes: List[List[int]] = index['nodes']
+        self.__params: List[List[int]] = index['params']
+        self.__edges: List[List[List[int]]] = index['edges']
+        self.__positions: Dict[str, int] = {node_id: position for position, node_id in enumerate(self.node_ids)}
+
+        self.cache_size: int = cache_size
+        self.__cache: collections.OrderedDict = collections.OrderedDict()
+        self.chunks_decoded: int = 0
+
+    def __enter__(self) -> ProjectFile:
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Unmaps the file."""
+        self.__map.close()
+
+    @property
+    def node_count(self) -> int:
+        """int: The number of nodes."""
+        return len(self.node_ids)
+
+    def __chunk(self, chunk_id: int) -> bytes:
+        data = self.__cache.get(chunk_id)
+        if data is None:
+            offset, length = self.__chunks[chunk_id]
+            offset += self.__offset
+            data = _decompress(self.codec, self.__map[offset:offset + length])
+            self.chunks_decoded += 1
+            self.__cache[chunk_id] = data
+            if len(self.__cache) > self.cache_size:
+                self.__cache.popitem(last=False)
+        else:
+            self.__cache.move_to_end(chunk_id)
+        return data
+
+    def __record(self, location: List[int]):
+        chunk_id, start, length = location
+        return json.loads(self.__chunk(chunk_id)[start:start + length])
+
+    def __position(self, node_id: str) -> int:
+        position = self.__positions.get(node_id)
+        if position is None:
+            raise KeyError(f"No node {node_id} in the project file")
+        return position
+
+    def params(self, node_id: str) -> Dict:
+        """Decodes the parameters of a node, only the chunk holding them."""
+        location = self.__params[self.__position(node_id)]
+        return {} if location is None else self.__record(location)
+
+    def node_data(self, node_id: str, with_params: bool=True) -> Dict:
+        """Returns a node in the form of Node.serialize().
+
+        Args:
+            node_id (str): The id of the node.
+            with_params (bool): False leaves the 'params' empty, so their
+                chunk is not decoded.
+        """
+        data = self.__record(self.__nodes[self.__position(node_id)])
+        data['params'] = self.params(node_id) if with_params else {}
+        return data
+
+    def edges_from(self, node_id: str) -> List[Dict]:
+        """Returns the edges starting at a node, in the form of Edge.serialize()."""
+        return [self.__record(location) for location in self.__edges[self.__position(node_id)]]
+
+    def subgraph(self, node_ids: Iterable[str]) -> Dict:
+        """Returns some nodes and the edges between them.
+
+        Args:
+            node_ids (Iterable[str]): The ids of the nodes.
+
+        Returns:
+            Dict: The 'nodes' and 'edges', in the form of
+                clipboard.serialize_subgraph().
+        """
+        node_ids = list(dict.fromkeys(node_ids))
+        wanted = set(node_ids)
+        return {
+            'nodes': [self.node_data(node_id) for node_id in node_ids],
+            'edges': [
+                edge_data for node_id in node_ids for edge_data in self.edges_from(node_id)
+                if edge_data['end'][0] in wanted
+            ],
+        }
+
+    def iter_nodes(self) -> Iterator[Dict]:
+        """Yields every node, in the form of Node.serialize()."""
+        for node_id in self.node_ids:
+            yield self.node_data(node_id)
+
+    def iter_edges(self) -> Iterator[Dict]:
+        """Yields every edge, in the form of Edge.serialize()."""
+        for node_id in self.node_ids:
+            yield from self.edges_from(node_id)
+
+
+
+# pylint: disable=too-many-arguments
+# Reasoning: Useful and does no harm.
+def write_records(file, header: Dict, nodes: Iterable[Dict], edges: Iterable[Dict],
+    codec: int=CODEC_ZLIB, chunk_size: int=DEFAULT_CHUNK_SIZE
+):
+    """Writes the plain data of a Scene as a project file.
+
+    Node records, parameters and edges go to separate streams of chunks,
+    each compressed on its own. An edge is stored with the node it starts
+    at, the edges grouped by node in node order, so reading every node's
+    edges walks the chunks in file order.
+
+    Args:
+        file (BinaryIO): The file to write to, opened for binary writing
+            and seekable.
+        header (Dict): The 'scene_width' and 'scene_height'.
+        nodes (Iterable[Dict]): The data of every Node, see Node.serialize().
+        edges (Iterable[Dict]): The data of every Edge, see Edge.serialize().
+        codec (int): CODEC_ZLIB or CODEC_LZMA.
+        chunk_size (int): The uncompressed bytes a chunk is filled to,
+            smaller chunks make random access cheaper and compress worse.
+    """
+    start = file.tell()
+    file.write(HEADER.pack(FORMAT_MAGIC, FORMAT_VERSION, codec, 0, 0))
+    writer = _ChunkWriter(file, start, codec, chunk_size)
+    encoder = json.JSONEncoder(separators=(',', ':'))
+
+    node_ids = []
+    node_locations = []
+    param_locations = []
+    for data in nodes:
+        node_ids.append(data['id'])
+        params = data['params']
+        record = {key: value for key, value in data.items() if key != 'params'}
+        node_locations.append(writer.add('nodes', encoder.encode(record).encode('utf-8')))
+        param_locations.append(
+            writer.add('params', encoder.encode(params).encode('utf-8')) if params else None
+        )
+
+    positions = {node_id: position for position, node_id in enumerate(node_ids)}
+    edge_records: List[List[bytes]] = [[] for _ in node_ids]
+    edge_count = 0
+    for data in edges:
+        position = positions.get(data['start'][0])
+        if position is None or data['end'][0] not in positions:
+            continue
+        edge_records[position].append(encoder.encode(data).encode('utf-8'))
+        edge_count += 1
+    edge_locations = [
+        [writer.add('edges', record) for record in records] for records in edge_records
+    ]
+    del edge_records
+
+    for stream in _STREAMS:
+        writer.flush(stream)
+    index = _compress(codec, encoder.encode({
+        'header': header, 'ids': node_ids, 'edge_count': edge_count, 'chunks': writer.chunks,
+        'nodes': node_locations, 'params': param_locations, 'edges': edge_locations,
+    }).encode('utf-8'))
+    index_offset = file.tell() - start
+    file.write(index)
+    end = file.tell()
+    file.seek(start)
+    file.write(HEADER.pack(FORMAT_MAGIC, FORMAT_VERSION, codec, index_offset, len(index)))
+    file.seek(end)
+
+def write_scene(scene: 'Scene', file, codec: int=CODEC_ZLIB):
+    """Writes a Scene as a project file, see write_records().
+
+    Args:
+        scene (Scene): The Scene to write.
+        file (BinaryIO): The file to write to.
+        codec (int): CODEC_ZLIB or CODEC_LZMA.
+    """
+    write_records(
+        file, {'scene_width': scene.scene_width, 'scene_height': scene.scene_height},
+        (node_obj.serialize() for node_obj in scene.nodes),
+        (
+            edge.serialize() for edge in scene.edges
+            if edge.start_socket is not None and edge.end_socket is not None
+        ),
+        codec
+    )
+
+def insert_records(scene: 'Scene', nodes: Iterable[Dict], edges: Iterable[Dict]
+) -> Tuple[List['Node'], List[node_edge.Edge]]:
+    """Creates Nodes and Edges from their data in one bulk construction.
+
+    Args:
+        scene (Scene): The Scene to add to.
+        nodes (Iterable[Dict]): The data of the Nodes, see Node.serialize().
+        edges (Iterable[Dict]): The data of the Edges, see Edge.serialize().
+
+    Returns:
+        Tuple[List[Node], List[Edge]]: The new Nodes and Edges.
+    """
+    created: Dict[str, 'Node'] = {}
+    new_edges = []
+    with scene.bulk_construction():
+        for data in nodes:
+            created[data['id']] = scene_json.create_node(scene, data)
+        for data in edges:
+            edge = scene_json.create_edge(scene, data, created)
+            if edge is not None:
+                new_edges.append(edge)
+    return list(created.values()), new_edges
+
+def read_scene(scene: 'Scene', filename: str) -> Tuple[List['Node'], List[node_edge.Edge]]:
+    """Reads a project file into a Scene, next to the Nodes it already has.
+
+    Args:
+        scene (Scene): The Scene to add the Nodes and Edges to.
+        filename (str): The path to read.
+
+    Returns:
+        Tuple[List[Node], List[Edge]]: The new Nodes and Edges.
+    """
+    with ProjectFile(filename) as project:
+        return insert_records(scene, project.iter_nodes(), project.iter_edges())
+
+def read_subgraph(scene: 'Scene', filename: str, node_ids: Iterable[str]
+) -> Tuple[List['Node'], List[node_edge.Edge]]:
+    """Reads some Nodes of a project file, and the Edges between them, into a Scene.
+
+    Only the chunks holding them are decompressed, see ProjectFile.
+
+    Args:
+        scene (Scene): The Scene to add the Nodes and Edges to.
+        filename (str): The path to read.
+        node_ids (Iterable[str]): The ids of the Nodes to read.
+
+    Returns:
+        Tuple[List[Node], List[Edge]]: The new Nodes and Edges.
+    """
+    with ProjectFile(filename) as project:
+        data = project.subgraph(node_ids)
+    return insert_records(scene, data['nodes'], data['edges'])
+
+
+
+def save_scene(scene: 'Scene', filename: str, codec: int=CODEC_ZLIB):
+    """Saves a Scene, the file is replaced only once it is complete.
+
+    Args:
+        scene (Scene): The Scene to save.
+        filename (str): The path to save to.
+        codec (int): CODEC_ZLIB or CODEC_LZMA.
+    """
+    temp_filename = filename + '.tmp'
+    with open(temp_filename, 'wb') as file:
+        write_scene(scene, file, codec)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_filename, filename)
+
+def save_records(filename: str, header: Dict, nodes: Iterable[Dict], edges: Iterable[Dict],
+    codec: int=CODEC_ZLIB
+):
+    """Saves the plain data of a Scene, see write_records() and save_scene()."""
+    temp_filename = filename + '.tmp'
+    with open(temp_filename, 'wb') as file:
+        write_records(file, header, nodes, edges, codec)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_filename, filename)
+
+def load_scene(scene: 'Scene', filename: str):
+    """Replaces the content of a Scene with a project file.
+
+    Args:
+        scene (Scene): The Scene to load into.
+        filename (str): The path to load.
+    """
+    scene.clear()
+    read_scene(scene, filename)
@@ -0,0 +1,320 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=no-name-in-module
+from __future__ import generator_stop
+from __future__ import annotations
+
+import collections
+import json
+import mmap
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List
+
+from cynodegraph.core import logparams
+from cynodegraph.core import node_dag
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+
+POLICY_LRU = 'lru'      #: Evict the least recently used entry first
+POLICY_LFU = 'lfu'      #: Evict the least frequently used entry first
+
+_META_FILE = 'meta.pkl'
+_INDEX_FILE = 'index.json'
+
+
+
+class _ArrayRef:
+    """Stands in for an output stored in its own file next to the metadata."""
+
+    def __init__(self, file_name: str, is_numpy: bool):
+        self.file_name: str = file_name
+        self.is_numpy: bool = is_numpy
+
+
+
+def _is_raw_buffer(value: Any) -> bool:
+    return isinstance(value, (bytes, bytearray, memoryview))
+
+def _is_numpy_array(value: Any) -> bool:
+    return numpy is not None and isinstance(value, numpy.ndarray) and value.dtype != object
+
+
+
+class MemoryCache:
+    """In-memory tier of the result cache, least recently used goes first.
+
+    Args:
+        max_entries (int): The number of results to keep.
+    """
+
+    def __init__(self, max_entries: int=256):
+        self.max_entries: int = max_entries
+        self.__entries: collections.OrderedDict = collections.OrderedDict()
+        self.__lock: threading.Lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def get(self, content_hash: str) -> List:
+        """Returns the cached outputs for a content hash, or None."""
+        with self.__lock:
+            outputs = self.__entries.get(content_hash)
+            if outputs is not None:
+                self.__entries.move_to_end(content_hash)
+            return outputs
+
+    def put(self, content_hash: str, outputs: List):
+        """Caches the outputs of a content hash."""
+        with self.__lock:
+            self.__entries[content_hash] = outputs
+            self.__entries.move_to_end(content_hash)
+            while len(self.__entries) > self.max_entries:
+                self.__entries.popitem(last=False)
+
+    def clear(self):
+        """Drops every entry."""
+        with self.__lock:
+            self.__entries.clear()
+
+
+
+class DiskCache:
+    """On-disk tier of the result cache that outlives the editor session.
+
+    Each entry is a directory named after the content hash. Array outputs
+    are written raw to their own file, numpy arrays as .npy, and mapped back
+    with mmap on a hit, so reusing them does not copy or parse anything.
+    The rest of the outputs are pickled.
+
+    Entries are pickled, only use cache directories you trust.
+
+    Args:
+        directory (str): The cache directory, created if missing.
+        max_bytes (int): The size cap of the cache.
+        policy (str): POLICY_LRU or POLICY_LFU.
+    """
+
+    def __init__(self, directory: str, max_bytes: int=1 << 30, policy: str=POLICY_LRU):
+        if policy not in (POLICY_LRU, POLICY_LFU):
+            raise ValueError(f"Unknown eviction policy: {policy}")
+
+        self.directory: str = directory
+        self.max_bytes: int = max_bytes
+        self.policy: str = policy
+        self.__lock: threading.RLock = threading.RLock()
+        # content hash -> [bytes, last access, hits]
+        self.__index: Dict[str, List] = {}
+        self.__index_changed: bool = False
+
+        os.makedirs(self.directory, exist_ok=True)
+        self.__load_index()
+
+    @property
+    def total_bytes(self) -> int:
+        """int: The bytes used by all the entries."""
+        return sum(entry[0] for entry in self.__index.values())
+
+    def __contains__(self, content_hash: str) -> bool:
+        return content_hash in self.__index
+
+    def __load_index(self):
+        """Reads the index, rebuilding it from the entry directories if needed."""
+        try:
+            with open(os.path.join(self.directory, _INDEX_FILE), 'r') as file:
+                index = json.load(file)
+        except (OSError, ValueError):
+            index = {}
+
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if not os.path.isdir(path) or name.startswith('.'):
+                continue
+            if name in index:
+                self.__index[name] = index[name]
+            else:
+                size = sum(entry.stat().st_size for entry in os.scandir(path))
+                self.__index[name] = [size, time.time(), 0]
+                self.__index_changed = True
+
+    def save_index(self):
+        """Writes the access statistics to disk."""
+        with self.__lock:
+            if not self.__index_changed:
+                return
+            path = os.path.join(self.directory, _INDEX_FILE)
+            with open(path + '.tmp', 'w') as file:
+                json.dump(self.__index, file)
+            os.replace(path + '.tmp', path)
+            self.__index_changed = False
+
+    def get(self, content_hash: str) -> List:
+        """Returns the cached outputs for a content hash, or None.
+
+        Array outputs come back memory-mapped and read only.
+        """
+        with self.__lock:
+            entry = self.__index.get(content_hash)
+            if entry is None:
+                return None
+            entry[1] = time.time()
+            entry[2] += 1
+            self.__index_changed = True
+
+        path = os.path.join(self.directory, content_hash)
+        try:
+            with open(os.path.join(path, _META_FILE), 'rb') as file:
+                outputs = pickle.load(file)
+            return [
+                self.__map(os.path.join(path, value.file_name), value.is_numpy)
+                if isinstance(value, _ArrayRef) else value
+                for value in outputs
+            ]
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            logparams.logging.exception("Exception occurred")
+            self.discard(content_hash)
+            return None
+
+    def __map(self, path: str, is_numpy: bool) -> Any:
+        if is_numpy:
+            if numpy is None:
+                raise ValueError(f"numpy is needed to read {path}")
+            return numpy.load(path, mmap_mode='r')
+
+        with open(path, 'rb') as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return memoryview(b'')
+            # the map stays valid after the file is closed
+            return memoryview(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def put(self, content_hash: str, outputs: List):
+        """Stores the outputs of a content hash, evicting entries over the cap.
+
+        Outputs that can not be pickled are not cached.
+        """
+        if content_hash in self.__index:
+            return
+
+        temp_path = tempfile.mkdtemp(prefix='.', dir=self.directory)
+        try:
+            stored = []
+            for index, value in enumerate(outputs):
+                if _is_numpy_array(value):
+                    file_name = f'out_{index}.npy'
+                    numpy.save(os.path.join(temp_path, file_name), value, allow_pickle=False)
+                    stored.append(_ArrayRef(file_name, True))
+                elif _is_raw_buffer(value):
+                    file_name = f'out_{index}.bin'
+                    with open(os.path.join(temp_path, file_name), 'wb') as file:
+                        file.write(value)
+                    stored.append(_ArrayRef(file_name, False))
+                else:
+                    stored.append(value)
+            with open(os.path.join(temp_path, _META_FILE), 'wb') as file:
+                pickle.dump(stored, file, protocol=pickle.HIGHEST_PROTOCOL)
+            size = sum(entry.stat().st_size for entry in os.scandir(temp_path))
+
+            with self.__lock:
+                if content_hash in self.__index:
+                    # another thread stored the same outputs meanwhile
+                    shutil.rmtree(temp_path, ignore_errors=True)
+                    return
+                entry_path = os.path.join(self.directory, content_hash)
+                if os.path.exists(entry_path):
+                    # left behind without an index entry, e.g. by a crash
+                    shutil.rmtree(entry_path, ignore_errors=True)
+                os.rename(temp_path, entry_path)
+                self.__index[content_hash] = [size, time.time(), 1]
+                self.__index_changed = True
+                self.__evict()
+        except (OSError, pickle.PicklingError, TypeError, AttributeError):
+            logparams.logging.exception("Exception occurred")
+            shutil.rmtree(temp_path, ignore_errors=True)
+
+    def discard(self, content_hash: str):
+        """Removes an entry."""
+        with self.__lock:
+            if self.__index.pop(content_hash, None) is not None:
+                self.__index_changed = True
+            shutil.rmtree(os.path.join(self.directory, content_hash), ignore_errors=True)
+
+    def __evict(self):
+        """Removes entries until the cache fits its size cap."""
+        total = self.total_bytes
+        if total <= self.max_bytes:
+            return
+
+        if self.policy == POLICY_LRU:
+            victims = sorted(self.__index, key=lambda key: self.__index[key][1])
+        else:
+            victims = sorted(self.__index, key=lambda key: (self.__index[key][2], self.__index[key][1]))
+        for content_hash in victims:
+            if total <= self.max_bytes:
+                break
+            total -= self.__index[content_hash][0]
+            self.discard(content_hash)
+
+
+
+class ResultCache:
+    """Cache of evaluated outputs keyed by the nodes' content hashes.
+
+    Lookups go to the memory tier first and then to the optional disk tier,
+    whose hits are promoted to memory.
+
+    Args:
+        memory_entries (int): The number of results kept in memory.
+        disk (DiskCache): The optional disk tier.
+    """
+
+    def __init__(self, memory_entries: int=256, disk: DiskCache=None):
+        self.memory: MemoryCache = MemoryCache(memory_entries)
+        self.disk: DiskCache = disk
+
+    def get(self, content_hash: str) -> List:
+        """Returns the cached outputs for a content hash, or None."""
+        outputs = self.memory.get(content_hash)
+        if outputs is None and self.disk is not None:
+            outputs = self.disk.get(content_hash)
+            if outputs is not None:
+                self.memory.put(content_hash, outputs)
+        return outputs
+
+    def put(self, content_hash: str, outputs: List):
+        """Caches the outputs of a content hash in every tier."""
+        self.memory.put(content_hash, outputs)
+        if self.disk is not None:
+            self.disk.put(content_hash, outputs)
+
+    def lookup(self, graph: node_dag.CompiledGraph, skip: Dict[str, List]) -> Dict[str, List]:
+        """Returns the cached outputs of every node of a graph.
+
+        Args:
+            graph (CompiledGraph): The graph to look up.
+            skip (Dict[str, List]): Node ids that need no lookup.
+
+        Returns:
+            Dict[str, List]: The cached outputs by node id.
+        """
+        found = {}
+        for node_id in graph.order:
+            if node_id in skip:
+                continue
+            outputs = self.get(graph.nodes[node_id].content_hash)
+            if outputs is not None:
+                found[node_id] = outputs
+        self.flush()
+        return found
+
+    def flush(self):
+        """Writes the disk tier's access statistics."""
+        if self.disk is not None:
+            self.disk.save_index()
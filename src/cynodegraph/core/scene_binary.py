@@ -0,0 +1,466 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=no-name-in-module
+from __future__ import generator_stop
+from __future__ import annotations
+
+import json
+import math
+import mmap
+import os
+import struct
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from cynodegraph.core import node_edge
+from cynodegraph.core import scene_json
+
+
+
+FILE_EXTENSION = '.cyng'    #: The extension of binary scene files
+FORMAT_MAGIC = b'CYNG'      #: The first bytes of a binary scene file
+FORMAT_VERSION = 2          #: The version written to the header
+
+#: The file dialog filter for binary scene files
+FILE_FILTER = f"Binary Node Graph (*{FILE_EXTENSION})"
+
+#: magic, version, scene width and height, tile size, the node, socket,
+#: edge, string and tile counts, then the offsets of the sections
+HEADER = struct.Struct('<4sHxxiidIIIII8Q')
+#: the header of version 1 files, which are never tiled: magic, version,
+#: scene width and height, the node, socket, edge and string counts, then
+#: the offsets of the sections
+HEADER_V1 = struct.Struct('<4sHxxiiIIII6Q')
+#: the start of the header of every version, magic and version
+HEADER_START = struct.Struct('<4sH')
+#: id, class and title strings, x, y, first socket, input and output
+#: counts, params blob offset and length
+NODE_RECORD = struct.Struct('<IIIddIHHQI')
+#: owning node, socket type, index, position and flags
+SOCKET_RECORD = struct.Struct('<IiHBB')
+#: id string, start socket, end socket and edge type
+EDGE_RECORD = struct.Struct('<IIIB3x')
+#: offset and length of a string in the string data
+STRING_RECORD = struct.Struct('<QI')
+#: tile column and row, first node and node count
+TILE_RECORD = struct.Struct('<iiII')
+#: an entry of the adjacency section
+INDEX_RECORD = struct.Struct('<I')
+
+SOCKET_IS_INPUT = 0x01      #: Socket flag for input Sockets
+SOCKET_MULTI_EDGES = 0x02   #: Socket flag for multi-edge Sockets
+
+
+
+class BinarySceneFile:
+    """Read access to a binary scene file through a memory map.
+
+    Records are only unpacked when asked for, so opening a file reads
+    nothing but the header and only the pages holding the requested
+    records are ever touched. Use it as a context manager, or call close().
+
+    The file is made of the header, a fixed-width record table for the
+    nodes, the sockets and the edges, a string table and a blob section
+    holding the JSON encoded parameters of the nodes.
+
+    Files written with a tile size are tiled: the node records are sorted
+    by the square tile of the scene their position falls in, a tile table
+    holds the run of records of each tile and an adjacency section holds
+    the edges of every node. See scene_tiles. Files of version 1, from
+    before tiling, are read as untiled files.
+
+    Args:
+        filename (str): The path of the file.
+
+    Attributes:
+        scene_width (int): The width of the saved Scene.
+        scene_height (int): The height of the saved Scene.
+        node_count (int): The number of node records.
+        socket_count (int): The number of socket records.
+        edge_count (int): The number of edge records.
+        tile_size (float): The size of the tiles, 0 if the file is not
+            tiled.
+        tile_count (int): The number of tiles holding nodes.
+    """
+
+    def __init__(self, filename: str):
+        with open(filename, 'rb') as file:
+            if os.fstat(file.fileno()).st_size < HEADER_V1.size:
+                raise ValueError(f"Not a binary scene file: {filename}")
+            self.__map: mmap.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version = HEADER_START.unpack_from(self.__map, 0)
+        if magic != FORMAT_MAGIC:
+            self.close()
+            raise ValueError(f"Not a binary scene file: {filename}")
+        if version > FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"Unsupported binary scene file version: {version}")
+        if version == 1:
+            (_, _, self.scene_width, self.scene_height, self.node_count,
+                self.socket_count, self.edge_count, self.__string_count,
+                self.__nodes_offset, self.__sockets_offset, self.__edges_offset,
+                self.__strings_offset, self.__string_data_offset,
+                self.__blobs_offset) = HEADER_V1.unpack_from(self.__map, 0)
+            self.tile_size, self.tile_count = 0.0, 0
+            self.__tiles_offset = self.__adjacency_offset = len(self.__map)
+        elif len(self.__map) < HEADER.size:
+            self.close()
+            raise ValueError(f"Truncated binary scene file: {filename}")
+        else:
+            (_, _, self.scene_width, self.scene_height, self.tile_size, self.node_count,
+                self.socket_count, self.edge_count, self.__string_count, self.tile_count,
+                self.__nodes_offset, self.__sockets_offset, self.__edges_offset,
+                self.__strings_offset, self.__string_data_offset, self.__blobs_offset,
+                self.__tiles_offset, self.__adjacency_offset) = HEADER.unpack_from(self.__map, 0)
+        if self.__adjacency_offset > len(self.__map):
+            self.close()
+            raise ValueError(f"Truncated binary scene file: {filename}")
+
+        self.__strings: Dict[int, str] = {}
+        self.__tiles: Dict[Tuple[int, int], range] = None
+
+    def __enter__(self) -> BinarySceneFile:
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Unmaps the file."""
+        self.__map.close()
+
+    def string(self, index: int) -> str:
+        """Returns a string of the string table."""
+        value = self.__strings.get(index)
+        if value is None:
+            offset, length = STRING_RECORD.unpack_from(
+                self.__map, self.__strings_offset + index * STRING_RECORD.size
+            )
+            start = self.__string_data_offset + offset
+            value = self.__map[start:start + length].decode('utf-8')
+            self.__strings[index] = value
+        return value
+
+    def node_record(self, index: int) -> Tuple:
+        """Returns the raw fields of a node record, see NODE_RECORD."""
+        return NODE_RECORD.unpack_from(self.__map, self.__nodes_offset + index * NODE_RECORD.size)
+
+    def socket_record(self, index: int) -> Tuple:
+        """Returns the raw fields of a socket record, see SOCKET_RECORD."""
+        return SOCKET_RECORD.unpack_from(self.__map, self.__sockets_offset + index * SOCKET_RECORD.size)
+
+    def edge_record(self, index: int) -> Tuple:
+        """Returns the raw fields of an edge record, see EDGE_RECORD."""
+        return EDGE_RECORD.unpack_from(self.__map, self.__edges_offset + index * EDGE_RECORD.size)
+
+    def params(self, index: int) -> Dict:
+        """Decodes the parameters of a node."""
+        offset, length = self.node_record(index)[8:10]
+        if length == 0:
+            return {}
+        start = self.__blobs_offset + offset
+        return json.loads(self.__map[start:start + length])
+
+    def node_data(self, index: int) -> Dict:
+        """Returns a node in the form of Node.serialize().
+
+        Args:
+            index (int): The index of the node record.
+
+        Returns:
+            Dict: The Node's data.
+        """
+        (id_index, class_index, title_index, x_pos, y_pos, first_socket, input_count,
+            output_count, _, _) = self.node_record(index)
+        sockets = [self.socket_data(first_socket + offset) for offset in range(input_count + output_count)]
+        return {
+            'id': self.string(id_index),
+            'class': self.string(class_index),
+            'title': self.string(title_index),
+            'pos': [x_pos, y_pos],
+            'params': self.params(index),
+            'inputs': sockets[:input_count],
+            'outputs': sockets[input_count:],
+        }
+
+    def socket_data(self, index: int) -> Dict:
+        """Returns a socket in the form of Socket.serialize()."""
+        _, socket_type, socket_index, position, flags = self.socket_record(index)
+        return {
+            'index': socket_index,
+            'position': position,
+            'socket_type': socket_type,
+            'multi_edges': bool(flags & SOCKET_MULTI_EDGES),
+        }
+
+    def socket_reference(self, index: int) -> List:
+        """Returns a socket as the [node id, is input, index] of Edge.serialize()."""
+        node_index, _, socket_index, _, flags = self.socket_record(index)
+        return [self.string(self.node_record(node_index)[0]), bool(flags & SOCKET_IS_INPUT), socket_index]
+
+    def edge_data(self, index: int) -> Dict:
+        """Returns an edge in the form of Edge.serialize()."""
+        id_index, start, end, edge_type = self.edge_record(index)
+        return {
+            'id': self.string(id_index),
+            'edge_type': edge_type,
+            'start': self.socket_reference(start),
+            'end': self.socket_reference(end),
+        }
+
+    def tiles(self) -> Dict[Tuple[int, int], range]:
+        """Returns the node record indices of every tile of a tiled file."""
+        if self.__tiles is None:
+            self.__tiles = {}
+            for column, row, first_node, node_count in TILE_RECORD.iter_unpack(
+                self.__map[self.__tiles_offset:self.__tiles_offset + self.tile_count * TILE_RECORD.size]
+            ):
+                self.__tiles[(column, row)] = range(first_node, first_node + node_count)
+        return self.__tiles
+
+    def incident_edges(self, index: int) -> Sequence[int]:
+        """Returns the edge record indices of a node of a tiled file."""
+        start, end = struct.unpack_from('<II', self.__map, self.__adjacency_offset + index * INDEX_RECORD.size)
+        if start == end:
+            return ()
+        offset = self.__adjacency_offset + (self.node_count + 1 + start) * INDEX_RECORD.size
+        return struct.unpack_from(f'<{end - start}I', self.__map, offset)
+
+    def edge_nodes(self, index: int) -> Tuple[int, int]:
+        """Returns the node record indices of the ends of an edge."""
+        _, start, end, _ = self.edge_record(index)
+        return self.socket_record(start)[0], self.socket_record(end)[0]
+
+    def iter_nodes(self) -> Iterator[Dict]:
+        """Yields every node in the form of Node.serialize()."""
+        for index in range(self.node_count):
+            yield self.node_data(index)
+
+    def iter_edges(self) -> Iterator[Dict]:
+        """Yields every edge in the form of Edge.serialize()."""
+        for index in range(self.edge_count):
+            yield self.edge_data(index)
+
+
+
+class _StringTable:
+    """Collects the strings of a file, every distinct string is stored once."""
+
+    def __init__(self):
+        self.indices: Dict[str, int] = {}
+        self.records: bytearray = bytearray()
+        self.data: bytearray = bytearray()
+
+    def add(self, value: str) -> int:
+        index = self.indices.get(value)
+        if index is None:
+            encoded = value.encode('utf-8')
+            index = len(self.indices)
+            self.indices[value] = index
+            self.records += STRING_RECORD.pack(len(self.data), len(encoded))
+            self.data += encoded
+        return index
+
+
+
+def tile_of(x_pos: float, y_pos: float, tile_size: float) -> Tuple[int, int]:
+    """Returns the column and row of the tile holding a scene position."""
+    return math.floor(x_pos / tile_size), math.floor(y_pos / tile_size)
+
+
+
+def write_records(file, header: Dict, nodes: Iterable[Dict], edges: Iterable[Dict],
+    tile_size: float=0.0
+):
+    """Writes the plain data of a Scene to a binary file.
+
+    Only plain data is read, so this can run on any thread, see
+    scene_saver.
+
+    Args:
+        file: The file to write to, opened as binary.
+        header (Dict): The 'scene_width' and 'scene_height'.
+        nodes (Iterable[Dict]): The data of every Node, see Node.serialize().
+        edges (Iterable[Dict]): The data of every Edge, see Edge.serialize().
+        tile_size (float): The size of the square tiles the node records
+            are bucketed by, 0 for a file that is not tiled.
+    """
+    strings = _StringTable()
+    node_records = bytearray()
+    socket_records = bytearray()
+    blobs = bytearray()
+    # the index of every node id, and of its first socket and input count
+    node_indices: Dict[str, Tuple[int, int, int]] = {}
+    socket_nodes: List[int] = []
+
+    tiles = bytearray()
+    if tile_size > 0:
+        keys = {}
+        for data in nodes:
+            keys[data['id']] = (tile_of(*data['pos'], tile_size), data)
+        nodes = [data for _, data in sorted(keys.values(), key=lambda item: item[0])]
+        first_node = 0
+        for index in range(1, len(nodes) + 1):
+            key = keys[nodes[first_node]['id']][0]
+            if index == len(nodes) or keys[nodes[index]['id']][0] != key:
+                tiles += TILE_RECORD.pack(*key, first_node, index - first_node)
+                first_node = index
+
+    for node_index, data in enumerate(nodes):
+        first_socket = len(socket_nodes)
+        node_indices[data['id']] = (node_index, first_socket, len(data['inputs']))
+        for is_input, sockets in ((True, data['inputs']), (False, data['outputs'])):
+            for socket in sockets:
+                socket_nodes.append(node_index)
+                flags = (
+                    (SOCKET_IS_INPUT if is_input else 0) |
+                    (SOCKET_MULTI_EDGES if socket['multi_edges'] else 0)
+                )
+                socket_records += SOCKET_RECORD.pack(
+                    node_index, socket['socket_type'], socket['index'], socket['position'], flags
+                )
+
+        params = json.dumps(data['params'], separators=(',', ':')).encode('utf-8') if data['params'] else b''
+        node_records += NODE_RECORD.pack(
+            strings.add(data['id']), strings.add(data['class']), strings.add(data['title']),
+            *data['pos'], first_socket, len(data['inputs']), len(data['outputs']),
+            len(blobs), len(params)
+        )
+        blobs += params
+
+    def socket_index(reference: List) -> int:
+        node_id, is_input, index = reference
+        _, first_socket, input_count = node_indices[node_id]
+        return first_socket + (index if is_input else input_count + index)
+
+    edge_records = bytearray()
+    edge_count = 0
+    incident: List[List[int]] = [[] for _ in range(len(node_indices))] if tile_size > 0 else []
+    for data in edges:
+        if data['start'][0] not in node_indices or data['end'][0] not in node_indices:
+            continue
+        start = socket_index(data['start'])
+        end = socket_index(data['end'])
+        edge_records += EDGE_RECORD.pack(strings.add(data['id']), start, end, data['edge_type'])
+        if incident:
+            incident[socket_nodes[start]].append(edge_count)
+            incident[socket_nodes[end]].append(edge_count)
+        edge_count += 1
+
+    # adjacency: the start of each node's edges, then the edges themselves
+    adjacency = bytearray()
+    if incident:
+        start = 0
+        for edge_indices in incident:
+            adjacency += INDEX_RECORD.pack(start)
+            start += len(edge_indices)
+        adjacency += INDEX_RECORD.pack(start)
+        for edge_indices in incident:
+            adjacency += struct.pack(f'<{len(edge_indices)}I', *edge_indices)
+
+    sections = (
+        node_records, socket_records, edge_records, strings.records, strings.data, blobs,
+        tiles, adjacency
+    )
+    offsets = []
+    position = HEADER.size
+    for section in sections:
+        offsets.append(position)
+        position += len(section)
+
+    file.write(HEADER.pack(
+        FORMAT_MAGIC, FORMAT_VERSION, header['scene_width'], header['scene_height'], tile_size,
+        len(node_indices), len(socket_nodes), edge_count, len(strings.indices),
+        len(tiles) // TILE_RECORD.size, *offsets
+    ))
+    for section in sections:
+        file.write(section)
+
+def write_scene(scene: 'Scene', file, tile_size: float=0.0):
+    """Writes a Scene to a binary file, see write_records().
+
+    Args:
+        scene (Scene): The Scene to write.
+        file: The file to write to, opened as binary.
+        tile_size (float): The tile size of a tiled file, 0 for none.
+    """
+    write_records(
+        file, {'scene_width': scene.scene_width, 'scene_height': scene.scene_height},
+        (node_obj.serialize() for node_obj in scene.nodes),
+        (
+            edge.serialize() for edge in scene.edges
+            if edge.start_socket is not None and edge.end_socket is not None
+        ),
+        tile_size
+    )
+
+def read_scene(scene: 'Scene', filename: str) -> Tuple[List['Node'], List[node_edge.Edge]]:
+    """Reads a binary scene file into a Scene, next to the Nodes it already has.
+
+    The Nodes are created by scene_json.create_node(), so the Scene's
+    node_class_selector chooses their classes.
+
+    Args:
+        scene (Scene): The Scene to add the Nodes and Edges to.
+        filename (str): The path to read.
+
+    Returns:
+        Tuple[List[Node], List[Edge]]: The new Nodes and Edges.
+    """
+    nodes = []
+    edges = []
+    # the Socket of every socket record, None if the Node class has fewer
+    sockets = []
+    with BinarySceneFile(filename) as graph_file, scene.bulk_construction():
+        for index in range(graph_file.node_count):
+            data = graph_file.node_data(index)
+            node_obj = scene_json.create_node(scene, data)
+            nodes.append(node_obj)
+            for side, count in ((node_obj.inputs, len(data['inputs'])), (node_obj.outputs, len(data['outputs']))):
+                sockets.extend(side[offset] if offset < len(side) else None for offset in range(count))
+
+        for index in range(graph_file.edge_count):
+            id_index, start, end, edge_type = graph_file.edge_record(index)
+            if sockets[start] is None or sockets[end] is None:
+                continue
+            edges.append(scene_json.connect_sockets(
+                scene, sockets[start], sockets[end], edge_type, graph_file.string(id_index)
+            ))
+    return nodes, edges
+
+
+
+def save_scene(scene: 'Scene', filename: str, tile_size: float=0.0):
+    """Saves a Scene, the file is replaced only once it is complete.
+
+    Args:
+        scene (Scene): The Scene to save.
+        filename (str): The path to save to.
+        tile_size (float): The tile size of a tiled file, see write_scene().
+    """
+    temp_filename = filename + '.tmp'
+    with open(temp_filename, 'wb') as file:
+        write_scene(scene, file, tile_size)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_filename, filename)
+
+def save_records(filename: str, header: Dict, nodes: Iterable[Dict], edges: Iterable[Dict],
+    tile_size: float=0.0
+):
+    """Saves the plain data of a Scene, see write_records() and save_scene()."""
+    temp_filename = filename + '.tmp'
+    with open(temp_filename, 'wb') as file:
+        write_records(file, header, nodes, edges, tile_size)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_filename, filename)
+
+def load_scene(scene: 'Scene', filename: str):
+    """Replaces the content of a Scene with a binary scene file.
+
+    Args:
+        scene (Scene): The Scene to load into.
+        filename (str): The path to load.
+    """
+    scene.clear()
+    read_scene(scene, filename)
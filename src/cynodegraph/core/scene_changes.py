@@ -0,0 +1,406 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=no-name-in-module
+from __future__ import generator_stop
+from __future__ import annotations
+
+import json
+import queue
+import socket
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Tuple
+
+from PyQt5.QtCore import pyqtSignal, QObject, Qt, QTimer
+
+from cynodegraph.core import logparams
+from cynodegraph.core import node_scene
+
+
+
+#: The kinds of Change, the operations the Scene reports
+CHANGE_KINDS = (
+    node_scene.OP_NODE_ADD, node_scene.OP_NODE_REMOVE, node_scene.OP_NODE_MOVE,
+    node_scene.OP_NODE_TITLE, node_scene.OP_EDGE_ADD, node_scene.OP_EDGE_REMOVE, node_scene.OP_PARAM, node_scene.OP_RESET,
+)
+
+
+
+@dataclass
+class Change:
+    """One typed change of a Scene.
+
+    Attributes:
+        kind (str): One of the node_scene.OP_ constants.
+        data (Dict): The data of the change, see Scene.record_operation().
+    """
+    kind: str
+    data: Dict
+
+@dataclass
+class ChangeBatch:
+    """The changes of a Scene between two flushes of a ChangeStream.
+
+    Attributes:
+        changes (List[Change]): The changes in the order they happened.
+        sequence (int): The Scene's operation count after the last change.
+    """
+    changes: List[Change]
+    sequence: int
+
+    def to_data(self) -> Dict:
+        """Returns the batch as plain data."""
+        return {
+            'sequence': self.sequence,
+            'changes': [[change.kind, change.data] for change in self.changes],
+        }
+
+    @classmethod
+    def from_data(cls, data: Dict) -> ChangeBatch:
+        """Creates a batch from the plain data of to_data()."""
+        return cls([Change(kind, change_data) for kind, change_data in data['changes']], data['sequence'])
+
+    def encode(self) -> bytes:
+        """Returns the batch as one line of JSON, encoded once however often asked."""
+        encoded = getattr(self, '_encoded', None)
+        if encoded is None:
+            encoded = json.dumps(self.to_data(), separators=(',', ':'), default=repr).encode('utf-8') + b'\n'
+            # pylint: disable=attribute-defined-outside-init
+            # Reasoning: A cache, not part of the batch's state.
+            self._encoded = encoded
+        return encoded
+
+
+
+def snapshot_changes(scene: 'Scene') -> List[Change]:
+    """Returns the changes that build the current content of a Scene from nothing."""
+    changes = [Change(node_scene.OP_RESET, {})]
+    changes.extend(Change(node_scene.OP_NODE_ADD, node_obj.serialize()) for node_obj in scene.nodes)
+    changes.extend(
+        Change(node_scene.OP_EDGE_ADD, edge.serialize()) for edge in scene.edges
+        if edge.start_socket is not None and edge.end_socket is not None
+    )
+    return changes
+
+
+
+class SceneMirror:
+    """Plain data copy of a Scene, kept up to date from change batches.
+
+    Attributes:
+        nodes (Dict[str, Dict]): The data of every Node by id, see
+            Node.serialize().
+        edges (Dict[str, Dict]): The data of every Edge by id, see
+            Edge.serialize().
+        sequence (int): The sequence of the last batch applied.
+    """
+
+    def __init__(self):
+        self.nodes: Dict[str, Dict] = {}
+        self.edges: Dict[str, Dict] = {}
+        self.sequence: int = 0
+
+    def apply(self, batch: ChangeBatch):
+        """Applies the changes of a batch, a ChangeStream subscriber."""
+        for change in batch.changes:
+            data = change.data
+            if change.kind == node_scene.OP_NODE_ADD:
+                self.nodes[data['id']] = data
+            elif change.kind == node_scene.OP_NODE_REMOVE:
+                # its Edges are removed by changes of their own first
+                self.nodes.pop(data['id'], None)
+            elif change.kind == node_scene.OP_NODE_MOVE and data['id'] in self.nodes:
+                self.nodes[data['id']] = dict(self.nodes[data['id']], pos=data['pos'])
+            elif change.kind == node_scene.OP_NODE_TITLE and data['id'] in self.nodes:
+                self.nodes[data['id']] = dict(self.nodes[data['id']], title=data['title'])
+            elif change.kind == node_scene.OP_PARAM and data['id'] in self.nodes:
+                node_data = self.nodes[data['id']]
+                self.nodes[data['id']] = dict(
+                    node_data, params={**node_data['params'], data['name']: data['value']}
+                )
+            elif change.kind == node_scene.OP_EDGE_ADD:
+                self.edges[data['id']] = data
+            elif change.kind == node_scene.OP_EDGE_REMOVE:
+                self.edges.pop(data['id'], None)
+            elif change.kind == node_scene.OP_RESET:
+                self.nodes.clear()
+                self.edges.clear()
+        self.sequence = batch.sequence
+
+
+
+class _ChangeClient:
+    """A socket subscriber, written to by its own thread so a slow reader
+    never blocks the Scene."""
+
+    def __init__(self, connection: socket.socket, max_pending: int):
+        self.connection: socket.socket = connection
+        self.pending: queue.Queue = queue.Queue(max_pending)
+        self.is_closed: bool = False
+        threading.Thread(target=self.__write, daemon=True).start()
+
+    def send(self, batch: ChangeBatch):
+        """Queues a batch for the client, drops the client if it falls behind."""
+        try:
+            self.pending.put_nowait(batch)
+        except queue.Full:
+            logparams.logging.warning("Dropping a change stream client that fell behind")
+            self.close()
+
+    def close(self):
+        """Ends the connection without waiting for the writer thread."""
+        if self.is_closed:
+            return
+        self.is_closed = True
+        # the queued batches will not be sent, make room to wake the writer
+        try:
+            while True:
+                self.pending.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            self.pending.put_nowait(None)
+        except queue.Full:
+            pass
+        # fails a sendall stuck on a client that is not reading
+        try:
+            self.connection.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def __write(self):
+        try:
+            while True:
+                batch = self.pending.get()
+                if batch is None or self.is_closed:
+                    return
+                self.connection.sendall(batch.encode())
+        except OSError:
+            self.is_closed = True
+        finally:
+            self.connection.close()
+
+
+
+class ChangeStream(QObject):
+    """Typed, batched deltas of a Scene for external consumers.
+
+    The stream follows the Scene's operations, see
+    Scene.addOperationListener(). Changes are collected and delivered as
+    one ChangeBatch per flush. A flush is scheduled for when control
+    returns to the event loop, or batch_interval milliseconds later, so
+    a drag, a paste or a file load arrive as one batch. Without an event
+    loop call flush() yourself.
+
+    Consecutive moves or renames of a Node and changes of one parameter
+    within a batch are coalesced into the last one. When the Scene is
+    cleared or loaded the batch is replaced by a reset followed by the
+    new content.
+
+    Subscribers get the current content as the first batch, then every
+    batch. They can be callbacks called on the Scene's thread, see
+    subscribe(), thread-safe queues, see open_queue(), or socket
+    connections receiving one line of JSON per batch, see serve().
+
+    Args:
+        scene (Scene): The Scene to follow.
+        batch_interval (int): The milliseconds changes are collected for.
+        parent (QObject): The parent of the stream.
+    """
+
+    # pyqtSignal emitted from the server thread with a new connection
+    _client_connected = pyqtSignal(object)
+
+    def __init__(self, scene: 'Scene', batch_interval: int=0, parent: QObject=None):
+        super().__init__(parent)
+        self.scene: 'Scene' = scene
+        self.__subscribers: List[Callable[[ChangeBatch], None]] = []
+        self.__pending: List[Change] = []
+        self.__coalesce: Dict[Tuple, Change] = {}
+        self.__reset: bool = False
+        self.__queues: Dict[int, Callable[[ChangeBatch], None]] = {}
+        self.__server: socket.socket = None
+        self.__max_pending: int = 0
+        self.__clients: List[_ChangeClient] = []
+
+        self.__timer: QTimer = QTimer(self)
+        self.__timer.setSingleShot(True)
+        self.__timer.setInterval(batch_interval)
+        self.__timer.timeout.connect(self.flush)
+        self._client_connected.connect(self.__add_client, Qt.QueuedConnection)
+
+        self.scene.addOperationListener(self.on_operation)
+
+    def close(self):
+        """Stops following the Scene and disconnects every socket client."""
+        self.scene.removeOperationListener(self.on_operation)
+        self.__timer.stop()
+        if self.__server is not None:
+            self.__server.close()
+            self.__server = None
+        for client in self.__clients:
+            client.close()
+        self.__clients.clear()
+        self.__subscribers.clear()
+        self.__queues.clear()
+
+    def on_operation(self, operation: str, data: Dict):
+        """Collects an operation of the Scene, the Scene's operation listener."""
+        if operation == node_scene.OP_RESET:
+            # the content is sent whole at the flush
+            self.__pending.clear()
+            self.__coalesce.clear()
+            self.__reset = True
+        elif not self.__reset:
+            key = None
+            if operation in (node_scene.OP_NODE_MOVE, node_scene.OP_NODE_TITLE):
+                key = (operation, data['id'])
+            elif operation == node_scene.OP_PARAM:
+                key = (operation, data['id'], data['name'])
+            elif operation == node_scene.OP_NODE_REMOVE:
+                self.__coalesce.pop((node_scene.OP_NODE_MOVE, data['id']), None)
+                self.__coalesce.pop((node_scene.OP_NODE_TITLE, data['id']), None)
+
+            change = self.__coalesce.get(key)
+            if change is not None:
+                change.data = data
+            else:
+                change = Change(operation, data)
+                self.__pending.append(change)
+                if key is not None:
+                    self.__coalesce[key] = change
+
+        if not self.__timer.isActive():
+            self.__timer.start()
+
+    def flush(self):
+        """Delivers the collected changes to the subscribers as one batch."""
+        self.__timer.stop()
+        if self.__reset:
+            changes = snapshot_changes(self.scene)
+        elif self.__pending:
+            changes = self.__pending
+        else:
+            return
+        self.__pending = []
+        self.__coalesce.clear()
+        self.__reset = False
+
+        batch = ChangeBatch(changes, self.scene.operation_count)
+        for callback in list(self.__subscribers):
+            callback(batch)
+
+    def subscribe(self, callback: Callable[[ChangeBatch], None], snapshot: bool=True):
+        """Calls a function with every batch, on the Scene's thread.
+
+        Args:
+            callback (Callable[[ChangeBatch], None]): The subscriber.
+            snapshot (bool): Whether the subscriber first gets the current
+                content of the Scene.
+        """
+        self.flush()
+        if snapshot:
+            callback(ChangeBatch(snapshot_changes(self.scene), self.scene.operation_count))
+        self.__subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[ChangeBatch], None]):
+        """Stops calling a subscriber."""
+        if callback in self.__subscribers:
+            self.__subscribers.remove(callback)
+
+    def open_queue(self, max_size: int=0, snapshot: bool=True) -> queue.Queue:
+        """Returns a thread-safe queue every batch is put on.
+
+        A bounded queue that is full is closed: it gets None and no more
+        batches.
+
+        Args:
+            max_size (int): The most batches the queue holds, 0 for no
+                limit.
+            snapshot (bool): Whether the first batch is the current content
+                of the Scene.
+        """
+        batches = queue.Queue(max_size)
+
+        def put(batch: ChangeBatch):
+            try:
+                batches.put_nowait(batch)
+            except queue.Full:
+                logparams.logging.warning("Closing a change stream queue that is full")
+                self.close_queue(batches)
+                with batches.mutex:
+                    batches.queue.append(None)
+                    batches.not_empty.notify()
+
+        self.__queues[id(batches)] = put
+        self.subscribe(put, snapshot)
+        return batches
+
+    def close_queue(self, batches: queue.Queue):
+        """Stops putting batches on a queue of open_queue()."""
+        callback = self.__queues.pop(id(batches), None)
+        if callback is not None:
+            self.unsubscribe(callback)
+
+    def serve(self, host: str='127.0.0.1', port: int=0, max_pending: int=1024) -> Tuple[str, int]:
+        """Sends every batch to the clients connecting to a local TCP port.
+
+        Each batch is one line of JSON, see ChangeBatch.to_data(). A new
+        client first gets the current content of the Scene. A client more
+        than max_pending batches behind is disconnected.
+
+        Args:
+            host (str): The address to listen on, keep it local.
+            port (int): The port to listen on, 0 for any free port.
+            max_pending (int): The most batches queued for one client.
+
+        Returns:
+            Tuple[str, int]: The address listened on.
+        """
+        if self.__server is None:
+            self.__server = socket.create_server((host, port))
+            self.__max_pending = max_pending
+            threading.Thread(target=self.__accept, args=(self.__server,), daemon=True).start()
+        return self.__server.getsockname()[:2]
+
+    def __accept(self, server: socket.socket):
+        while True:
+            try:
+                connection, _ = server.accept()
+            except OSError:
+                return
+            connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._client_connected.emit(connection)
+
+    def __add_client(self, connection: socket.socket):
+        """Subscribes a new connection, on the Scene's thread."""
+        if self.__server is None:
+            connection.close()
+            return
+        client = _ChangeClient(connection, self.__max_pending)
+        self.__clients = [known for known in self.__clients if not known.is_closed]
+        self.__clients.append(client)
+
+        def send(batch: ChangeBatch):
+            if client.is_closed:
+                self.unsubscribe(send)
+            else:
+                client.send(batch)
+
+        self.subscribe(send)
+
+
+
+def iter_remote_batches(address: Tuple[str, int], timeout: float=None) -> Iterator[ChangeBatch]:
+    """Connects to ChangeStream.serve() and yields the batches it sends.
+
+    Args:
+        address (Tuple[str, int]): The host and port served on.
+        timeout (float): The most seconds to wait for a batch.
+
+    Yields:
+        ChangeBatch: Every batch, the current content of the Scene first.
+    """
+    with socket.create_connection(address, timeout=timeout) as connection:
+        with connection.makefile('rb') as lines:
+            for line in lines:
+                yield ChangeBatch.from_data(json.loads(line))
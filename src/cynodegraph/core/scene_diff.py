@@ -0,0 +1,493 @@
+# pylint: disable=missing-module-docstring
+from __future__ import generator_stop
+from __future__ import annotations
+
+import argparse
+import sys
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Tuple
+
+from cynodegraph.core import project_file
+from cynodegraph.core import scene_binary
+from cynodegraph.core import scene_json
+
+
+
+#: The fields of a Node compared as a whole, 'pos' and 'params' are
+#: compared on their own
+NODE_FIELDS = ('class', 'title', 'inputs', 'outputs')
+
+_MISSING = object()
+
+
+
+def _display(value: Any) -> Any:
+    return '<missing>' if value is _MISSING else value
+
+def _input_reference(edge_data: Dict) -> Tuple:
+    """Returns the input side Socket of an Edge as a hashable reference."""
+    reference = edge_data['start'] if edge_data['start'][1] else edge_data['end']
+    return tuple(reference)
+
+def node_changes(old: Dict, new: Dict) -> Dict[str, Tuple[Any, Any]]:
+    """Compares two versions of a Node, leaving out its position.
+
+    Args:
+        old (Dict): The old data, see Node.serialize().
+        new (Dict): The new data.
+
+    Returns:
+        Dict[str, Tuple[Any, Any]]: The old and new value of every changed
+            field, parameters as 'params.<name>'.
+    """
+    changes = {}
+    for name in NODE_FIELDS:
+        if old.get(name) != new.get(name):
+            changes[name] = (old.get(name), new.get(name))
+    old_params = old.get('params', {})
+    new_params = new.get('params', {})
+    if old_params != new_params:
+        for name in old_params.keys() | new_params.keys():
+            old_value = old_params.get(name, _MISSING)
+            new_value = new_params.get(name, _MISSING)
+            if old_value is _MISSING or new_value is _MISSING or old_value != new_value:
+                changes[f'params.{name}'] = (_display(old_value), _display(new_value))
+    return changes
+
+
+
+@dataclass
+class SceneDiff:
+    """The structural difference between two versions of a scene.
+
+    Nodes and Edges are matched by their ids. An Edge that was removed
+    while another one was added to the same input Socket is reported as
+    rewired, like one that kept its id but changed its Sockets or type.
+
+    Attributes:
+        added_nodes (Dict[str, Dict]): The data of the new Nodes by id.
+        removed_nodes (Dict[str, Dict]): The data of the removed Nodes by id.
+        modified_nodes (Dict[str, Dict[str, Tuple[Any, Any]]]): The changes
+            of every modified Node, see node_changes().
+        moved_nodes (Dict[str, Tuple[List[float], List[float]]]): The old
+            and new position of every moved Node.
+        added_edges (Dict[str, Dict]): The data of the new Edges by id.
+        removed_edges (Dict[str, Dict]): The data of the removed Edges by id.
+        rewired_edges (Dict[str, Tuple[Dict, Dict]]): The old and new data
+            of every rewired Edge, by its old id.
+    """
+    added_nodes: Dict[str, Dict] = field(default_factory=dict)
+    removed_nodes: Dict[str, Dict] = field(default_factory=dict)
+    modified_nodes: Dict[str, Dict[str, Tuple[Any, Any]]] = field(default_factory=dict)
+    moved_nodes: Dict[str, Tuple[List[float], List[float]]] = field(default_factory=dict)
+    added_edges: Dict[str, Dict] = field(default_factory=dict)
+    removed_edges: Dict[str, Dict] = field(default_factory=dict)
+    rewired_edges: Dict[str, Tuple[Dict, Dict]] = field(default_factory=dict)
+
+    def is_empty(self) -> bool:
+        """Returns True if the two versions are the same."""
+        return not any((
+            self.added_nodes, self.removed_nodes, self.modified_nodes, self.moved_nodes,
+            self.added_edges, self.removed_edges, self.rewired_edges
+        ))
+
+    def summary(self) -> List[str]:
+        """Returns one line of text per change."""
+        lines = [f"+ node {node_id} {data['title']!r}" for node_id, data in self.added_nodes.items()]
+        lines += [f"- node {node_id} {data['title']!r}" for node_id, data in self.removed_nodes.items()]
+        for node_id, changes in self.modified_nodes.items():
+            lines += [
+                f"~ node {node_id} {name}: {old!r} -> {new!r}" for name, (old, new) in changes.items()
+            ]
+        lines += [
+            f"> node {node_id} moved {old} -> {new}" for node_id, (old, new) in self.moved_nodes.items()
+        ]
+        lines += [
+            f"+ edge {edge_id} {data['start']} -> {data['end']}"
+            for edge_id, data in self.added_edges.items()
+        ]
+        lines += [
+            f"- edge {edge_id} {data['start']} -> {data['end']}"
+            for edge_id, data in self.removed_edges.items()
+        ]
+        lines += [
+            f"~ edge {edge_id} {old['start']} -> {old['end']} rewired to "
+            f"{new['start']} -> {new['end']}"
+            for edge_id, (old, new) in self.rewired_edges.items()
+        ]
+        return lines
+
+def diff_records(old_nodes: Dict[str, Dict], old_edges: Dict[str, Dict],
+    new_nodes: Dict[str, Dict], new_edges: Dict[str, Dict]
+) -> SceneDiff:
+    """Compares two versions of a scene in time linear in their size.
+
+    Args:
+        old_nodes (Dict[str, Dict]): The old Nodes' data by id, see
+            Node.serialize().
+        old_edges (Dict[str, Dict]): The old Edges' data by id, see
+            Edge.serialize().
+        new_nodes (Dict[str, Dict]): The new Nodes' data by id.
+        new_edges (Dict[str, Dict]): The new Edges' data by id.
+
+    Returns:
+        SceneDiff: The difference.
+    """
+    diff = SceneDiff()
+    for node_id, old in old_nodes.items():
+        new = new_nodes.get(node_id)
+        if new is None:
+            diff.removed_nodes[node_id] = old
+            continue
+        if old == new:
+            continue
+        if old['pos'] != new['pos']:
+            diff.moved_nodes[node_id] = (old['pos'], new['pos'])
+        changes = node_changes(old, new)
+        if changes:
+            diff.modified_nodes[node_id] = changes
+    diff.added_nodes = {
+        node_id: data for node_id, data in new_nodes.items() if node_id not in old_nodes
+    }
+
+    for edge_id, old in old_edges.items():
+        new = new_edges.get(edge_id)
+        if new is None:
+            diff.removed_edges[edge_id] = old
+        elif old != new:
+            diff.rewired_edges[edge_id] = (old, new)
+    added = {edge_id: data for edge_id, data in new_edges.items() if edge_id not in old_edges}
+    by_input: Dict[Tuple, List[Dict]] = {}
+    for data in added.values():
+        by_input.setdefault(_input_reference(data), []).append(data)
+    for edge_id, old in list(diff.removed_edges.items()):
+        candidates = by_input.get(_input_reference(old))
+        if candidates:
+            new = candidates.pop()
+            del diff.removed_edges[edge_id]
+            del added[new['id']]
+            diff.rewired_edges[edge_id] = (old, new)
+    diff.added_edges = added
+    return diff
+
+
+
+@dataclass
+class Conflict:
+    """A change both sides of a merge made differently.
+
+    Attributes:
+        kind (str): 'node', 'edge' or 'socket'.
+        item_id (str): The id of the Node or Edge, '<node id>:<index>' for
+            an input Socket.
+        name (str): The conflicting field, 'params.<name>' for parameters,
+            'removed' when one side removed what the other changed,
+            'dangling' for an Edge whose Socket was removed and 'rewired'
+            for a single Edge input both sides connected differently.
+        base (Any): The value in the common ancestor.
+        ours (Any): Our value, the one kept in the result.
+        theirs (Any): Their value.
+    """
+    kind: str
+    item_id: str
+    name: str
+    base: Any
+    ours: Any
+    theirs: Any
+
+    def __str__(self) -> str:
+        return (
+            f"{self.kind} {self.item_id} {self.name}: base {_display(self.base)!r}, "
+            f"ours {_display(self.ours)!r}, theirs {_display(self.theirs)!r}"
+        )
+
+@dataclass
+class MergeResult:
+    """The outcome of a three-way merge.
+
+    Attributes:
+        nodes (List[Dict]): The merged Nodes' data, see Node.serialize().
+        edges (List[Dict]): The merged Edges' data, see Edge.serialize().
+        conflicts (List[Conflict]): The conflicts, resolved in our favour.
+    """
+    nodes: List[Dict]
+    edges: List[Dict]
+    conflicts: List[Conflict]
+
+def _merge_value(base: Any, ours: Any, theirs: Any) -> Tuple[Any, bool]:
+    """Returns the merged value and if both sides changed it differently."""
+    if ours == theirs or theirs == base:
+        return ours, False
+    if ours == base:
+        return theirs, False
+    return ours, True
+
+def _merge_node(node_id: str, base: Dict, ours: Dict, theirs: Dict, conflicts: List[Conflict]) -> Dict:
+    merged = dict(ours)
+    for name in NODE_FIELDS + ('pos',):
+        values = (base.get(name, _MISSING), ours.get(name, _MISSING), theirs.get(name, _MISSING))
+        merged[name], conflict = _merge_value(*values)
+        if conflict:
+            conflicts.append(Conflict('node', node_id, name, *values))
+
+    base_params = base.get('params', {})
+    our_params = ours.get('params', {})
+    their_params = theirs.get('params', {})
+    params = {}
+    for name in dict.fromkeys([*our_params, *their_params, *base_params]):
+        values = (
+            base_params.get(name, _MISSING), our_params.get(name, _MISSING),
+            their_params.get(name, _MISSING)
+        )
+        value, conflict = _merge_value(*values)
+        if conflict:
+            conflicts.append(Conflict('node', node_id, f'params.{name}', *values))
+        if value is not _MISSING:
+            params[name] = value
+    merged['params'] = params
+    return merged
+
+def _merge_edge(edge_id: str, base: Dict, ours: Dict, theirs: Dict, conflicts: List[Conflict]) -> Dict:
+    merged, conflict = _merge_value(base or _MISSING, ours, theirs)
+    if conflict:
+        conflicts.append(Conflict('edge', edge_id, 'edge', base or _MISSING, ours, theirs))
+    return merged
+
+# pylint: disable=too-many-arguments
+# Reasoning: Useful and does no harm.
+def _merge_items(kind: str, base: Dict[str, Dict], ours: Dict[str, Dict], theirs: Dict[str, Dict],
+    merge_one: Callable[[str, Dict, Dict, Dict, List[Conflict]], Dict], conflicts: List[Conflict]
+) -> List[Dict]:
+    merged = []
+    for item_id in dict.fromkeys([*ours, *theirs, *base]):
+        base_data = base.get(item_id)
+        our_data = ours.get(item_id)
+        their_data = theirs.get(item_id)
+        if our_data is None and their_data is None:
+            continue
+        if base_data is None:
+            # added on one side, or on both
+            if our_data is not None and their_data is not None:
+                merged.append(merge_one(item_id, {}, our_data, their_data, conflicts))
+            else:
+                merged.append(our_data or their_data)
+        elif our_data is None or their_data is None:
+            kept = our_data or their_data
+            if kept != base_data:
+                # removed on one side and changed on the other, keep the change
+                conflicts.append(Conflict(
+                    kind, item_id, 'removed', base_data, our_data or _MISSING, their_data or _MISSING
+                ))
+                merged.append(kept)
+        else:
+            merged.append(merge_one(item_id, base_data, our_data, their_data, conflicts))
+    return merged
+
+def merge_records(base: Tuple[Dict[str, Dict], Dict[str, Dict]],
+    ours: Tuple[Dict[str, Dict], Dict[str, Dict]], theirs: Tuple[Dict[str, Dict], Dict[str, Dict]]
+) -> MergeResult:
+    """Merges two versions of a scene with their common ancestor.
+
+    Nodes are merged field by field and their parameters name by name, a
+    change made on one side only wins. Edges are merged as a whole. Edges
+    left without one of their Sockets are dropped, a conflict unless they
+    are unchanged from the ancestor. An input taking a single Edge that
+    both sides connected differently is a conflict too. Conflicts are
+    resolved in our favour and reported. The time taken is linear in the
+    size of the scenes.
+
+    Args:
+        base (Tuple[Dict[str, Dict], Dict[str, Dict]]): The common
+            ancestor's Nodes and Edges by id.
+        ours (Tuple[Dict[str, Dict], Dict[str, Dict]]): Our Nodes and Edges.
+        theirs (Tuple[Dict[str, Dict], Dict[str, Dict]]): Their Nodes and
+            Edges.
+
+    Returns:
+        MergeResult: The merged scene and the conflicts.
+    """
+    conflicts = []
+    nodes = _merge_items('node', base[0], ours[0], theirs[0], _merge_node, conflicts)
+    edges = _merge_items('edge', base[1], ours[1], theirs[1], _merge_edge, conflicts)
+
+    socket_counts = {data['id']: (len(data['outputs']), len(data['inputs'])) for data in nodes}
+
+    def has_socket(reference: List) -> bool:
+        node_id, is_input, index = reference
+        return node_id in socket_counts and index < socket_counts[node_id][bool(is_input)]
+
+    kept = []
+    for data in edges:
+        if has_socket(data['start']) and has_socket(data['end']):
+            kept.append(data)
+        elif data != base[1].get(data['id']):
+            # an Edge one side added or changed lost a Socket to the other side
+            conflicts.append(Conflict(
+                'edge', data['id'], 'dangling', base[1].get(data['id'], _MISSING),
+                ours[1].get(data['id'], _MISSING), theirs[1].get(data['id'], _MISSING)
+            ))
+    kept = _resolve_rewired(nodes, kept, base[1], ours[1], theirs[1], conflicts)
+    return MergeResult(nodes, kept, conflicts)
+
+def _incoming_edges(edges: Dict[str, Dict]) -> Dict[Tuple, set]:
+    """Returns the ids of the Edges connected to every input Socket."""
+    incoming = {}
+    for edge_id, data in edges.items():
+        incoming.setdefault(_input_reference(data), set()).add(edge_id)
+    return incoming
+
+# pylint: disable=too-many-arguments
+# Reasoning: Useful and does no harm.
+def _resolve_rewired(nodes: List[Dict], edges: List[Dict], base: Dict[str, Dict],
+    ours: Dict[str, Dict], theirs: Dict[str, Dict], conflicts: List[Conflict]
+) -> List[Dict]:
+    """Keeps our Edges of the single Edge inputs both sides rewired.
+
+    Merged as a whole, the Edges both sides connected to one input would
+    all be kept, more than the input takes.
+    """
+    inputs = {data['id']: data['inputs'] for data in nodes}
+    by_input = {}
+    for data in edges:
+        by_input.setdefault(_input_reference(data), []).append(data)
+
+    base_in, our_in, their_in = _incoming_edges(base), _incoming_edges(ours), _incoming_edges(theirs)
+    dropped = set()
+    for reference, socket_edges in by_input.items():
+        node_id, _, index = reference
+        if len(socket_edges) < 2 or inputs[node_id][index].get('multi_edges', False):
+            continue
+        base_ids = base_in.get(reference, set())
+        our_ids = our_in.get(reference, set())
+        their_ids = their_in.get(reference, set())
+        if base_ids != our_ids and base_ids != their_ids and our_ids != their_ids:
+            conflicts.append(Conflict(
+                'socket', f'{node_id}:{index}', 'rewired',
+                sorted(base_ids), sorted(our_ids), sorted(their_ids)
+            ))
+            dropped.update(data['id'] for data in socket_edges if data['id'] not in our_ids)
+    return [data for data in edges if data['id'] not in dropped]
+
+
+
+def file_format(filename: str) -> 'Module':
+    """Returns the module that reads and writes a scene file, by its content.
+
+    Unlike node_scene.scene_file_format() this does not need the right
+    extension, git hands merge drivers temporary files without one.
+    """
+    with open(filename, 'rb') as file:
+        magic = file.read(4)
+    if magic == scene_binary.FORMAT_MAGIC:
+        return scene_binary
+    if magic == project_file.FORMAT_MAGIC:
+        return project_file
+    return scene_json
+
+def read_records(filename: str) -> Tuple[Dict, Dict[str, Dict], Dict[str, Dict]]:
+    """Reads a scene file of any format without a Scene.
+
+    Args:
+        filename (str): The path to read.
+
+    Returns:
+        Tuple[Dict, Dict[str, Dict], Dict[str, Dict]]: The header, and the
+            Nodes' and Edges' data by id.
+    """
+    module = file_format(filename)
+    if module is scene_binary:
+        with scene_binary.BinarySceneFile(filename) as graph_file:
+            header = {'scene_width': graph_file.scene_width, 'scene_height': graph_file.scene_height}
+            nodes = {data['id']: data for data in graph_file.iter_nodes()}
+            edges = {data['id']: data for data in graph_file.iter_edges()}
+    elif module is project_file:
+        with project_file.ProjectFile(filename) as project:
+            header = dict(project.header)
+            nodes = {data['id']: data for data in project.iter_nodes()}
+            edges = {data['id']: data for data in project.iter_edges()}
+    else:
+        header = {}
+        nodes = {}
+        edges = {}
+        with open(filename, 'r', encoding='utf-8') as file:
+            for key, value in scene_json.iter_records(file):
+                if key == 'nodes':
+                    nodes[value['id']] = value
+                elif key == 'edges':
+                    edges[value['id']] = value
+                elif key not in ('format', 'version'):
+                    header[key] = value
+    return header, nodes, edges
+
+def diff_files(old_filename: str, new_filename: str) -> SceneDiff:
+    """Compares two scene files, see diff_records()."""
+    _, old_nodes, old_edges = read_records(old_filename)
+    _, new_nodes, new_edges = read_records(new_filename)
+    return diff_records(old_nodes, old_edges, new_nodes, new_edges)
+
+def merge_files(base_filename: str, our_filename: str, their_filename: str,
+    output_filename: str=None
+) -> MergeResult:
+    """Merges two scene files with their common ancestor, see merge_records().
+
+    Args:
+        base_filename (str): The common ancestor.
+        our_filename (str): Our version.
+        their_filename (str): Their version.
+        output_filename (str): Where the result is saved, in the format of
+            our version, by default over our version.
+
+    Returns:
+        MergeResult: The merged scene and the conflicts.
+    """
+    _, *base = read_records(base_filename)
+    header, *ours = read_records(our_filename)
+    _, *theirs = read_records(their_filename)
+    result = merge_records(base, ours, theirs)
+    file_format(our_filename).save_records(
+        output_filename or our_filename, header, result.nodes, result.edges
+    )
+    return result
+
+
+
+def main(argv: List[str]=None) -> int:
+    """Command line entry point that diffs or merges scene files.
+
+    To let git merge scene files, configure the driver:
+
+        git config merge.cynodegraph.driver \\
+            "python -m cynodegraph.core.scene_diff merge %O %A %B"
+
+    and assign it in .gitattributes, for example '*.cyng merge=cynodegraph'.
+
+    Returns:
+        int: The exit status, 1 for differences or conflicts.
+    """
+    parser = argparse.ArgumentParser(description="Cyphix node graph scene diff and merge")
+    commands = parser.add_subparsers(dest='command', required=True)
+    diff_parser = commands.add_parser('diff', help="show the changes between two scene files")
+    diff_parser.add_argument('old')
+    diff_parser.add_argument('new')
+    merge_parser = commands.add_parser('merge', help="three-way merge, writes over OURS")
+    merge_parser.add_argument('base')
+    merge_parser.add_argument('ours')
+    merge_parser.add_argument('theirs')
+    merge_parser.add_argument('-o', '--output', default=None)
+    args = parser.parse_args(argv)
+
+    if args.command == 'diff':
+        diff = diff_files(args.old, args.new)
+        for line in diff.summary():
+            print(line)
+        return 0 if diff.is_empty() else 1
+
+    result = merge_files(args.base, args.ours, args.theirs, args.output)
+    for conflict in result.conflicts:
+        print(f"conflict: {conflict}", file=sys.stderr)
+    return 1 if result.conflicts else 0
+
+
+
+if __name__ == '__main__':
+    sys.exit(main())
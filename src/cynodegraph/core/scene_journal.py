@@ -0,0 +1,251 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=no-name-in-module
+from __future__ import generator_stop
+from __future__ import annotations
+
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Dict, Iterator, Tuple
+
+from cynodegraph.core import logparams
+from cynodegraph.core import node_scene
+from cynodegraph.core import scene_binary
+from cynodegraph.core import scene_json
+
+
+
+#: Record header, the payload length and its crc32
+_HEADER = struct.Struct('!II')
+
+#: The compact code written for each operation
+OPERATION_CODES = {
+    node_scene.OP_NODE_ADD: 0,
+    node_scene.OP_NODE_REMOVE: 1,
+    node_scene.OP_NODE_MOVE: 2,
+    node_scene.OP_EDGE_ADD: 3,
+    node_scene.OP_EDGE_REMOVE: 4,
+    node_scene.OP_PARAM: 5,
+    node_scene.OP_RESET: 6,
+    node_scene.OP_NODE_TITLE: 7,
+}
+_OPERATIONS = {code: operation for operation, code in OPERATION_CODES.items()}
+
+
+
+def apply_operation(scene: 'Scene', operation: str, data: Dict, nodes: Dict[str, 'Node'],
+    edges: Dict[str, 'Edge']
+):
+    """Applies an operation reported by Scene.record_operation() to a Scene.
+
+    Operations on Nodes or Edges that do not exist are skipped.
+
+    Args:
+        scene (Scene): The Scene to change.
+        operation (str): One of the node_scene.OP_ constants.
+        data (Dict): The data of the operation.
+        nodes (Dict[str, Node]): The Scene's Nodes by id, kept up to date.
+        edges (Dict[str, Edge]): The Scene's Edges by id, kept up to date.
+    """
+    if operation == node_scene.OP_NODE_ADD:
+        nodes[data['id']] = scene_json.create_node(scene, data)
+    elif operation == node_scene.OP_EDGE_ADD:
+        edge = scene_json.create_edge(scene, data, nodes)
+        if edge is not None:
+            edges[edge.id] = edge
+    elif operation == node_scene.OP_RESET:
+        scene.clear()
+        nodes.clear()
+        edges.clear()
+    elif operation in (node_scene.OP_NODE_REMOVE, node_scene.OP_NODE_MOVE, node_scene.OP_NODE_TITLE,
+        node_scene.OP_PARAM
+    ):
+        node_obj = nodes.get(data['id'])
+        if node_obj is None or node_obj.graphics_node is None:
+            logparams.logging.warning(f"Skipping {operation} of the missing Node {data['id']}")
+        elif operation == node_scene.OP_NODE_REMOVE:
+            del nodes[data['id']]
+            node_obj.remove()
+        elif operation == node_scene.OP_NODE_MOVE:
+            node_obj.set_pos(*data['pos'])
+        elif operation == node_scene.OP_NODE_TITLE:
+            node_obj.set_title(data['title'])
+        else:
+            node_obj.set_param(data['name'], data['value'])
+    elif operation == node_scene.OP_EDGE_REMOVE:
+        edge = edges.pop(data['id'], None)
+        if edge is None or edge.graphics_edge is None:
+            logparams.logging.warning(f"Skipping {operation} of the missing Edge {data['id']}")
+        else:
+            edge.remove()
+    else:
+        raise ValueError(f"Unknown operation: {operation}")
+
+
+
+class SceneJournal:
+    """Incremental autosave of a Scene as a snapshot and a journal of operations.
+
+    Once attached, every operation the Scene reports is appended to the
+    journal file as one small record, so saving costs as much as the edit
+    and not as much as the Scene. When the journal grows past a limit, or
+    the Scene is cleared or loaded, it is compacted: the Scene is saved as
+    a binary snapshot and the journal starts over.
+
+    After a crash recover() loads the snapshot and replays the journal. A
+    torn record at the end, from a crash while writing, is cut off.
+
+    Args:
+        scene (Scene): The Scene to journal.
+        path (str): The journal file, created if missing.
+        snapshot_path (str): The snapshot file, by default the journal
+            path with the binary scene file extension.
+        max_journal_bytes (int): The journal size that triggers a
+            compaction.
+        sync_interval (float): The most seconds between two fsync calls.
+    """
+
+    # pylint: disable=too-many-arguments
+    # Reasoning: Useful and does no harm.
+    def __init__(self, scene: 'Scene', path: str, snapshot_path: str=None,
+        max_journal_bytes: int=16 << 20, sync_interval: float=1.0
+    ):
+        self.scene: 'Scene' = scene
+        self.path: str = path
+        self.snapshot_path: str = snapshot_path or path + scene_binary.FILE_EXTENSION
+        self.max_journal_bytes: int = max_journal_bytes
+        self.sync_interval: float = sync_interval
+        self.__lock: threading.Lock = threading.Lock()
+        self.__last_sync: float = time.monotonic()
+        self.__is_attached: bool = False
+
+        self.__valid_length: int = 0
+        for _ in self.__read():
+            pass
+        valid_length = self.__valid_length
+        self.__file = open(self.path, 'ab')
+        if self.__file.tell() != valid_length:
+            logparams.logging.warning(f"Cutting off a torn record at the end of {self.path}")
+            self.__file.truncate(valid_length)
+
+    def __read(self) -> Iterator[Tuple[str, Dict]]:
+        """Yields the operations of the journal file, see read_operations()."""
+        self.__valid_length = 0
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as file:
+            while True:
+                header = file.read(_HEADER.size)
+                if len(header) < _HEADER.size:
+                    return
+                length, checksum = _HEADER.unpack(header)
+                payload = file.read(length)
+                if len(payload) < length or zlib.crc32(payload) != checksum:
+                    return
+                code, data = json.loads(payload)
+                self.__valid_length = file.tell()
+                yield _OPERATIONS[code], data
+
+    def read_operations(self) -> Iterator[Tuple[str, Dict]]:
+        """Yields the operation and data of every record in the journal."""
+        with self.__lock:
+            self.__file.flush()
+        yield from self.__read()
+
+    def has_recovery_data(self) -> bool:
+        """Returns True if there is a snapshot or journal left to recover."""
+        return os.path.exists(self.snapshot_path) or os.path.getsize(self.path) > 0
+
+    def attach(self):
+        """Starts journaling the Scene's operations.
+
+        The journal is compacted first, so it starts from the Scene as it
+        is now.
+        """
+        if self.__is_attached:
+            return
+        self.compact()
+        self.scene.addOperationListener(self.record)
+        self.__is_attached = True
+
+    def detach(self):
+        """Stops journaling, the files are kept."""
+        if self.__is_attached:
+            self.scene.removeOperationListener(self.record)
+            self.__is_attached = False
+
+    def close(self):
+        """Detaches, syncs and closes the journal."""
+        self.detach()
+        with self.__lock:
+            if not self.__file.closed:
+                self.__file.flush()
+                os.fsync(self.__file.fileno())
+                self.__file.close()
+
+    def discard(self):
+        """Closes the journal and deletes its files, once the Scene is saved."""
+        self.close()
+        for path in (self.path, self.snapshot_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def record(self, operation: str, data: Dict):
+        """Appends an operation to the journal, the Scene's operation listener.
+
+        Args:
+            operation (str): One of the node_scene.OP_ constants.
+            data (Dict): The data of the operation.
+        """
+        if operation == node_scene.OP_RESET:
+            self.compact()
+            return
+
+        payload = json.dumps([OPERATION_CODES[operation], data], separators=(',', ':')).encode('utf-8')
+        with self.__lock:
+            self.__file.write(_HEADER.pack(len(payload), zlib.crc32(payload)) + payload)
+            self.__file.flush()
+            now = time.monotonic()
+            if now - self.__last_sync >= self.sync_interval:
+                os.fsync(self.__file.fileno())
+                self.__last_sync = now
+            size = self.__file.tell()
+
+        if size > self.max_journal_bytes:
+            self.compact()
+
+    def compact(self):
+        """Saves the Scene as the snapshot and empties the journal."""
+        with self.__lock:
+            scene_binary.save_scene(self.scene, self.snapshot_path)
+            self.__file.truncate(0)
+            self.__file.seek(0)
+            os.fsync(self.__file.fileno())
+        logparams.logging.info(f"Compacted the journal into {self.snapshot_path}")
+
+    def recover(self) -> int:
+        """Replaces the content of the Scene with the snapshot and the journal.
+
+        Returns:
+            int: The number of operations replayed.
+        """
+        count = 0
+        with self.scene.operations_suspended():
+            if os.path.exists(self.snapshot_path):
+                scene_binary.load_scene(self.scene, self.snapshot_path)
+            else:
+                self.scene.clear()
+
+            nodes = {node_obj.id: node_obj for node_obj in self.scene.nodes}
+            edges = {edge.id: edge for edge in self.scene.edges}
+            with self.scene.bulk_construction():
+                for operation, data in self.read_operations():
+                    apply_operation(self.scene, operation, data, nodes, edges)
+                    count += 1
+
+        self.scene.has_been_modified = count > 0
+        logparams.logging.info(f"Recovered {count} operations from {self.path}")
+        return count
@@ -0,0 +1,334 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=no-name-in-module
+from __future__ import generator_stop
+from __future__ import annotations
+
+import json
+import os
+import re
+from typing import Any, Dict, IO, Iterable, Iterator, List, Tuple
+
+from cynodegraph.core import logparams
+from cynodegraph.core import node_edge
+from cynodegraph.core import node_scene
+
+
+
+FORMAT_NAME = 'cynodegraph'     #: The 'format' value of the file header
+FORMAT_VERSION = 1              #: The 'version' value of the file header
+
+#: The file dialog filter for JSON scene files
+FILE_FILTER = "JSON Node Graph (*.json)"
+
+#: The top level keys whose arrays are read one record at a time
+SECTIONS = ('nodes', 'edges')
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+
+class _StreamReader:
+    """Reads JSON values one at a time from a text file.
+
+    Only the current value and a chunk of the file are in memory at once,
+    the values are parsed with json.JSONDecoder.raw_decode().
+    """
+
+    def __init__(self, file: IO[str], chunk_size: int):
+        self.file: IO[str] = file
+        self.chunk_size: int = chunk_size
+        self.buffer: str = ''
+        self.pos: int = 0
+        self.decoder: json.JSONDecoder = json.JSONDecoder()
+
+    def fill(self, size: int=None) -> bool:
+        """Reads more of the file, returns False at the end of the file."""
+        chunk = self.file.read(size or self.chunk_size)
+        if not chunk:
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Skips whitespace and returns the next character, '' at the end."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, *chars: str) -> str:
+        """Consumes the next character, which has to be one of chars."""
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"Expected one of {chars} at {char!r} in the scene file")
+        self.pos += 1
+        return char
+
+    def value(self) -> Any:
+        """Parses the next JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                # the value is cut off by the end of the buffer, grow it
+                if not self.fill(max(self.chunk_size, len(self.buffer))):
+                    raise
+                continue
+            # a number could also be cut off by the end of the buffer
+            if end == len(self.buffer) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+
+def iter_records(file: IO[str], chunk_size: int=1 << 16) -> Iterator[Tuple[str, Any]]:
+    """Parses a scene file incrementally.
+
+    Args:
+        file (IO[str]): The scene file opened as text.
+        chunk_size (int): The characters read from the file at once.
+
+    Yields:
+        Tuple[str, Any]: A top level key and its value. The arrays of the
+            SECTIONS are not yielded whole, every record is yielded with
+            the key of its section instead.
+    """
+    reader = _StreamReader(file, chunk_size)
+    reader.expect('{')
+    if reader.peek() == '}':
+        return
+
+    while True:
+        key = reader.value()
+        reader.expect(':')
+        if key in SECTIONS and reader.peek() == '[':
+            reader.expect('[')
+            if reader.peek() == ']':
+                reader.expect(']')
+            else:
+                while True:
+                    yield key, reader.value()
+                    if reader.expect(',', ']') == ']':
+                        break
+        else:
+            yield key, reader.value()
+
+        if reader.expect(',', '}') == '}':
+            return
+
+def write_sections(file: IO[str], header: Dict, sections: Iterable[Tuple[str, Iterable[Dict]]]):
+    """Writes a scene file incrementally, one record per line.
+
+    Args:
+        file (IO[str]): The file to write to, opened as text.
+        header (Dict): The top level values written before the sections.
+        sections (Iterable[Tuple[str, Iterable[Dict]]]): The name and the
+            records of each section.
+    """
+    encoder = json.JSONEncoder(separators=(',', ':'))
+    file.write('{\n')
+    file.write(',\n'.join(f"{json.dumps(key)}:{encoder.encode(value)}" for key, value in header.items()))
+    for section_index, (section, records) in enumerate(sections):
+        file.write(',\n' if header or section_index else '')
+        file.write(f"{json.dumps(section)}:[")
+        separator = '\n'
+        for record in records:
+            file.write(separator)
+            file.writelines(encoder.iterencode(record))
+            separator = ',\n'
+        file.write('\n]')
+    file.write('\n}\n')
+
+
+
+def create_node(scene: 'Scene', data: Dict) -> 'Node':
+    """Creates a Node from the data of Node.serialize().
+
+    The class is chosen by Scene.get_node_class_from_data(). The Node is
+    reported as one operation once its state is restored.
+
+    Args:
+        scene (Scene): The Scene to create the Node on.
+        data (Dict): The Node's data.
+
+    Returns:
+        Node: The new Node.
+    """
+    node_class = scene.get_node_class_from_data(data)
+    with scene.operations_suspended():
+        node_obj = node_class(
+            scene, data['title'],
+            inputs=[socket['socket_type'] for socket in data['inputs']],
+            outputs=[socket['socket_type'] for socket in data['outputs']]
+        )
+        node_obj.deserialize(data)
+    if scene.is_recording_operations:
+        scene.record_operation(node_scene.OP_NODE_ADD, node_obj.serialize())
+    return node_obj
+
+def find_socket(nodes: Dict[str, 'Node'], reference: List) -> 'Socket':
+    """Returns the Socket of an Edge.serialize() socket reference or None.
+
+    Args:
+        nodes (Dict[str, Node]): The Nodes by id.
+        reference (List): The [node id, is input, index] of the Socket.
+    """
+    node_id, is_input, index = reference
+    node_obj = nodes.get(node_id)
+    if node_obj is None:
+        return None
+    sockets = node_obj.inputs if is_input else node_obj.outputs
+    return sockets[index] if 0 <= index < len(sockets) else None
+
+def create_edge(scene: 'Scene', data: Dict, nodes: Dict[str, 'Node']) -> node_edge.Edge:
+    """Creates an Edge from the data of Edge.serialize().
+
+    Args:
+        scene (Scene): The Scene to create the Edge on.
+        data (Dict): The Edge's data.
+        nodes (Dict[str, Node]): The Nodes by id.
+
+    Returns:
+        Edge: The new Edge, None when one of its Sockets is missing.
+    """
+    start_socket = find_socket(nodes, data['start'])
+    end_socket = find_socket(nodes, data['end'])
+    if start_socket is None or end_socket is None:
+        return None
+    return connect_sockets(scene, start_socket, end_socket, data['edge_type'], data['id'])
+
+def connect_sockets(scene: 'Scene', start_socket: 'Socket', end_socket: 'Socket', edge_type: int,
+    edge_id: str
+) -> node_edge.Edge:
+    """Creates an Edge with a known id, reported as one operation.
+
+    Args:
+        scene (Scene): The Scene to create the Edge on.
+        start_socket (Socket): The Edge's starting Socket.
+        end_socket (Socket): The Edge's ending Socket.
+        edge_type (int): The Edge's line type.
+        edge_id (str): The Edge's id.
+
+    Returns:
+        Edge: The new Edge.
+    """
+    with scene.operations_suspended():
+        edge = node_edge.Edge(scene, start_socket, end_socket, edge_type=edge_type)
+        edge.id = edge_id
+    if scene.is_recording_operations:
+        scene.record_operation(node_scene.OP_EDGE_ADD, edge.serialize())
+    return edge
+
+
+
+def write_records(file: IO[str], header: Dict, nodes: Iterable[Dict], edges: Iterable[Dict]):
+    """Writes the plain data of a Scene to a text file.
+
+    Only plain data is read, so this can run on any thread, see
+    scene_saver.
+
+    Args:
+        file (IO[str]): The file to write to.
+        header (Dict): The 'scene_width' and 'scene_height'.
+        nodes (Iterable[Dict]): The data of every Node, see Node.serialize().
+        edges (Iterable[Dict]): The data of every Edge, see Edge.serialize().
+    """
+    write_sections(
+        file, {'format': FORMAT_NAME, 'version': FORMAT_VERSION, **header},
+        (('nodes', nodes), ('edges', edges))
+    )
+
+def write_scene(scene: 'Scene', file: IO[str]):
+    """Writes a Scene to a text file, see write_records().
+
+    Args:
+        scene (Scene): The Scene to write.
+        file (IO[str]): The file to write to.
+    """
+    write_records(
+        file, {'scene_width': scene.scene_width, 'scene_height': scene.scene_height},
+        (node_obj.serialize() for node_obj in scene.nodes),
+        (
+            edge.serialize() for edge in scene.edges
+            if edge.start_socket is not None and edge.end_socket is not None
+        )
+    )
+
+def read_scene(scene: 'Scene', file: IO[str]) -> Tuple[List['Node'], List[node_edge.Edge]]:
+    """Reads a scene file into a Scene, next to the Nodes it already has.
+
+    Args:
+        scene (Scene): The Scene to add the Nodes and Edges to.
+        file (IO[str]): The file to read.
+
+    Returns:
+        Tuple[List[Node], List[Edge]]: The new Nodes and Edges.
+    """
+    nodes: Dict[str, 'Node'] = {}
+    edges = []
+    pending = []
+    with scene.bulk_construction():
+        for key, value in iter_records(file):
+            if key == 'nodes':
+                node_obj = create_node(scene, value)
+                nodes[node_obj.id] = node_obj
+            elif key == 'edges':
+                edge = create_edge(scene, value, nodes)
+                if edge is None:
+                    # the Edge comes before one of its Nodes
+                    pending.append(value)
+                else:
+                    edges.append(edge)
+            elif key == 'format' and value != FORMAT_NAME:
+                raise ValueError(f"Not a scene file: {value}")
+            elif key == 'version' and value > FORMAT_VERSION:
+                raise ValueError(f"Unsupported scene file version: {value}")
+
+        for data in pending:
+            edge = create_edge(scene, data, nodes)
+            if edge is None:
+                logparams.logging.warning(f"Skipping Edge {data['id']}, a Socket is missing")
+            else:
+                edges.append(edge)
+    return list(nodes.values()), edges
+
+
+
+def save_scene(scene: 'Scene', filename: str):
+    """Saves a Scene, the file is replaced only once it is complete.
+
+    Args:
+        scene (Scene): The Scene to save.
+        filename (str): The path to save to.
+    """
+    temp_filename = filename + '.tmp'
+    with open(temp_filename, 'w', encoding='utf-8') as file:
+        write_scene(scene, file)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_filename, filename)
+
+def save_records(filename: str, header: Dict, nodes: Iterable[Dict], edges: Iterable[Dict]):
+    """Saves the plain data of a Scene, see write_records() and save_scene()."""
+    temp_filename = filename + '.tmp'
+    with open(temp_filename, 'w', encoding='utf-8') as file:
+        write_records(file, header, nodes, edges)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_filename, filename)
+
+def load_scene(scene: 'Scene', filename: str):
+    """Replaces the content of a Scene with a scene file.
+
+    Args:
+        scene (Scene): The Scene to load into.
+        filename (str): The path to load.
+    """
+    scene.clear()
+    with open(filename, 'r', encoding='utf-8') as file:
+        read_scene(scene, file)
@@ -0,0 +1,130 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=no-name-in-module
+from __future__ import generator_stop
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List
+
+from PyQt5.QtCore import pyqtSignal, QThread
+
+from cynodegraph.core import logparams
+from cynodegraph.core import node_scene
+
+
+
+@dataclass
+class SceneSnapshot:
+    """The plain data of a Scene at one point in time, free of Qt objects.
+
+    Attributes:
+        header (Dict): The 'scene_width' and 'scene_height'.
+        nodes (List[Dict]): The data of every Node, see Node.serialize().
+        edges (List[Dict]): The data of every connected Edge, see
+            Edge.serialize().
+        operation_count (int): The Scene's operation count when the
+            snapshot was taken.
+    """
+    header: Dict
+    nodes: List[Dict]
+    edges: List[Dict]
+    operation_count: int
+
+
+
+def take_snapshot(scene: 'Scene') -> SceneSnapshot:
+    """Copies the plain data of a Scene, on the thread that owns the Scene.
+
+    Only the containers are copied, parameter values are shared, so they
+    have to be replaced rather than changed in place, see Node.set_param().
+
+    Args:
+        scene (Scene): The Scene to copy.
+
+    Returns:
+        SceneSnapshot: The copy.
+    """
+    return SceneSnapshot(
+        {'scene_width': scene.scene_width, 'scene_height': scene.scene_height},
+        [node_obj.serialize() for node_obj in scene.nodes],
+        [
+            edge.serialize() for edge in scene.edges
+            if edge.start_socket is not None and edge.end_socket is not None
+        ],
+        scene.operation_count
+    )
+
+def _counted(records: Iterable[Dict], callback: Callable[[], None]) -> Iterator[Dict]:
+    for record in records:
+        yield record
+        callback()
+
+def save_snapshot(snapshot: SceneSnapshot, filename: str,
+    progress: Callable[[int, int], None]=None, interval: int=1000
+):
+    """Saves a snapshot in the format of the file's extension.
+
+    Args:
+        snapshot (SceneSnapshot): The snapshot to save.
+        filename (str): The path to save to.
+        progress (Callable[[int, int], None]): Called with the records
+            written so far and the total every interval records.
+        interval (int): The number of records between progress calls.
+    """
+    total = len(snapshot.nodes) + len(snapshot.edges)
+    written = 0
+
+    def on_record():
+        nonlocal written
+        written += 1
+        if progress is not None and (written % interval == 0 or written == total):
+            progress(written, total)
+
+    node_scene.scene_file_format(filename).save_records(
+        filename, snapshot.header, _counted(snapshot.nodes, on_record),
+        _counted(snapshot.edges, on_record)
+    )
+
+
+
+class SceneSaver(QThread):
+    """Worker thread that encodes, writes and syncs a snapshot.
+
+    Taking the snapshot is the only part of a save done on the GUI
+    thread, see take_snapshot(), so the editor stays interactive while the
+    file is written.
+
+    Args:
+        snapshot (SceneSnapshot): The snapshot to save.
+        filename (str): The path to save to.
+        parent (QObject): The parent of the thread.
+
+    Attributes:
+        snapshot (SceneSnapshot): The snapshot being saved.
+        filename (str): The path being saved to.
+        error (Exception): The exception the save failed with, or None.
+    """
+
+    # pyqtSignal emitted with the records written so far and the total
+    save_progress = pyqtSignal(int, int)
+    # pyqtSignal emitted with the filename and if the save succeeded
+    save_finished = pyqtSignal(str, bool)
+
+    def __init__(self, snapshot: SceneSnapshot, filename: str, parent: 'QObject'=None):
+        super().__init__(parent)
+        self.snapshot: SceneSnapshot = snapshot
+        self.filename: str = filename
+        self.error: Exception = None
+
+    def run(self):
+        """Saves the snapshot, the QThread entry point."""
+        try:
+            save_snapshot(self.snapshot, self.filename, self.save_progress.emit)
+        # pylint: disable=broad-except
+        # Reasoning: the thread's error boundary, save_finished has to be emitted
+        except Exception as error:
+            logparams.logging.exception("Exception occurred")
+            self.error = error
+            self.save_finished.emit(self.filename, False)
+            return
+        self.save_finished.emit(self.filename, True)
@@ -0,0 +1,155 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=no-name-in-module
+from __future__ import generator_stop
+from __future__ import annotations
+
+import math
+from typing import Dict, Set, Tuple
+
+from PyQt5.QtCore import QRectF
+
+from cynodegraph.core import logparams
+from cynodegraph.core import node_edge
+from cynodegraph.core import scene_binary
+from cynodegraph.core import scene_json
+
+
+
+DEFAULT_TILE_SIZE = 2048.0  #: The default tile size of tiled scene files
+
+
+
+def save_tiled_scene(scene: 'Scene', filename: str, tile_size: float=DEFAULT_TILE_SIZE):
+    """Saves a Scene as a tiled binary file, see scene_binary.write_scene().
+
+    Args:
+        scene (Scene): The Scene to save.
+        filename (str): The path to save to.
+        tile_size (float): The size of the square tiles.
+    """
+    scene_binary.save_scene(scene, filename, tile_size)
+
+
+
+class TiledSceneLoader:
+    """Materializes the part of a tiled scene file that is in view.
+
+    Only the Nodes in the tiles overlapping the viewport, plus a margin,
+    are created, together with the Nodes they have Edges to, so every
+    Edge that starts or ends in view is complete. Nodes that leave that
+    set are removed from the Scene again when the view moves.
+
+    The Scene only ever holds part of the file, so edits to Nodes that are
+    paged out are lost. Call load_all() before editing or saving.
+
+    Args:
+        scene (Scene): The Scene to materialize the Nodes on.
+        filename (str): The tiled binary scene file.
+        margin (int): The number of tiles around the viewport to load.
+
+    Attributes:
+        graph_file (BinarySceneFile): The open scene file.
+        nodes (Dict[int, Node]): The materialized Nodes by record index.
+        edges (Dict[int, Edge]): The materialized Edges by record index.
+    """
+
+    def __init__(self, scene: 'Scene', filename: str, margin: int=1):
+        self.scene: 'Scene' = scene
+        self.margin: int = margin
+        self.graph_file: scene_binary.BinarySceneFile = scene_binary.BinarySceneFile(filename)
+        if self.graph_file.tile_size <= 0:
+            self.graph_file.close()
+            raise ValueError(f"Not a tiled scene file: {filename}")
+
+        self.nodes: Dict[int, 'Node'] = {}
+        self.edges: Dict[int, node_edge.Edge] = {}
+        self.__tile_range: Tuple[int, int, int, int] = None
+
+    def close(self):
+        """Closes the file, the materialized Nodes stay in the Scene."""
+        self.graph_file.close()
+
+    def attach(self, view: 'NodeEditorGraphicsView'):
+        """Follows a view, loading whatever it scrolls or zooms to."""
+        view.viewport_changed.connect(self.update_viewport)
+        self.update_viewport(view.visible_scene_rect())
+
+    def update_viewport(self, rect: QRectF):
+        """Materializes the Nodes for a visible scene rect.
+
+        Args:
+            rect (QRectF): The visible part of the scene.
+        """
+        tile_size = self.graph_file.tile_size
+        tile_range = (
+            math.floor(rect.left() / tile_size) - self.margin,
+            math.floor(rect.top() / tile_size) - self.margin,
+            math.floor(rect.right() / tile_size) + self.margin,
+            math.floor(rect.bottom() / tile_size) + self.margin,
+        )
+        if tile_range == self.__tile_range:
+            return
+        self.__tile_range = tile_range
+
+        left, top, right, bottom = tile_range
+        visible = set()
+        for (column, row), indices in self.graph_file.tiles().items():
+            if left <= column <= right and top <= row <= bottom:
+                visible.update(indices)
+        self.__materialize(visible)
+
+    def load_all(self):
+        """Materializes every Node and Edge of the file."""
+        self.__tile_range = None
+        self.__materialize(set(range(self.graph_file.node_count)))
+
+    def __materialize(self, visible: Set[int]):
+        """Makes the Scene hold the visible Nodes, their neighbours and their Edges.
+
+        Paging is not an edit of the model, so it is not reported as
+        operations.
+        """
+        with self.scene.operations_suspended():
+            self.__page(visible)
+
+    def __page(self, visible: Set[int]):
+        wanted_edges = set()
+        wanted_nodes = set(visible)
+        for index in visible:
+            for edge_index in self.graph_file.incident_edges(index):
+                wanted_edges.add(edge_index)
+                wanted_nodes.update(self.graph_file.edge_nodes(edge_index))
+
+        removed = [index for index in self.nodes if index not in wanted_nodes]
+        for index in removed:
+            # removing a Node removes its Edges
+            for edge_index in self.graph_file.incident_edges(index):
+                self.edges.pop(edge_index, None)
+            self.nodes.pop(index).remove()
+
+        with self.scene.bulk_construction():
+            for index in sorted(wanted_nodes.difference(self.nodes)):
+                self.nodes[index] = scene_json.create_node(self.scene, self.graph_file.node_data(index))
+            for edge_index in sorted(wanted_edges.difference(self.edges)):
+                self.__create_edge(edge_index)
+
+        logparams.logging.debug(
+            f"Tiles: {len(self.nodes)} nodes and {len(self.edges)} edges materialized, "
+            f"{len(removed)} nodes paged out"
+        )
+
+    def __socket(self, index: int) -> 'Socket':
+        node_index, _, socket_index, _, flags = self.graph_file.socket_record(index)
+        node_obj = self.nodes[node_index]
+        sockets = node_obj.inputs if flags & scene_binary.SOCKET_IS_INPUT else node_obj.outputs
+        return sockets[socket_index] if socket_index < len(sockets) else None
+
+    def __create_edge(self, index: int):
+        id_index, start, end, edge_type = self.graph_file.edge_record(index)
+        start_socket = self.__socket(start)
+        end_socket = self.__socket(end)
+        if start_socket is None or end_socket is None:
+            return
+        self.edges[index] = scene_json.connect_sockets(
+            self.scene, start_socket, end_socket, edge_type, self.graph_file.string(id_index)
+        )
@@ -0,0 +1,108 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=no-name-in-module
+from __future__ import generator_stop
+from __future__ import annotations
+
+import heapq
+import os
+import time
+from concurrent import futures
+from typing import Callable, Dict, List, Tuple
+
+from cynodegraph.core import critical_path
+from cynodegraph.core import node_dag
+
+
+
+def _timed_run(dag_node: node_dag.DagNode, inputs: List) -> Tuple[List, float]:
+    start = time.perf_counter()
+    outputs = node_dag.run_node(dag_node, inputs)
+    return outputs, time.perf_counter() - start
+
+
+
+class PriorityScheduler:
+    """Execution backend that runs ready nodes on a pool of threads.
+
+    Whenever a thread is free the ready node with the highest bottom level
+    runs next, so the nodes on the critical path never wait behind nodes
+    that have plenty of slack. The bottom levels are computed from the
+    historical run times, see critical_path.bottom_levels().
+
+    Kernels only run in parallel when they release the GIL, which numeric
+    libraries and I/O do.
+
+    Args:
+        workers (int): The number of threads, by default one per CPU.
+        measure_sizes (bool): Flag for if the output sizes should be
+            measured. It costs a pickling of every output.
+
+    Attributes:
+        timings (Dict[str, float]): The seconds each node took to run
+            during the last evaluate().
+        sizes (Dict[str, float]): The output bytes of each node during the
+            last evaluate(), empty unless measure_sizes is set.
+    """
+
+    def __init__(self, workers: int=None, measure_sizes: bool=False):
+        self.workers: int = workers or os.cpu_count() or 1
+        self.measure_sizes: bool = measure_sizes
+        self.timings: Dict[str, float] = {}
+        self.sizes: Dict[str, float] = {}
+
+    def evaluate(self, graph: node_dag.CompiledGraph, values: Dict[str, List]=None,
+        on_result: Callable[[str, List], None]=None
+    ) -> Dict[str, List]:
+        """Evaluates the graph, see node_dag.evaluate()."""
+        self.timings = {}
+        self.sizes = {}
+        levels = critical_path.bottom_levels(graph)
+        known = dict(values) if values is not None else {}
+        results = {}
+
+        waiting = {
+            node_id: sum(
+                1 for parent_id in graph.nodes[node_id].upstream
+                if parent_id in graph.nodes and parent_id not in known
+            )
+            for node_id in graph.order if node_id not in known
+        }
+        ready = [(-levels[node_id], node_id) for node_id, count in waiting.items() if count == 0]
+        heapq.heapify(ready)
+
+        error = None
+        with futures.ThreadPoolExecutor(self.workers) as pool:
+            running = {}
+            while running or (ready and error is None):
+                while ready and error is None and len(running) < self.workers:
+                    _, node_id = heapq.heappop(ready)
+                    dag_node = graph.nodes[node_id]
+                    inputs = node_dag.gather_inputs(dag_node, known)
+                    running[pool.submit(_timed_run, dag_node, inputs)] = node_id
+
+                done, _ = futures.wait(running, return_when=futures.FIRST_COMPLETED)
+                for future in done:
+                    node_id = running.pop(future)
+                    try:
+                        outputs, elapsed = future.result()
+                    except node_dag.EvaluationError as failure:
+                        error = error or failure
+                        continue
+
+                    known[node_id] = outputs
+                    results[node_id] = outputs
+                    self.timings[node_id] = elapsed
+                    if self.measure_sizes:
+                        self.sizes[node_id] = node_dag.output_size(outputs)
+                    if on_result is not None:
+                        on_result(node_id, outputs)
+                    for child_id in graph.children[node_id]:
+                        if child_id in waiting:
+                            waiting[child_id] -= 1
+                            if waiting[child_id] == 0:
+                                heapq.heappush(ready, (-levels[child_id], child_id))
+
+        if error is not None:
+            error.results = results
+            raise error
+        return results